@@ -2,8 +2,27 @@ from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
 from django.contrib.auth.models import User
 from django.conf import settings
+import copy
+import hashlib
+import time
 import jwt
 
+from apps.accounts.caches import TTLCache
+from sweetshop.timing import timed
+
+
+# Per-process caches used by JWTAuthentication.
+# - token_cache: sha256(token) -> decoded payload, never past the token's exp
+# - user_cache: user id -> User, dropped when the user is saved or deleted
+token_cache = TTLCache(
+    maxsize=settings.JWT_TOKEN_CACHE_SIZE,
+    ttl=settings.JWT_TOKEN_CACHE_TTL,
+)
+user_cache = TTLCache(
+    maxsize=settings.JWT_USER_CACHE_SIZE,
+    ttl=settings.JWT_USER_CACHE_TTL,
+)
+
 
 class JWTAuthentication(BaseAuthentication):
     """
@@ -12,6 +31,11 @@ class JWTAuthentication(BaseAuthentication):
     - Expects token in Authorization header
     - Returns None if no credentials (DRF will decide)
     - Raises AuthenticationFailed for invalid token
+    - Only accepts access tokens, never refresh tokens
+
+    Decoded tokens and users are kept in bounded, TTL-evicted
+    in-process caches, so repeat requests with the same token need
+    no signature check and no database query.
     """
 
     def authenticate(self, request):
@@ -23,12 +47,48 @@ class JWTAuthentication(BaseAuthentication):
         if not auth_header:
             return None
 
+        with timed("auth"):
+            payload = self.get_payload(auth_header)
+            user = self.get_user(payload)
+
+        return (user, None)
+
+    async def aauthenticate(self, request):
+        """
+        Async counterpart of authenticate(), for async views.
+
+        Token decoding is CPU-only; a user cache miss is resolved with
+        the async ORM, so the event loop is never blocked on the DB.
+        """
+        auth_header = request.headers.get("Authorization")
+
+        if not auth_header:
+            return None
+
+        payload = self.get_payload(auth_header)
+        user = await self.aget_user(payload)
+
+        return (user, None)
+
+    def get_payload(self, auth_header):
+        """
+        Return the decoded token payload, from the token cache if possible.
+        """
         try:
             prefix, token = auth_header.split(" ")
+        except ValueError:
+            raise AuthenticationFailed("Invalid authorization header.")
+
+        if prefix.lower() != "bearer":
+            raise AuthenticationFailed("Invalid token prefix.")
 
-            if prefix.lower() != "bearer":
-                raise AuthenticationFailed("Invalid token prefix.")
+        key = hashlib.sha256(token.encode()).hexdigest()
+        payload = token_cache.get(key)
 
+        if payload is not None:
+            return payload
+
+        try:
             payload = jwt.decode(
                 token,
                 settings.SECRET_KEY,
@@ -39,15 +99,59 @@ class JWTAuthentication(BaseAuthentication):
             raise AuthenticationFailed("Token has expired.")
         except jwt.DecodeError:
             raise AuthenticationFailed("Invalid token.")
-        except ValueError:
-            raise AuthenticationFailed("Invalid authorization header.")
 
-        try:
-            user = User.objects.get(id=payload["user_id"])
-        except User.DoesNotExist:
-            raise AuthenticationFailed("User not found.")
+        # Refresh tokens are signed with the same key; they may only be
+        # exchanged at the refresh endpoint, never used as credentials.
+        if payload.get("token_type") != "access":
+            raise AuthenticationFailed("Invalid token type.")
 
-        return (user, None)
+        if "exp" in payload:
+            token_cache.set(key, payload, ttl=payload["exp"] - time.time())
+
+        return payload
+
+    def get_user(self, payload):
+        """
+        Return the user named by the token, from the user cache if possible.
+
+        A copy is returned so one request can never mutate the user
+        seen by another.
+        """
+        user_id = str(payload.get("user_id"))
+        user = user_cache.get(user_id)
+
+        if user is None:
+            try:
+                user = User.objects.get(id=user_id)
+            except (User.DoesNotExist, ValueError):
+                raise AuthenticationFailed("User not found.")
+
+            user_cache.set(user_id, user)
+
+        if not user.is_active:
+            raise AuthenticationFailed("User is inactive.")
+
+        return copy.copy(user)
+
+    async def aget_user(self, payload):
+        """
+        Async counterpart of get_user().
+        """
+        user_id = str(payload.get("user_id"))
+        user = user_cache.get(user_id)
+
+        if user is None:
+            try:
+                user = await User.objects.aget(id=user_id)
+            except (User.DoesNotExist, ValueError):
+                raise AuthenticationFailed("User not found.")
+
+            user_cache.set(user_id, user)
+
+        if not user.is_active:
+            raise AuthenticationFailed("User is inactive.")
+
+        return copy.copy(user)
 
     def authenticate_header(self, request):
         """
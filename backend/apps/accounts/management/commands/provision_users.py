@@ -0,0 +1,64 @@
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.accounts.provisioning import provision_users
+from apps.sweets.importers import FORMATS, ImportFormatError, detect_format
+
+
+class Command(BaseCommand):
+    """
+    Create user accounts in bulk from a CSV or JSONL file.
+
+    Each row has username, password and an optional email.
+
+    Usage:
+        python manage.py provision_users partner_users.csv
+        python manage.py provision_users - --format jsonl --workers 8 < users.jsonl
+    """
+
+    help = "Bulk create users from a CSV or JSONL file ('-' reads stdin)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=FORMATS)
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.ACCOUNTS_PROVISION_WORKERS,
+            help="Password hashing processes (default: one per CPU).",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+
+        try:
+            fmt = detect_format(path, options["format"])
+        except ImportFormatError as exc:
+            raise CommandError(str(exc))
+
+        if path == "-":
+            result = self.run_provisioning(sys.stdin, fmt, options)
+        else:
+            try:
+                with open(path, encoding="utf-8-sig", newline="") as lines:
+                    result = self.run_provisioning(lines, fmt, options)
+            except OSError as exc:
+                raise CommandError(str(exc))
+
+        for error in result["errors"]:
+            self.stderr.write(f"line {error['line']}: {error['errors']}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {result['created']}, failed {result['failed']}."
+        ))
+
+    def run_provisioning(self, lines, fmt, options):
+        return provision_users(
+            lines,
+            fmt,
+            batch_size=options["batch_size"],
+            workers=options["workers"],
+        )
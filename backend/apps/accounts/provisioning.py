@@ -0,0 +1,132 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.db import transaction
+from rest_framework import serializers
+
+from apps.sweets.importers import MAX_REPORTED_ERRORS, iter_rows
+
+
+class ProvisionUserSerializer(serializers.Serializer):
+    """
+    Serializer for one row of a user provisioning file.
+
+    Validates field formats only; username uniqueness is checked for
+    a whole batch at once by provision_users().
+    """
+
+    username = serializers.CharField(
+        max_length=150,
+        validators=[UnicodeUsernameValidator()],
+    )
+    email = serializers.EmailField(required=False, allow_blank=True, default="")
+    password = serializers.CharField(write_only=True, min_length=8)
+
+
+def provision_users(lines, fmt, batch_size=1000, workers=None):
+    """
+    Stream users from CSV or JSONL into the database.
+
+    - Every row is validated through ProvisionUserSerializer
+    - Usernames are checked against the file and the database with
+      one username__in query per batch
+    - Passwords are hashed across a pool of `workers` processes
+      (default: one per CPU; 1 hashes in this process). Workers are
+      started with "spawn", so they never inherit the caller's
+      threads, locks or database connections; each runs django.setup()
+      with the caller's DJANGO_SETTINGS_MODULE
+    - New users are written with bulk_create, one transaction per batch
+    - Invalid rows are skipped and reported by line number
+
+    Returns a summary dict.
+    """
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        return run_provisioning(lines, fmt, batch_size, map)
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=django.setup,
+    ) as executor:
+
+        def hash_map(function, passwords):
+            chunksize = max(1, len(passwords) // (workers * 4))
+            return executor.map(function, passwords, chunksize=chunksize)
+
+        return run_provisioning(lines, fmt, batch_size, hash_map)
+
+
+def run_provisioning(lines, fmt, batch_size, hash_map):
+    result = {"created": 0, "failed": 0, "errors": []}
+    seen = set()
+    batch = []
+
+    def fail(line_number, error):
+        result["failed"] += 1
+        if len(result["errors"]) < MAX_REPORTED_ERRORS:
+            result["errors"].append({"line": line_number, "errors": error})
+
+    for line_number, row, error in iter_rows(lines, fmt):
+        if error is None:
+            serializer = ProvisionUserSerializer(data=row)
+            if serializer.is_valid():
+                username = serializer.validated_data["username"]
+                if username in seen:
+                    error = {"username": ["Duplicate username in file."]}
+                else:
+                    seen.add(username)
+                    batch.append((line_number, serializer.validated_data))
+            else:
+                error = serializer.errors
+
+        if error is not None:
+            fail(line_number, error)
+
+        if len(batch) >= batch_size:
+            write_batch(batch, hash_map, result, fail)
+            batch = []
+
+    if batch:
+        write_batch(batch, hash_map, result, fail)
+
+    return result
+
+
+def write_batch(rows, hash_map, result, fail):
+    """
+    Drop rows whose username is taken, hash the rest and insert them.
+    """
+    existing = set(
+        User.objects.filter(
+            username__in=[data["username"] for _, data in rows]
+        ).values_list("username", flat=True)
+    )
+
+    new_rows = []
+    for line_number, data in rows:
+        if data["username"] in existing:
+            fail(line_number, {"username": ["Username already exists."]})
+        else:
+            new_rows.append(data)
+
+    if not new_rows:
+        return
+
+    passwords = list(hash_map(make_password, [data["password"] for data in new_rows]))
+
+    users = [
+        User(username=data["username"], email=data["email"], password=password)
+        for data, password in zip(new_rows, passwords)
+    ]
+
+    with transaction.atomic():
+        User.objects.bulk_create(users)
+
+    result["created"] += len(users)
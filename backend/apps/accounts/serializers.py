@@ -65,3 +65,116 @@ class LoginUserSerializer(serializers.Serializer):
 
         data["user"] = user
         return data
+
+
+from rest_framework_simplejwt.exceptions import TokenBackendError, TokenError
+from rest_framework_simplejwt.state import token_backend
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+from rest_framework_simplejwt.tokens import RefreshToken, UntypedToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+
+def revoke_refresh_tokens(user):
+    """
+    Blacklist every outstanding refresh token of a user.
+
+    Access tokens already issued stay valid until they expire.
+    """
+    tokens = OutstandingToken.objects.filter(
+        user=user,
+        blacklistedtoken__isnull=True,
+    )
+
+    BlacklistedToken.objects.bulk_create(
+        [BlacklistedToken(token=token) for token in tokens],
+        ignore_conflicts=True,
+    )
+
+
+class RefreshTokenSerializer(serializers.Serializer):
+    """
+    Serializer for refreshing a session with a refresh token.
+
+    Validates:
+    - Signature, expiry and type of the refresh token
+    - The user still exists and is active
+
+    The presented token is blacklisted (rotation). Presenting a token
+    that was already rotated means it was copied, so every refresh
+    token of the user is revoked and the user must log in again.
+    """
+
+    refresh_token = serializers.CharField()
+
+    def validate(self, data):
+        """
+        Blacklist the presented refresh token, detecting reuse.
+        """
+        try:
+            payload = token_backend.decode(data["refresh_token"])
+        except TokenBackendError:
+            raise serializers.ValidationError("Invalid or expired refresh token.")
+
+        if payload.get("token_type") != "refresh":
+            raise serializers.ValidationError("Token is not a refresh token.")
+
+        user = User.objects.filter(id=payload.get("user_id")).first()
+
+        if user is None or not user.is_active:
+            raise serializers.ValidationError("User not found or inactive.")
+
+        outstanding, _ = OutstandingToken.objects.get_or_create(
+            jti=payload["jti"],
+            defaults={
+                "user": user,
+                "token": data["refresh_token"],
+                "expires_at": datetime_from_epoch(payload["exp"]),
+            },
+        )
+
+        # The unique constraint on BlacklistedToken.token makes this the
+        # single point where two concurrent refreshes are told apart.
+        _, created = BlacklistedToken.objects.get_or_create(token=outstanding)
+
+        if not created:
+            revoke_refresh_tokens(user)
+            raise serializers.ValidationError(
+                "Refresh token reuse detected. All sessions have been revoked."
+            )
+
+        data["user"] = user
+        return data
+
+
+class VerifyTokenSerializer(serializers.Serializer):
+    """
+    Serializer for checking a token without using it.
+
+    Validates:
+    - Signature and expiry (access or refresh token)
+    - Refresh tokens are not blacklisted
+    """
+
+    token = serializers.CharField()
+
+    def validate(self, data):
+        """
+        Decode the token and return its type and expiry.
+        """
+        try:
+            token = UntypedToken(data["token"])
+        except TokenError:
+            raise serializers.ValidationError("Invalid or expired token.")
+
+        if token.get("token_type") == "refresh":
+            try:
+                RefreshToken(data["token"])
+            except TokenError:
+                raise serializers.ValidationError("Token is blacklisted.")
+
+        data["token_type"] = token.get("token_type")
+        data["expires_at"] = token["exp"]
+        return data
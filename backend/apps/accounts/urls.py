@@ -1,7 +1,12 @@
 from django.urls import path
 from apps.accounts.views import RegisterUserView, LoginUserView
+from apps.accounts.views import RefreshTokenView, VerifyTokenView
+from apps.accounts.views import ProvisionUsersView
 
 urlpatterns = [
     path("register/", RegisterUserView.as_view(), name="user-register"),
     path("login/", LoginUserView.as_view(), name="user-login"),
+    path("refresh/", RefreshTokenView.as_view(), name="token-refresh"),
+    path("verify/", VerifyTokenView.as_view(), name="token-verify"),
+    path("provision/", ProvisionUsersView.as_view(), name="user-provision"),
 ]
@@ -1,10 +1,19 @@
+import io
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
 from rest_framework_simplejwt.tokens import RefreshToken
 
 from apps.accounts.serializers import RegisterUserSerializer
 from apps.accounts.serializers import LoginUserSerializer
+from apps.accounts.serializers import RefreshTokenSerializer
+from apps.accounts.serializers import VerifyTokenSerializer
+from apps.accounts.authentication import JWTAuthentication
+from apps.accounts.permissions import IsAdminUser
+from apps.accounts.provisioning import provision_users
+from apps.sweets.importers import ImportFormatError, detect_format
 
 
 
@@ -62,3 +71,122 @@ class LoginUserView(APIView):
             {"detail": "Invalid credentials"},
             status=status.HTTP_401_UNAUTHORIZED,
         )
+
+
+def token_error_response(serializer):
+    """
+    400 for a missing field, 401 for a token that was rejected.
+    """
+    errors = serializer.errors
+
+    if "non_field_errors" not in errors:
+        return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response(
+        {"detail": errors["non_field_errors"][0]},
+        status=status.HTTP_401_UNAUTHORIZED,
+    )
+
+
+class RefreshTokenView(APIView):
+    """
+    API endpoint for renewing a session without the password.
+
+    POST:
+    - Accepts refresh_token
+    - Rotates it: returns a new access token and a new refresh token
+    - The old refresh token cannot be used again; reusing it revokes
+      all of the user's refresh tokens
+    """
+
+    # The access token in the header is usually the expired one being
+    # replaced, so it must not be checked here.
+    authentication_classes = []
+
+    def post(self, request):
+        serializer = RefreshTokenSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            return token_error_response(serializer)
+
+        user = serializer.validated_data["user"]
+        refresh = RefreshToken.for_user(user)
+
+        return Response(
+            {
+                "access_token": str(refresh.access_token),
+                "refresh_token": str(refresh),
+                "username": user.username,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class VerifyTokenView(APIView):
+    """
+    API endpoint for checking whether a token is still valid.
+
+    POST:
+    - Accepts token (access or refresh)
+    - Returns its type and expiry (unix time)
+    """
+
+    authentication_classes = []
+
+    def post(self, request):
+        serializer = VerifyTokenSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            return token_error_response(serializer)
+
+        return Response(
+            {
+                "token_type": serializer.validated_data["token_type"],
+                "expires_at": serializer.validated_data["expires_at"],
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class ProvisionUsersView(APIView):
+    """
+    API endpoint to create user accounts in bulk.
+
+    - Admin only
+    - Accepts a CSV or JSONL upload in the `file` field with
+      username, password and optional email per row
+    - Format comes from ?file_format= or the file extension
+    - Returns created/failed counts and per-line errors
+    - Passwords are hashed in the request thread; use the
+      provision_users command for large files, which hashes them
+      across a process pool
+    """
+
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def post(self, request):
+        upload = request.FILES.get("file")
+
+        if upload is None:
+            return Response(
+                {"detail": "A file upload is required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            fmt = detect_format(upload.name, request.query_params.get("file_format"))
+        except ImportFormatError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        lines = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+
+        try:
+            result = provision_users(lines, fmt, workers=1)
+        except UnicodeDecodeError:
+            return Response(
+                {"detail": "File must be UTF-8 encoded"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response(result, status=status.HTTP_200_OK)
@@ -8,6 +8,6 @@ class SweetAdmin(admin.ModelAdmin):
     Admin configuration for Sweet model.
     """
 
-    list_display = ("id", "name", "category", "price", "quantity", "created_at")
+    list_display = ("id", "name", "category", "price", "quantity", "shard_count", "reorder_threshold", "created_at")
     search_fields = ("name", "category")
     list_filter = ("category",)
@@ -6,3 +6,6 @@ class SweetsConfig(AppConfig):
     """
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.sweets"
+
+    def ready(self):
+        from apps.sweets import signals  # noqa: F401
@@ -0,0 +1,16 @@
+from django.urls import path
+from apps.sweets.async_views import (
+    AsyncSweetListView,
+    AsyncPurchaseSweetView,
+    AsyncSweetSearchView,
+)
+
+urlpatterns = [
+    path("", AsyncSweetListView.as_view(), name="async-sweet-list"),
+    path("search/", AsyncSweetSearchView.as_view(), name="async-sweet-search"),
+    path(
+        "<int:sweet_id>/purchase/",
+        AsyncPurchaseSweetView.as_view(),
+        name="async-sweet-purchase",
+    ),
+]
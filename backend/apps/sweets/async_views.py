@@ -0,0 +1,178 @@
+import json
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.views import View
+from rest_framework.exceptions import APIException, NotAuthenticated
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from apps.sweets.models import Sweet
+from apps.sweets.cache import acached_catalog_data
+from apps.sweets.conditional import acatalog_validators, set_validator_headers
+from apps.sweets.inventory import OutOfStock, apurchase_sweet
+from apps.sweets.pagination import KeysetPagination
+from apps.sweets.search import filter_sweets, rank_sweets
+from apps.sweets.serializers import PurchaseSerializer
+from apps.accounts.authentication import JWTAuthentication
+from sweetshop.metrics import purchases
+
+
+def sweet_data(sweet):
+    return {
+        "id": sweet.id,
+        "name": sweet.name,
+        "category": sweet.category,
+        "price": sweet.price,
+        "quantity": sweet.stock,
+    }
+
+
+class AsyncAPIView(View):
+    """
+    Base class for the native async endpoints served under ASGI.
+
+    - Authenticates with JWTAuthentication.aauthenticate
+    - Wraps the request in a DRF Request for query_params
+    - Renders DRF exceptions and 404s as JSON, like APIView does
+    - Renders with the first DEFAULT_RENDERER_CLASSES renderer, so
+      output matches the sync views
+    - Is CSRF exempt, like APIView, since it uses bearer tokens
+    """
+
+    authentication = JWTAuthentication()
+    renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        view.csrf_exempt = True
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            result = await self.authentication.aauthenticate(request)
+
+            if result is None:
+                raise NotAuthenticated()
+
+            request = Request(request)
+            request.user = result[0]
+            return await super().dispatch(request, *args, **kwargs)
+
+        except APIException as exc:
+            response = self.json({"detail": exc.detail}, status=exc.status_code)
+            if exc.status_code == 401:
+                response["WWW-Authenticate"] = self.authentication.authenticate_header(request)
+            return response
+
+        except Http404:
+            return self.json({"detail": "Not found."}, status=404)
+
+    def json(self, data, status=200, headers=None):
+        return HttpResponse(
+            self.renderer.render(data),
+            status=status,
+            headers=headers,
+            content_type=self.renderer.media_type,
+        )
+
+
+class AsyncCatalogView(AsyncAPIView):
+    """
+    Shared GET flow for the async list and search endpoints:
+    conditional GET, then the versioned response cache, then the DB.
+    """
+
+    def get_queryset(self, request):
+        return Sweet.objects.with_stock()
+
+    async def get(self, request):
+        if not settings.SWEETS_CACHE_ENABLED:
+            data, headers = await self.build_data(request)
+            return self.json(data, headers=headers)
+
+        queryset = self.get_queryset(request)
+        etag, last_modified = await acatalog_validators(request, queryset)
+
+        response = get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=last_modified,
+        )
+
+        if response is None:
+            data, headers = await acached_catalog_data(request, self.build_data)
+            response = self.json(data, headers=headers)
+
+        set_validator_headers(response, etag, last_modified)
+        return response
+
+    async def build_data(self, request):
+        paginator = KeysetPagination()
+        queryset = paginator.get_page_queryset(self.get_queryset(request), request)
+        sweets = paginator.get_page([sweet async for sweet in queryset])
+
+        data = [sweet_data(sweet) for sweet in sweets]
+        link_header = paginator.get_link_header()
+
+        return data, {"Link": link_header} if link_header else {}
+
+
+class AsyncSweetListView(AsyncCatalogView):
+    """
+    Async version of the sweet list (GET only).
+    """
+
+
+class AsyncSweetSearchView(AsyncCatalogView):
+    """
+    Async version of the sweet search, with the same query parameters.
+    """
+
+    def get_queryset(self, request):
+        return filter_sweets(Sweet.objects.with_stock(), request.query_params)
+
+    async def build_data(self, request):
+        term = request.query_params.get("q")
+
+        if not term:
+            return await super().build_data(request)
+
+        paginator = KeysetPagination()
+        queryset = rank_sweets(self.get_queryset(request), term)
+        queryset = queryset[: paginator.get_page_size(request)]
+
+        return [sweet_data(sweet) async for sweet in queryset], {}
+
+
+class AsyncPurchaseSweetView(AsyncAPIView):
+    """
+    Async version of the purchase endpoint.
+
+    - Optional JSON body with a quantity (default 1)
+    - Runs the same purchase as the sync endpoint
+    """
+
+    async def post(self, request, sweet_id):
+        try:
+            body = json.loads(request.body or b"{}")
+        except ValueError:
+            return self.json({"detail": "Invalid JSON body"}, status=400)
+
+        serializer = PurchaseSerializer(data=body)
+
+        if not serializer.is_valid():
+            return self.json(serializer.errors, status=400)
+
+        try:
+            await apurchase_sweet(
+                sweet_id, serializer.validated_data["quantity"], request.user
+            )
+        except OutOfStock:
+            purchases.inc("purchase", "out_of_stock")
+            return self.json({"detail": "Sweet is out of stock"}, status=400)
+
+        purchases.inc("purchase", "success")
+        return self.json({"message": "Sweet purchased successfully"})
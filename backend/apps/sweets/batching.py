@@ -0,0 +1,209 @@
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Now
+from django.http import Http404
+
+from apps.sweets.cache import invalidate_catalog
+from apps.sweets.inventory import OutOfStock, purchase_from_shards
+from apps.sweets.models import StockMovement, Sweet
+
+
+class PendingPurchase:
+    """
+    One caller waiting for its purchase to be applied.
+    """
+
+    def __init__(self, quantity, user=None):
+        self.quantity = quantity
+        self.user = user
+        self.error = None
+        self.done = threading.Event()
+
+    def finish(self, error=None):
+        self.error = error
+        self.done.set()
+
+
+class Batch:
+    def __init__(self):
+        self.purchases = []
+        self.full = threading.Event()
+
+
+class PurchaseBatcher:
+    """
+    Group commit for purchases, per worker process.
+
+    The first purchase of a sweet opens a batch and becomes its leader.
+    Purchases of the same sweet that arrive while the batch is open
+    join it. The leader waits until the batch is full or the wait
+    window has passed, applies the whole batch with apply_batch() and
+    wakes the others. Each caller then gets its own answer: it returns
+    normally, or raises OutOfStock / Http404 exactly as purchase_sweet()
+    would.
+
+    Batch size and wait window come from settings unless given here.
+    """
+
+    def __init__(self, max_batch_size=None, max_wait_ms=None):
+        self._max_batch_size = max_batch_size
+        self._max_wait_ms = max_wait_ms
+        self.lock = threading.Lock()
+        self.open_batches = {}
+
+    @property
+    def max_batch_size(self):
+        return self._max_batch_size or settings.SWEETS_PURCHASE_BATCH_SIZE
+
+    @property
+    def max_wait(self):
+        if self._max_wait_ms is not None:
+            return self._max_wait_ms / 1000
+        return settings.SWEETS_PURCHASE_BATCH_WAIT_MS / 1000
+
+    def purchase(self, sweet_id, quantity=1, user=None):
+        purchase = PendingPurchase(quantity, user)
+
+        with self.lock:
+            batch = self.open_batches.get(sweet_id)
+            leader = batch is None
+
+            if leader:
+                batch = self.open_batches[sweet_id] = Batch()
+
+            batch.purchases.append(purchase)
+
+            if len(batch.purchases) >= self.max_batch_size:
+                del self.open_batches[sweet_id]
+                batch.full.set()
+
+        if leader:
+            batch.full.wait(self.max_wait)
+
+            with self.lock:
+                if self.open_batches.get(sweet_id) is batch:
+                    del self.open_batches[sweet_id]
+
+            try:
+                apply_batch(sweet_id, batch.purchases)
+            except Exception as exc:
+                for waiting in batch.purchases:
+                    if not waiting.done.is_set():
+                        waiting.finish(exc)
+                raise
+        else:
+            purchase.done.wait()
+
+        if purchase.error is not None:
+            raise purchase.error
+
+
+def apply_batch(sweet_id, purchases):
+    """
+    Apply a batch of purchases of one sweet and finish each of them.
+
+    - If the sweet has stock for the whole batch, one conditional
+      UPDATE applies it, in one transaction with its ledger rows
+    - Otherwise the row is locked, purchases are filled in arrival
+      order while stock lasts, and the total is applied with one UPDATE;
+      the rest fail with OutOfStock
+    - Sharded sweets fall back to one purchase_from_shards() each
+    """
+    total = sum(purchase.quantity for purchase in purchases)
+
+    with transaction.atomic():
+        updated = Sweet.objects.filter(
+            id=sweet_id,
+            shard_count=0,
+            quantity__gte=total,
+        ).update(quantity=F("quantity") - total, updated_at=Now())
+
+        if updated:
+            price, category = (
+                Sweet.objects.filter(id=sweet_id)
+                .values_list("price", "category")
+                .get()
+            )
+            results = [(purchase, None) for purchase in purchases]
+            record_purchases(sweet_id, results, price, category)
+            invalidate_catalog()
+        else:
+            results = apply_locked(sweet_id, purchases)
+
+    # Callers only hear back once the batch is committed
+    for purchase, error in results:
+        purchase.finish(error)
+
+
+def apply_locked(sweet_id, purchases):
+    """
+    Slow path of apply_batch(), run inside its transaction.
+    Returns (purchase, error) pairs.
+    """
+    row = (
+        Sweet.objects.select_for_update()
+        .filter(id=sweet_id)
+        .values_list("quantity", "shard_count", "price", "category")
+        .first()
+    )
+
+    if row is None:
+        return [
+            (purchase, Http404("No Sweet matches the given query."))
+            for purchase in purchases
+        ]
+
+    available, shard_count, price, category = row
+    results = []
+
+    if shard_count:
+        for purchase in purchases:
+            try:
+                purchase_from_shards(sweet_id, purchase.quantity, purchase.user)
+            except OutOfStock as exc:
+                results.append((purchase, exc))
+            else:
+                results.append((purchase, None))
+    else:
+        taken = 0
+        for purchase in purchases:
+            if taken + purchase.quantity <= available:
+                taken += purchase.quantity
+                results.append((purchase, None))
+            else:
+                results.append((purchase, OutOfStock()))
+
+        if taken:
+            Sweet.objects.filter(id=sweet_id).update(
+                quantity=F("quantity") - taken,
+                updated_at=Now(),
+            )
+            record_purchases(sweet_id, results, price, category)
+
+    invalidate_catalog()
+    return results
+
+
+def record_purchases(sweet_id, results, price, category):
+    """
+    Write the ledger rows of the filled purchases with one INSERT.
+    Purchases carry their own user, so rows are built here.
+    """
+    StockMovement.objects.bulk_create([
+        StockMovement(
+            kind=StockMovement.PURCHASE,
+            sweet_id=sweet_id,
+            quantity=purchase.quantity,
+            user_id=getattr(purchase.user, "pk", None),
+            unit_price=price,
+            category=category,
+        )
+        for purchase, error in results
+        if error is None
+    ])
+
+
+purchase_batcher = PurchaseBatcher()
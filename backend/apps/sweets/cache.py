@@ -0,0 +1,150 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+
+
+CATALOG_VERSION_KEY = "sweets:catalog-version"
+CACHED_HEADERS = ("Link",)
+
+
+def get_cache():
+    return caches[settings.SWEETS_CACHE_ALIAS]
+
+
+def get_catalog_version():
+    """
+    Return the current catalog version.
+
+    A missing version (first start, or evicted) is seeded from the
+    clock rather than 1, so it can never collide with a version
+    whose entries are still in the cache.
+    """
+    cache = get_cache()
+    version = cache.get(CATALOG_VERSION_KEY)
+
+    if version is None:
+        cache.add(CATALOG_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(CATALOG_VERSION_KEY)
+
+    return version
+
+
+async def aget_catalog_version():
+    """
+    Async counterpart of get_catalog_version().
+    """
+    cache = get_cache()
+    version = await cache.aget(CATALOG_VERSION_KEY)
+
+    if version is None:
+        await cache.aadd(CATALOG_VERSION_KEY, time.time_ns(), timeout=None)
+        version = await cache.aget(CATALOG_VERSION_KEY)
+
+    return version
+
+
+def bump_catalog_version():
+    """
+    Move the catalog to a new version.
+
+    Entries stored under older versions are never read again and
+    simply age out of the cache.
+    """
+    cache = get_cache()
+
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        cache.add(CATALOG_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def invalidate_catalog():
+    """
+    Bump the catalog version once the current transaction commits.
+
+    Bumping after commit means a reader can never store pre-commit
+    data under the new version.
+    """
+    transaction.on_commit(bump_catalog_version)
+
+
+def request_fingerprint(request):
+    """
+    Hash the host, path and query parameters of a request, with the
+    parameters in a normalized order and empty values dropped.
+    """
+    params = sorted(
+        (key, value)
+        for key, values in request.query_params.lists()
+        for value in values
+        if value != ""
+    )
+    raw = repr((request.get_host(), request.path, params)).encode()
+    return hashlib.sha256(raw).hexdigest()
+
+
+def catalog_cache_key(request, version, prefix="response"):
+    """
+    Build a cache key from the catalog version and the request fingerprint.
+    """
+    return f"sweets:{prefix}:{version}:{request_fingerprint(request)}"
+
+
+def cached_catalog_response(request, build_response):
+    """
+    Serve a catalog GET from the cache, building it on a miss.
+
+    The version is read before the database is queried, so a write
+    that lands mid-request leaves the entry under the old version.
+    Only successful responses are stored. With SWEETS_CACHE_ENABLED
+    off, every request is built from the database.
+    """
+    if not settings.SWEETS_CACHE_ENABLED:
+        return build_response(request)
+
+    cache = get_cache()
+    key = catalog_cache_key(request, get_catalog_version())
+    cached = cache.get(key)
+
+    if cached is not None:
+        data, headers = cached
+        return Response(data, headers=headers)
+
+    response = build_response(request)
+
+    if response.status_code == 200:
+        headers = {
+            header: response[header]
+            for header in CACHED_HEADERS
+            if header in response
+        }
+        cache.set(key, (response.data, headers), settings.SWEETS_CACHE_TIMEOUT)
+
+    return response
+
+
+async def acached_catalog_data(request, abuild_data):
+    """
+    Async counterpart of cached_catalog_response().
+
+    Works on (data, headers) pairs so async views can render them
+    however they like. Entries are keyed by the same catalog version,
+    so every write invalidates sync and async responses alike.
+    """
+    if not settings.SWEETS_CACHE_ENABLED:
+        return await abuild_data(request)
+
+    cache = get_cache()
+    key = catalog_cache_key(request, await aget_catalog_version())
+    cached = await cache.aget(key)
+
+    if cached is not None:
+        return cached
+
+    data, headers = await abuild_data(request)
+    await cache.aset(key, (data, headers), settings.SWEETS_CACHE_TIMEOUT)
+    return data, headers
@@ -0,0 +1,119 @@
+import hashlib
+
+from django.conf import settings
+from django.db.models import Count, Max, Sum
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from apps.sweets.cache import (
+    aget_catalog_version,
+    cached_catalog_response,
+    catalog_cache_key,
+    get_cache,
+    get_catalog_version,
+    request_fingerprint,
+)
+
+
+VALIDATOR_AGGREGATES = {
+    "last_modified": Max("updated_at"),
+    "count": Count("id"),
+    "total_stock": Sum("stock"),
+}
+
+
+def catalog_validators(request, queryset):
+    """
+    Return (etag, last_modified) for the sweets matched by `queryset`,
+    which must be annotated with Sweet.objects.with_stock().
+
+    The validators come from one aggregate query - latest update
+    time, row count and total stock - so no Sweet objects are built.
+    Total stock is included because concurrent transactions can
+    commit out of timestamp order; a purchase or restock therefore
+    always changes the ETag even when the latest timestamp does not.
+    It also covers purchases from sharded sweets, which never touch
+    the sweet row itself.
+
+    Results are cached per catalog version, so polling clients cost
+    no queries at all until the catalog changes.
+    """
+    cache = get_cache()
+    key = catalog_cache_key(request, get_catalog_version(), prefix="validators")
+    validators = cache.get(key)
+
+    if validators is None:
+        state = queryset.order_by().aggregate(**VALIDATOR_AGGREGATES)
+        validators = validators_from_state(request, state)
+        cache.set(key, validators, settings.SWEETS_CACHE_TIMEOUT)
+
+    return validators
+
+
+async def acatalog_validators(request, queryset):
+    """
+    Async counterpart of catalog_validators().
+    """
+    cache = get_cache()
+    key = catalog_cache_key(request, await aget_catalog_version(), prefix="validators")
+    validators = await cache.aget(key)
+
+    if validators is None:
+        state = await queryset.order_by().aaggregate(**VALIDATOR_AGGREGATES)
+        validators = validators_from_state(request, state)
+        await cache.aset(key, validators, settings.SWEETS_CACHE_TIMEOUT)
+
+    return validators
+
+
+def validators_from_state(request, state):
+    """
+    Turn the aggregated catalog state into an (etag, last_modified) pair.
+    """
+    last_modified = state["last_modified"]
+    raw = repr((
+        request_fingerprint(request),
+        last_modified.isoformat() if last_modified else None,
+        state["count"],
+        state["total_stock"],
+    )).encode()
+
+    return (
+        '"%s"' % hashlib.sha256(raw).hexdigest()[:32],
+        int(last_modified.timestamp()) if last_modified else None,
+    )
+
+
+def set_validator_headers(response, etag, last_modified):
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+
+
+def conditional_catalog_response(request, queryset, build_response):
+    """
+    Answer a catalog GET with 304 Not Modified when the client's
+    If-None-Match / If-Modified-Since still match, otherwise serve
+    the (cached) response. Both carry ETag and Last-Modified.
+
+    With SWEETS_CACHE_ENABLED off the response is always built and
+    sent without validators.
+    """
+    if not settings.SWEETS_CACHE_ENABLED:
+        return build_response(request)
+
+    etag, last_modified = catalog_validators(request, queryset)
+
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=last_modified,
+    )
+
+    if response is None:
+        response = cached_catalog_response(request, build_response)
+
+    if response.status_code in (200, 304):
+        set_validator_headers(response, etag, last_modified)
+
+    return response
@@ -0,0 +1,74 @@
+import csv
+import json
+
+from rest_framework import serializers
+
+from apps.sweets.models import Sweet
+from apps.sweets.serializers import SweetSerializer
+
+
+FORMATS = ("ndjson", "csv")
+CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+EXPORT_FIELDS = ("id", "name", "category", "price", "quantity", "created_at", "updated_at")
+# Read the summed stock of sharded sweets into the quantity column
+QUERY_FIELDS = tuple("stock" if field == "quantity" else field for field in EXPORT_FIELDS)
+
+# Datetimes are written in ISO 8601, exactly as the API writes them.
+# Prices are strings with two decimal places, as SweetSerializer
+# writes them; the catalog endpoints render prices as JSON numbers
+# instead. Both forms import again.
+datetime_field = serializers.DateTimeField()
+FORMATTERS = {
+    "price": SweetSerializer().fields["price"].to_representation,
+    "created_at": datetime_field.to_representation,
+    "updated_at": datetime_field.to_representation,
+}
+
+
+class Echo:
+    """
+    File-like object whose write() hands the written line back,
+    so csv.writer can be used to produce a stream.
+    """
+
+    def write(self, value):
+        return value
+
+
+def format_row(row):
+    """
+    Return a query row as a list of export values.
+    """
+    return [
+        FORMATTERS[field](value) if field in FORMATTERS and value is not None else value
+        for field, value in zip(EXPORT_FIELDS, row)
+    ]
+
+
+def iter_export(fmt, chunk_size=2000):
+    """
+    Yield the whole catalog as CSV or NDJSON, one line at a time.
+
+    Rows are read with iterator(chunk_size=...), which uses a
+    server-side cursor on Postgres, so memory stays flat however
+    many sweets there are.
+    """
+    rows = (
+        Sweet.objects.with_stock()
+        .order_by("id")
+        .values_list(*QUERY_FIELDS)
+        .iterator(chunk_size=chunk_size)
+    )
+
+    if fmt == "csv":
+        writer = csv.writer(Echo())
+        yield writer.writerow(EXPORT_FIELDS)
+        for row in rows:
+            yield writer.writerow(format_row(row))
+        return
+
+    for row in rows:
+        yield json.dumps(dict(zip(EXPORT_FIELDS, format_row(row)))) + "\n"
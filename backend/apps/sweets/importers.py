@@ -0,0 +1,181 @@
+import csv
+import json
+import os
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.sweets.cache import invalidate_catalog
+from apps.sweets.inventory import set_shard_stock
+from apps.sweets.models import Sweet
+from apps.sweets.serializers import SweetSerializer
+
+
+FORMATS = ("csv", "jsonl")
+MAX_REPORTED_ERRORS = 100
+
+
+class ImportFormatError(ValueError):
+    """
+    Raised when the input format is missing or unsupported.
+    """
+
+
+def detect_format(filename, requested=None):
+    """
+    Return the input format, from `requested` or the file extension.
+    """
+    if requested:
+        fmt = requested.lower()
+    else:
+        extension = os.path.splitext(filename or "")[1].lower()
+        fmt = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}.get(extension)
+
+    if fmt not in FORMATS:
+        raise ImportFormatError("Format must be one of: csv, jsonl.")
+
+    return fmt
+
+
+def iter_rows(lines, fmt):
+    """
+    Yield (line_number, row, error) for each record in a text stream.
+
+    Rows are read one at a time, so the input can be arbitrarily large.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, row, None
+        return
+
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+
+        if not line:
+            continue
+
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield line_number, None, {"non_field_errors": ["Invalid JSON."]}
+            continue
+
+        if not isinstance(row, dict):
+            yield line_number, None, {"non_field_errors": ["Expected a JSON object."]}
+            continue
+
+        yield line_number, row, None
+
+
+def import_sweets(lines, fmt, batch_size=1000, upsert=False):
+    """
+    Stream sweets from CSV or JSONL into the database.
+
+    - Every row is validated through SweetSerializer
+    - Valid rows are written in batches with bulk_create
+    - With `upsert`, rows whose name already exists update that sweet
+      (the oldest one, if the name is not unique) instead; the imported
+      quantity replaces the sweet's whole stock, shards included, and
+      rows without a reorder_threshold keep the current one
+    - Invalid rows are skipped and reported by line number; only the
+      first MAX_REPORTED_ERRORS are kept so memory stays flat
+    - A file that cannot be read any further (not UTF-8, broken CSV)
+      stops the import; rows before that point are still written and
+      the summary gets a `detail` and an error entry for the line
+
+    Each batch is committed on its own and invalidates the catalog
+    cache when it commits. Returns a summary dict.
+    """
+    result = {"created": 0, "updated": 0, "failed": 0, "errors": []}
+    batch = []
+    line_number = 0
+
+    try:
+        for line_number, row, error in iter_rows(lines, fmt):
+            if error is None:
+                serializer = SweetSerializer(data=row)
+                if serializer.is_valid():
+                    batch.append(serializer.validated_data)
+                else:
+                    error = serializer.errors
+
+            if error is not None:
+                result["failed"] += 1
+                if len(result["errors"]) < MAX_REPORTED_ERRORS:
+                    result["errors"].append({"line": line_number, "errors": error})
+
+            if len(batch) >= batch_size:
+                write_batch(batch, upsert, result)
+                batch = []
+    except (UnicodeDecodeError, csv.Error) as exc:
+        if isinstance(exc, UnicodeDecodeError):
+            result["detail"] = "File must be UTF-8 encoded"
+        else:
+            result["detail"] = f"Malformed CSV: {exc}"
+        result["errors"].append({
+            "line": line_number + 1,
+            "errors": {"non_field_errors": [result["detail"]]},
+        })
+
+    if batch:
+        write_batch(batch, upsert, result)
+
+    return result
+
+
+def write_batch(rows, upsert, result):
+    """
+    Insert (or, with `upsert`, update by name) one batch of validated rows.
+    """
+    with transaction.atomic():
+        invalidate_catalog()
+
+        if not upsert:
+            Sweet.objects.bulk_create([Sweet(**row) for row in rows])
+            result["created"] += len(rows)
+            return
+
+        # Later rows win when the same name appears twice in a batch
+        by_name = {row["name"]: row for row in rows}
+        existing = {
+            name: (sweet_id, shard_count, threshold)
+            for name, sweet_id, shard_count, threshold in Sweet.objects.filter(name__in=by_name)
+            .order_by("-id")
+            .values_list("name", "id", "shard_count", "reorder_threshold")
+        }
+
+        updates = []
+        creates = []
+        sharded = {}
+        now = timezone.now()
+        for name, row in by_name.items():
+            sweet = Sweet(**row)
+
+            if name not in existing:
+                creates.append(sweet)
+                continue
+
+            sweet.id, shard_count, threshold = existing[name]
+            sweet.updated_at = now
+            if "reorder_threshold" not in row:
+                sweet.reorder_threshold = threshold
+            if shard_count:
+                sharded[sweet.id] = (sweet.quantity, shard_count)
+                sweet.quantity = 0
+            updates.append(sweet)
+
+        if updates:
+            Sweet.objects.bulk_update(
+                updates,
+                ["category", "price", "quantity", "reorder_threshold", "updated_at"],
+            )
+        if sharded:
+            # bulk_update has locked the sweet rows, so the shards are
+            # locked after them like everywhere else
+            set_shard_stock(sharded)
+        if creates:
+            Sweet.objects.bulk_create(creates)
+
+        result["updated"] += len(updates)
+        result["created"] += len(creates)
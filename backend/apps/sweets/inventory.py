@@ -0,0 +1,555 @@
+import random
+
+from asgiref.sync import sync_to_async
+from django.db import connection, transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Now
+from django.http import Http404
+from django.utils import timezone
+
+from apps.sweets.cache import invalidate_catalog
+from apps.sweets.ledger import record_movement, record_movements
+from apps.sweets.low_stock import (
+    crossed_above,
+    crossed_below,
+    crosses_above,
+    crosses_below,
+    unwatch_low_stock,
+    watch_low_stock,
+)
+from apps.sweets.models import StockMovement, Sweet, SweetStockShard
+
+
+class OutOfStock(Exception):
+    """
+    Raised when a sweet does not have enough stock for a purchase.
+
+    For checkouts, `failures` lists every line that could not be filled.
+    """
+
+    def __init__(self, failures=None):
+        super().__init__("Sweet is out of stock")
+        self.failures = failures or []
+
+
+class InvalidBulkUpdate(Exception):
+    """
+    Raised when any row of a bulk update cannot be applied.
+
+    `failures` lists every such row; nothing has been changed.
+    """
+
+    def __init__(self, failures):
+        super().__init__("Bulk update failed")
+        self.failures = failures
+
+
+def purchase_sweet(sweet_id, quantity=1, user=None):
+    """
+    Atomically decrease the stock of a sweet by `quantity`.
+
+    The stock check and the decrement happen in a single conditional
+    UPDATE, so concurrent purchases can never oversell or overwrite
+    each other. When that UPDATE matches nothing, the sweet is either
+    sharded, missing or out of stock; one plain SELECT tells which,
+    without locking the row, and only sharded sweets go on to
+    purchase_from_shards().
+
+    The purchase is recorded in the ledger in the same transaction.
+
+    The common UPDATE skips purchases that take a watched sweet to its
+    reorder threshold; those are applied by a second UPDATE, which also
+    adds the sweet to the low-stock watch list.
+    """
+    with transaction.atomic():
+        in_stock = Sweet.objects.filter(
+            id=sweet_id,
+            shard_count=0,
+            quantity__gte=quantity,
+        )
+        updated = in_stock.exclude(crosses_below(quantity)).update(
+            quantity=F("quantity") - quantity,
+            updated_at=Now(),
+        )
+
+        if updated:
+            record_movement(StockMovement.PURCHASE, sweet_id, quantity, user)
+        elif in_stock.filter(crosses_below(quantity)).update(
+            quantity=F("quantity") - quantity,
+            updated_at=Now(),
+        ):
+            record_movement(StockMovement.PURCHASE, sweet_id, quantity, user)
+            watch_low_stock([sweet_id])
+        else:
+            shard_count = (
+                Sweet.objects.filter(id=sweet_id)
+                .values_list("shard_count", flat=True)
+                .first()
+            )
+
+            if shard_count is None:
+                raise Http404("No Sweet matches the given query.")
+
+            if not shard_count:
+                raise OutOfStock()
+
+            purchase_from_shards(sweet_id, quantity, user)
+
+        invalidate_catalog()
+
+
+async def apurchase_sweet(sweet_id, quantity=1, user=None):
+    """
+    Async counterpart of purchase_sweet().
+
+    The stock change and its ledger row must share a transaction,
+    which the async ORM cannot open, so the purchase runs in the
+    sync thread.
+    """
+    await sync_to_async(purchase_sweet)(sweet_id, quantity, user)
+
+
+def shard_candidates(sweet_id, quantity):
+    return SweetStockShard.objects.filter(
+        sweet_id=sweet_id,
+        quantity__gte=quantity,
+    ).values_list("id", flat=True)
+
+
+def purchase_from_shards(sweet_id, quantity, user=None):
+    """
+    Purchase from a sharded sweet.
+
+    - Tries the shards that can fill the purchase in random order,
+      each with a conditional UPDATE, so concurrent buyers spread
+      over different rows
+    - Falls back to take_stock() when no single shard has enough,
+      which raises Http404 / OutOfStock if the purchase cannot be filled
+
+    A conditional UPDATE that waited on a concurrent buyer keeps the
+    shard row locked even when it then misses. Each attempt therefore
+    runs in a savepoint that is rolled back on a miss, so a buyer never
+    holds one shard while waiting for another, and take_stock() locks
+    the sweet before any shard, like restock_sweet() and checkout().
+    """
+    shard_ids = list(shard_candidates(sweet_id, quantity))
+    random.shuffle(shard_ids)
+
+    with transaction.atomic():
+        for shard_id in shard_ids:
+            attempt = transaction.savepoint()
+
+            if SweetStockShard.objects.filter(
+                id=shard_id,
+                quantity__gte=quantity,
+            ).update(quantity=F("quantity") - quantity):
+                transaction.savepoint_commit(attempt)
+                record_movement(StockMovement.PURCHASE, sweet_id, quantity, user)
+                return
+
+            transaction.savepoint_rollback(attempt)
+
+        take_stock(sweet_id, quantity, user)
+
+
+def take_stock(sweet_id, quantity, user=None):
+    """
+    Take `quantity` from a sweet's own quantity and all of its shards,
+    under row locks.
+    """
+    with transaction.atomic():
+        sweet = (
+            Sweet.objects.select_for_update()
+            .filter(id=sweet_id)
+            .values_list("quantity", "reorder_threshold")
+            .first()
+        )
+
+        if sweet is None:
+            raise Http404("No Sweet matches the given query.")
+
+        own, threshold = sweet
+        shards = lock_shards([sweet_id]).get(sweet_id, [])
+        stock = own + sum(available for _, available in shards)
+
+        if stock < quantity:
+            raise OutOfStock()
+
+        take_locked(sweet_id, quantity, shards)
+        record_movement(StockMovement.PURCHASE, sweet_id, quantity, user)
+
+        if crossed_below(stock, quantity, threshold):
+            watch_low_stock([sweet_id])
+
+
+def lock_shards(sweet_ids):
+    """
+    Lock the non-empty shards of the given sweets, in a fixed order.
+
+    Returns {sweet_id: [(shard_id, quantity), ...]}.
+    """
+    shards = {}
+    rows = (
+        SweetStockShard.objects.select_for_update()
+        .filter(sweet_id__in=sweet_ids, quantity__gt=0)
+        .order_by("sweet_id", "shard")
+        .values_list("sweet_id", "id", "quantity")
+    )
+
+    for sweet_id, shard_id, available in rows:
+        shards.setdefault(sweet_id, []).append((shard_id, available))
+
+    return shards
+
+
+def take_locked(sweet_id, quantity, shards):
+    """
+    Decrement locked stock: shards first, then the sweet's own quantity.
+    The caller has already checked there is enough.
+    """
+    for shard_id, available in shards:
+        taken = min(available, quantity)
+        SweetStockShard.objects.filter(id=shard_id).update(
+            quantity=F("quantity") - taken
+        )
+        quantity -= taken
+
+        if not quantity:
+            return
+
+    Sweet.objects.filter(id=sweet_id).update(
+        quantity=F("quantity") - quantity,
+        updated_at=Now(),
+    )
+
+
+def restock_sweet(sweet_id, quantity, user=None):
+    """
+    Atomically increase the stock of a sweet by `quantity`.
+
+    For a sharded sweet the new stock is spread evenly over its shards.
+    The restock is recorded in the ledger in the same transaction.
+
+    A restock that lifts a low-stock sweet above its reorder threshold
+    skips the plain UPDATE and takes the sweet off the watch list.
+    """
+    with transaction.atomic():
+        updated = (
+            Sweet.objects.filter(id=sweet_id, shard_count=0)
+            .exclude(crosses_above(quantity))
+            .update(quantity=F("quantity") + quantity, updated_at=Now())
+        )
+
+        if not updated:
+            # Locking the sweet first keeps the lock order of take_stock()
+            sweet = (
+                Sweet.objects.select_for_update()
+                .filter(id=sweet_id)
+                .values_list("quantity", "shard_count", "reorder_threshold")
+                .first()
+            )
+
+            if sweet is None:
+                raise Http404("No Sweet matches the given query.")
+
+            own, shard_count, threshold = sweet
+
+            if not shard_count:
+                Sweet.objects.filter(id=sweet_id).update(
+                    quantity=F("quantity") + quantity,
+                    updated_at=Now(),
+                )
+
+                if crossed_above(own, quantity, threshold):
+                    unwatch_low_stock([sweet_id])
+            else:
+                # Crossings of sharded sweets are left to reconcile_low_stock()
+                SweetStockShard.objects.filter(sweet_id=sweet_id).update(
+                    quantity=F("quantity") + Case(
+                        *[
+                            When(shard=shard, then=Value(share))
+                            for shard, share in enumerate(split_stock(quantity, shard_count))
+                        ],
+                        default=Value(0),
+                    )
+                )
+
+        record_movement(StockMovement.RESTOCK, sweet_id, quantity, user)
+        invalidate_catalog()
+
+
+def split_stock(quantity, shard_count):
+    """
+    Split `quantity` into `shard_count` near-equal shares; the remainder
+    goes to randomly chosen shards, so small restocks do not always
+    land on the same shard.
+    """
+    share, remainder = divmod(quantity, shard_count)
+    extra = set(random.sample(range(shard_count), remainder))
+    return [share + (shard in extra) for shard in range(shard_count)]
+
+
+def set_shard_stock(stock):
+    """
+    Replace the shard stock of sharded sweets with absolute values.
+
+    `stock` maps sweet_id to (quantity, shard_count); each quantity is
+    spread evenly over the sweet's shards. The caller sets the sweets'
+    own quantity to 0 and must already hold their row locks, so the
+    shards are locked after the sweet like everywhere else.
+    """
+    for sweet_id, (quantity, shard_count) in stock.items():
+        SweetStockShard.objects.filter(sweet_id=sweet_id).update(
+            quantity=Case(
+                *[
+                    When(shard=shard, then=Value(share))
+                    for shard, share in enumerate(split_stock(quantity, shard_count))
+                ],
+                default=Value(0),
+            )
+        )
+
+
+def shard_stock(sweet_id, shard_count):
+    """
+    Spread the whole stock of a sweet over `shard_count` counter rows.
+
+    A shard_count of 0 folds the stock back into the sweet's own row.
+    """
+    with transaction.atomic():
+        try:
+            sweet = Sweet.objects.select_for_update().get(id=sweet_id)
+        except Sweet.DoesNotExist:
+            raise Http404("No Sweet matches the given query.")
+
+        shards = SweetStockShard.objects.filter(sweet=sweet)
+        total = sweet.quantity + sum(shards.values_list("quantity", flat=True))
+        shards.delete()
+
+        if shard_count:
+            SweetStockShard.objects.bulk_create([
+                SweetStockShard(sweet=sweet, shard=shard, quantity=share)
+                for shard, share in enumerate(split_stock(total, shard_count))
+            ])
+
+        sweet.quantity = 0 if shard_count else total
+        sweet.shard_count = shard_count
+        sweet.save(update_fields=["quantity", "shard_count", "updated_at"])
+
+    return sweet
+
+
+def checkout(items, user=None):
+    """
+    Purchase several sweets all-or-nothing in one transaction.
+
+    - Lines for the same sweet are merged
+    - Rows are locked in ascending id order, so concurrent carts
+      always queue up in the same order and cannot deadlock
+    - Every line is checked before anything is written; if any line
+      fails, OutOfStock is raised with the failed lines and nothing
+      is changed
+    - All decrements are applied with a single UPDATE; sharded
+      sweets also lock their shards and are taken from them
+    - Every line is recorded in the ledger with one bulk INSERT
+    - Sweets taken to their reorder threshold are added to the
+      low-stock watch list
+    """
+    requested = {}
+    for item in items:
+        sweet_id = item["sweet_id"]
+        requested[sweet_id] = requested.get(sweet_id, 0) + item["quantity"]
+
+    with transaction.atomic():
+        rows = list(
+            Sweet.objects.select_for_update()
+            .filter(id__in=requested)
+            .order_by("id")
+            .values_list("id", "quantity", "shard_count", "price", "category", "reorder_threshold")
+        )
+        stock = {row[0]: row[1] for row in rows}
+        sharded = [row[0] for row in rows if row[2]]
+
+        shards = lock_shards(sharded) if sharded else {}
+        for sweet_id, sweet_shards in shards.items():
+            stock[sweet_id] += sum(available for _, available in sweet_shards)
+
+        failures = []
+        for sweet_id, quantity in sorted(requested.items()):
+            if sweet_id not in stock:
+                failures.append({
+                    "sweet_id": sweet_id,
+                    "requested": quantity,
+                    "available": 0,
+                    "detail": "Sweet not found",
+                })
+            elif stock[sweet_id] < quantity:
+                failures.append({
+                    "sweet_id": sweet_id,
+                    "requested": quantity,
+                    "available": stock[sweet_id],
+                    "detail": "Sweet is out of stock",
+                })
+
+        if failures:
+            raise OutOfStock(failures)
+
+        single = {
+            sweet_id: quantity
+            for sweet_id, quantity in requested.items()
+            if sweet_id not in sharded
+        }
+
+        if single:
+            Sweet.objects.filter(id__in=single).update(
+                quantity=F("quantity") - Case(
+                    *[
+                        When(id=sweet_id, then=Value(quantity))
+                        for sweet_id, quantity in single.items()
+                    ]
+                ),
+                updated_at=Now(),
+            )
+
+        for sweet_id in sharded:
+            take_locked(sweet_id, requested[sweet_id], shards.get(sweet_id, []))
+
+        record_movements(
+            StockMovement.PURCHASE,
+            [
+                (sweet_id, requested[sweet_id], price, category)
+                for sweet_id, _, _, price, category, _ in rows
+            ],
+            user,
+        )
+
+        crossed = [
+            sweet_id
+            for sweet_id, *_, threshold in rows
+            if crossed_below(stock[sweet_id], requested[sweet_id], threshold)
+        ]
+        if crossed:
+            watch_low_stock(crossed)
+
+        invalidate_catalog()
+
+    return [
+        {"sweet_id": sweet_id, "quantity": quantity}
+        for sweet_id, quantity in sorted(requested.items())
+    ]
+
+
+def bulk_update_sweets(rows, user=None, batch_size=1000):
+    """
+    Restock and/or reprice many sweets at once, all-or-nothing.
+
+    `rows` are dicts with sweet_id, quantity_delta (>= 0) and price
+    (None keeps the current price).
+
+    - Every row is checked before anything is written; if a sweet is
+      missing or listed twice, InvalidBulkUpdate is raised with the
+      failed rows and nothing is changed
+    - Rows are locked in ascending id order, like checkout()
+    - Each batch is applied with one UPDATE joined to a VALUES list
+    - Restocks are recorded in the ledger at the new price; on a
+      sharded sweet they go to the sweet row, which is sold from
+      after its shards
+    - Sweets restocked above their reorder threshold leave the
+      low-stock watch list
+
+    Returns a result per row, in input order, with the new stock and price.
+    """
+    seen = set()
+    failures = []
+    for index, row in enumerate(rows):
+        if row["sweet_id"] in seen:
+            failures.append({
+                "row": index,
+                "sweet_id": row["sweet_id"],
+                "detail": "Sweet is listed more than once",
+            })
+        seen.add(row["sweet_id"])
+
+    ids = sorted(seen)
+
+    with transaction.atomic():
+        current = {}
+        for start in range(0, len(ids), batch_size):
+            current.update(
+                (sweet_id, (stock, price, category, threshold))
+                for sweet_id, stock, price, category, threshold in Sweet.objects.with_stock()
+                .select_for_update()
+                .filter(id__in=ids[start:start + batch_size])
+                .order_by("id")
+                .values_list("id", "stock", "price", "category", "reorder_threshold")
+            )
+
+        for index, row in enumerate(rows):
+            if row["sweet_id"] not in current:
+                failures.append({
+                    "row": index,
+                    "sweet_id": row["sweet_id"],
+                    "detail": "Sweet not found",
+                })
+
+        if failures:
+            raise InvalidBulkUpdate(sorted(failures, key=lambda failure: failure["row"]))
+
+        now = timezone.now()
+        for start in range(0, len(rows), batch_size):
+            apply_bulk_update(rows[start:start + batch_size], now)
+
+        results = []
+        restocks = []
+        restocked = []
+        for row in rows:
+            stock, price, category, threshold = current[row["sweet_id"]]
+            price = row["price"] if row["price"] is not None else price
+
+            if row["quantity_delta"]:
+                restocks.append((row["sweet_id"], row["quantity_delta"], price, category))
+
+            if crossed_above(stock, row["quantity_delta"], threshold):
+                restocked.append(row["sweet_id"])
+
+            results.append({
+                "sweet_id": row["sweet_id"],
+                "quantity": stock + row["quantity_delta"],
+                "price": price,
+            })
+
+        record_movements(StockMovement.RESTOCK, restocks, user)
+        if restocked:
+            unwatch_low_stock(restocked)
+
+        invalidate_catalog()
+
+    return results
+
+
+def apply_bulk_update(rows, now):
+    """
+    Apply one batch of bulk update rows with a single UPDATE ... FROM
+    a VALUES list (Postgres; SQLite 3.33+).
+    """
+    quote = connection.ops.quote_name
+    table = quote(Sweet._meta.db_table)
+    values = ", ".join(
+        ["(CAST(%s AS BIGINT), CAST(%s AS INTEGER), CAST(%s AS NUMERIC(8, 2)))"] * len(rows)
+    )
+    params = [
+        value
+        for row in rows
+        for value in (row["sweet_id"], row["quantity_delta"], row["price"])
+    ]
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"WITH changes (id, quantity_delta, price) AS (VALUES {values}) "
+            f"UPDATE {table} SET "
+            f"{quote('quantity')} = {table}.{quote('quantity')} + changes.quantity_delta, "
+            f"{quote('price')} = COALESCE(changes.price, {table}.{quote('price')}), "
+            f"{quote('updated_at')} = %s "
+            f"FROM changes WHERE {table}.{quote('id')} = changes.id",
+            params + [connection.ops.adapt_datetimefield_value(now)],
+        )
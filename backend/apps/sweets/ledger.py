@@ -0,0 +1,186 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, IntegerField, Max, Min, Subquery, Sum, Value, When
+from django.db.models.functions import TruncDay, TruncHour
+from django.utils import timezone
+
+from apps.sweets.models import (
+    CategorySalesRollup,
+    RollupWatermark,
+    SalesRollup,
+    StockMovement,
+    Sweet,
+    SweetSalesRollup,
+)
+
+
+WATERMARK_NAME = "sales"
+TRUNCATE = {
+    SalesRollup.HOUR: TruncHour,
+    SalesRollup.DAY: TruncDay,
+}
+TOTALS = {
+    "units_sold": Sum(
+        Case(When(kind=StockMovement.PURCHASE, then=F("quantity")), default=Value(0)),
+        output_field=IntegerField(),
+    ),
+    "revenue": Sum(
+        Case(
+            When(kind=StockMovement.PURCHASE, then=F("quantity") * F("unit_price")),
+            default=Value(0),
+            output_field=DecimalField(max_digits=14, decimal_places=2),
+        ),
+    ),
+    "units_restocked": Sum(
+        Case(When(kind=StockMovement.RESTOCK, then=F("quantity")), default=Value(0)),
+        output_field=IntegerField(),
+    ),
+}
+
+
+def record_movement(kind, sweet_id, quantity, user=None):
+    """
+    Append one ledger row. Price and category are read from the sweet
+    by the INSERT itself, so this is a single statement.
+
+    Call it inside the transaction that changes the stock.
+    """
+    sweet = Sweet.objects.filter(id=sweet_id)
+
+    StockMovement.objects.create(
+        kind=kind,
+        sweet_id=sweet_id,
+        quantity=quantity,
+        user_id=getattr(user, "pk", None),
+        unit_price=Subquery(sweet.values("price")[:1]),
+        category=Subquery(sweet.values("category")[:1]),
+    )
+
+
+def record_movements(kind, rows, user=None):
+    """
+    Append several ledger rows at once.
+
+    `rows` are (sweet_id, quantity, unit_price, category) tuples,
+    read by the caller while it held the sweet rows locked.
+    """
+    StockMovement.objects.bulk_create([
+        StockMovement(
+            kind=kind,
+            sweet_id=sweet_id,
+            quantity=quantity,
+            user_id=getattr(user, "pk", None),
+            unit_price=unit_price,
+            category=category,
+        )
+        for sweet_id, quantity, unit_price, category in rows
+    ])
+
+
+def refresh_sales_rollups(settle_seconds=60, batch_size=50000):
+    """
+    Fold new ledger rows into the hourly and daily rollups.
+
+    - Only rows older than `settle_seconds` are folded, so a purchase
+      whose transaction is still open cannot be skipped past
+    - The batch stops below the lowest id that is not settled yet, so
+      a row that got a lower id but a later created_at (a late commit,
+      or a skewed app host clock) is folded by a later run
+    - At most `batch_size` rows are folded per call; they are grouped
+      per bucket and per sweet / category, and each group is added to
+      its rollup row
+    - The watermark row is locked for the whole run, so concurrent
+      refreshes queue up instead of double counting
+
+    Returns the number of ledger rows folded.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settle_seconds)
+
+    with transaction.atomic():
+        watermark, _ = RollupWatermark.objects.get_or_create(name=WATERMARK_NAME)
+        watermark = RollupWatermark.objects.select_for_update().get(pk=watermark.pk)
+
+        pending = StockMovement.objects.filter(id__gt=watermark.last_id)
+        unsettled = pending.filter(created_at__gte=cutoff).aggregate(
+            first_id=Min("id")
+        )["first_id"]
+        if unsettled is not None:
+            pending = pending.filter(id__lt=unsettled)
+
+        last_id = pending.order_by("id")[:batch_size].aggregate(last_id=Max("id"))["last_id"]
+
+        if last_id is None:
+            return 0
+
+        movements = StockMovement.objects.filter(
+            id__gt=watermark.last_id,
+            id__lte=last_id,
+        )
+
+        for period, truncate in TRUNCATE.items():
+            grouped = movements.annotate(bucket=truncate("created_at")).order_by()
+
+            merge_rollups(
+                SweetSalesRollup,
+                period,
+                "sweet_id",
+                grouped.values("bucket", "sweet_id").annotate(**TOTALS),
+            )
+            merge_rollups(
+                CategorySalesRollup,
+                period,
+                "category",
+                grouped.values("bucket", "category").annotate(**TOTALS),
+            )
+
+        folded = movements.count()
+        watermark.last_id = last_id
+        watermark.save(update_fields=["last_id", "updated_at"])
+
+    return folded
+
+
+def merge_rollups(model, period, key, groups):
+    """
+    Add grouped totals to the matching rollup rows, creating the
+    missing ones. Reads the touched rows in one query.
+    """
+    groups = list(groups)
+
+    if not groups:
+        return
+
+    existing = {
+        (getattr(rollup, key), rollup.bucket): rollup
+        for rollup in model.objects.filter(
+            period=period,
+            bucket__in={group["bucket"] for group in groups},
+            **{f"{key}__in": {group[key] for group in groups}},
+        )
+    }
+
+    updates = []
+    creates = []
+    for group in groups:
+        rollup = existing.get((group[key], group["bucket"]))
+
+        if rollup is None:
+            creates.append(model(
+                period=period,
+                bucket=group["bucket"],
+                units_sold=group["units_sold"],
+                revenue=group["revenue"],
+                units_restocked=group["units_restocked"],
+                **{key: group[key]},
+            ))
+        else:
+            rollup.units_sold += group["units_sold"]
+            rollup.revenue += group["revenue"]
+            rollup.units_restocked += group["units_restocked"]
+            updates.append(rollup)
+
+    if updates:
+        model.objects.bulk_update(updates, ["units_sold", "revenue", "units_restocked"])
+    if creates:
+        model.objects.bulk_create(creates)
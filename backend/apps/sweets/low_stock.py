@@ -0,0 +1,165 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from apps.sweets.models import LowStockSweet, Sweet
+
+
+logger = logging.getLogger(__name__)
+
+# How far back each reconcile pass looks before the previous one
+# started, to cover stock changes that committed late.
+RECONCILE_OVERLAP = timedelta(seconds=60)
+
+
+def crosses_below(quantity):
+    """
+    Rows whose own quantity falls to the threshold or below when
+    `quantity` units are taken (and was above it before).
+    """
+    return Q(
+        reorder_threshold__gt=0,
+        quantity__gt=F("reorder_threshold"),
+        quantity__lte=F("reorder_threshold") + quantity,
+    )
+
+
+def crosses_above(quantity):
+    """
+    Rows whose own quantity rises above the threshold when `quantity`
+    units are added (and was at or below it before).
+    """
+    return Q(
+        reorder_threshold__gt=0,
+        quantity__lte=F("reorder_threshold"),
+        quantity__gt=F("reorder_threshold") - quantity,
+    )
+
+
+def crossed_below(stock, taken, threshold):
+    return threshold > 0 and stock > threshold >= stock - taken
+
+
+def crossed_above(stock, added, threshold):
+    return threshold > 0 and stock <= threshold < stock + added
+
+
+def watch_low_stock(sweet_ids):
+    """
+    Put sweets on the watch list; sweets already on it keep their row.
+    Call it inside the transaction that changes the stock.
+    """
+    LowStockSweet.objects.bulk_create(
+        [LowStockSweet(sweet_id=sweet_id) for sweet_id in sweet_ids],
+        ignore_conflicts=True,
+    )
+
+
+def unwatch_low_stock(sweet_ids):
+    """
+    Take sweets off the watch list once they are restocked above
+    their threshold.
+    """
+    LowStockSweet.objects.filter(sweet_id__in=sweet_ids).delete()
+
+
+def reconcile_low_stock(since=None):
+    """
+    Bring the watch list up to date for stock changes that are not
+    tracked inline: purchases from shards, group-committed batches,
+    threshold edits and admin edits.
+
+    - Only watched sweets are read, through a partial index
+    - With `since`, only sweets changed after it, plus sharded sweets
+      (whose shard purchases leave the sweet row untouched)
+    - Listed sweets whose threshold was cleared are always removed;
+      they are found from the (small) watch list, not the catalog
+
+    Returns (added, removed).
+    """
+    watched = Sweet.objects.with_stock().filter(reorder_threshold__gt=0)
+    if since is not None:
+        watched = watched.filter(Q(updated_at__gte=since) | Q(shard_count__gt=0))
+
+    low = set()
+    checked = set()
+    for sweet_id, stock, threshold in watched.values_list("id", "stock", "reorder_threshold"):
+        checked.add(sweet_id)
+        if stock <= threshold:
+            low.add(sweet_id)
+
+    listed = set(LowStockSweet.objects.values_list("sweet_id", flat=True))
+    if since is None:
+        # A full pass also drops sweets that are no longer watched
+        removed = listed - low
+    else:
+        cleared = LowStockSweet.objects.filter(sweet__reorder_threshold=0)
+        removed = ((listed & checked) - low) | set(cleared.values_list("sweet_id", flat=True))
+    added = low - listed
+
+    with transaction.atomic():
+        watch_low_stock(added)
+        unwatch_low_stock(removed)
+
+    return len(added), len(removed)
+
+
+def log_notification(sweets):
+    """
+    Default low-stock notifier: one warning line per batch.
+    """
+    logger.warning(
+        "Low stock: %s",
+        ", ".join(
+            f"{sweet['name']} ({sweet['stock']}/{sweet['reorder_threshold']})"
+            for sweet in sweets
+        ),
+    )
+
+
+def sweep_low_stock(batch_size=500):
+    """
+    Report sweets that crossed their threshold since the last sweep.
+
+    Pending rows are claimed in batches with SKIP LOCKED, so several
+    sweepers never report the same sweet, and purchases never wait
+    on a sweep. Each batch is passed to the SWEETS_LOW_STOCK_NOTIFIER
+    callable as one list, then marked as notified.
+
+    Returns the number of sweets reported.
+    """
+    notify = import_string(settings.SWEETS_LOW_STOCK_NOTIFIER)
+    total = 0
+
+    while True:
+        with transaction.atomic():
+            pending = list(
+                LowStockSweet.objects.select_for_update(skip_locked=True)
+                .filter(notified_at__isnull=True)
+                .order_by("crossed_at")
+                .values_list("sweet_id", flat=True)[:batch_size]
+            )
+
+            if not pending:
+                return total
+
+            sweets = list(
+                Sweet.objects.with_stock()
+                .filter(id__in=pending)
+                .order_by("id")
+                .values("id", "name", "category", "stock", "reorder_threshold")
+            )
+            notify(sweets)
+
+            LowStockSweet.objects.filter(sweet_id__in=pending).update(
+                notified_at=timezone.now()
+            )
+            total += len(pending)
+
+        if len(pending) < batch_size:
+            return total
@@ -0,0 +1,90 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.sweets.importers import (
+    FORMATS,
+    MAX_REPORTED_ERRORS,
+    ImportFormatError,
+    detect_format,
+    iter_rows,
+)
+from apps.sweets.inventory import InvalidBulkUpdate, bulk_update_sweets
+from apps.sweets.serializers import BulkUpdateRowSerializer
+
+
+class Command(BaseCommand):
+    """
+    Restock and reprice sweets from a CSV or JSONL file.
+
+    Each record has sweet_id, quantity_delta and/or price. The whole
+    file is validated first; it is applied all-or-nothing.
+
+    Usage:
+        python manage.py bulk_update_sweets stock.csv
+        python manage.py bulk_update_sweets - --format jsonl < stock.jsonl
+    """
+
+    help = "Bulk restock / reprice sweets from a CSV or JSONL file ('-' reads stdin)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=FORMATS)
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        path = options["path"]
+
+        try:
+            fmt = detect_format(path, options["format"])
+        except ImportFormatError as exc:
+            raise CommandError(str(exc))
+
+        if path == "-":
+            line_numbers, rows, errors = self.read_rows(sys.stdin, fmt)
+        else:
+            try:
+                with open(path, encoding="utf-8-sig", newline="") as lines:
+                    line_numbers, rows, errors = self.read_rows(lines, fmt)
+            except OSError as exc:
+                raise CommandError(str(exc))
+
+        if not errors and not rows:
+            raise CommandError("No rows to apply.")
+
+        if not errors:
+            try:
+                bulk_update_sweets(rows, batch_size=options["batch_size"])
+            except InvalidBulkUpdate as exc:
+                errors = [
+                    (line_numbers[failure["row"]], failure["detail"])
+                    for failure in exc.failures
+                ]
+
+        if errors:
+            for line, error in errors[:MAX_REPORTED_ERRORS]:
+                self.stderr.write(f"line {line}: {error}")
+            raise CommandError(f"{len(errors)} invalid rows; nothing was changed.")
+
+        self.stdout.write(self.style.SUCCESS(f"Updated {len(rows)} sweets."))
+
+    def read_rows(self, lines, fmt):
+        """
+        Validate every record; return (line_numbers, rows, errors).
+        """
+        line_numbers = []
+        rows = []
+        errors = []
+
+        for line_number, row, error in iter_rows(lines, fmt):
+            if error is None:
+                serializer = BulkUpdateRowSerializer(data=row)
+                if serializer.is_valid():
+                    line_numbers.append(line_number)
+                    rows.append(serializer.validated_data)
+                    continue
+                error = serializer.errors
+
+            errors.append((line_number, error))
+
+        return line_numbers, rows, errors
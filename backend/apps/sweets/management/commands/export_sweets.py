@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from apps.sweets.exporters import FORMATS, iter_export
+
+
+class Command(BaseCommand):
+    """
+    Stream the whole sweet catalog as NDJSON or CSV.
+
+    Usage:
+        python manage.py export_sweets > catalog.ndjson
+        python manage.py export_sweets --format csv --output catalog.csv
+    """
+
+    help = "Export all sweets as NDJSON or CSV (stdout by default)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=FORMATS, default="ndjson")
+        parser.add_argument("--output", help="File to write instead of stdout.")
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        chunks = iter_export(options["format"], chunk_size=options["chunk_size"])
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8", newline="") as output:
+                output.writelines(chunks)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
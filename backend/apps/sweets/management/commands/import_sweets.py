@@ -0,0 +1,66 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.sweets.importers import FORMATS, ImportFormatError, detect_format, import_sweets
+
+
+class Command(BaseCommand):
+    """
+    Stream sweets from a CSV or JSONL file into the catalog.
+
+    Usage:
+        python manage.py import_sweets catalog.csv
+        python manage.py import_sweets - --format jsonl --upsert < catalog.jsonl
+    """
+
+    help = "Bulk import sweets from a CSV or JSONL file ('-' reads stdin)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=FORMATS)
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--upsert",
+            action="store_true",
+            help="Update sweets whose name already exists instead of adding duplicates.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+
+        try:
+            fmt = detect_format(path, options["format"])
+        except ImportFormatError as exc:
+            raise CommandError(str(exc))
+
+        if path == "-":
+            result = self.run_import(sys.stdin, fmt, options)
+        else:
+            try:
+                with open(path, encoding="utf-8-sig", newline="") as lines:
+                    result = self.run_import(lines, fmt, options)
+            except OSError as exc:
+                raise CommandError(str(exc))
+
+        for error in result["errors"]:
+            self.stderr.write(f"line {error['line']}: {error['errors']}")
+
+        if "detail" in result:
+            raise CommandError(
+                f"{result['detail']}; stopped after creating {result['created']} "
+                f"and updating {result['updated']} sweets."
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {result['created']}, updated {result['updated']}, "
+            f"failed {result['failed']}."
+        ))
+
+    def run_import(self, lines, fmt, options):
+        return import_sweets(
+            lines,
+            fmt,
+            batch_size=options["batch_size"],
+            upsert=options["upsert"],
+        )
@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.sweets.ledger import refresh_sales_rollups
+
+
+class Command(BaseCommand):
+    """
+    Fold new ledger rows into the hourly and daily sales rollups.
+
+    Usage:
+        python manage.py refresh_sales_rollups              # once, e.g. from cron
+        python manage.py refresh_sales_rollups --interval 60
+    """
+
+    help = "Incrementally refresh the sales rollups from the stock ledger."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--settle-seconds",
+            type=int,
+            default=60,
+            help="Only fold ledger rows at least this old.",
+        )
+        parser.add_argument("--batch-size", type=int, default=50000)
+        parser.add_argument(
+            "--interval",
+            type=float,
+            help="Keep running, refreshing every INTERVAL seconds.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            folded = self.refresh(options)
+            self.stdout.write(f"Folded {folded} ledger rows.")
+
+            if not options["interval"]:
+                return
+
+            time.sleep(options["interval"])
+
+    def refresh(self, options):
+        total = 0
+
+        while True:
+            folded = refresh_sales_rollups(
+                settle_seconds=options["settle_seconds"],
+                batch_size=options["batch_size"],
+            )
+            total += folded
+
+            if folded < options["batch_size"]:
+                return total
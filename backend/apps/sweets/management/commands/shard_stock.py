@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.http import Http404
+
+from apps.sweets.inventory import shard_stock
+
+
+class Command(BaseCommand):
+    """
+    Turn sharded inventory on or off for a sweet.
+
+    Usage:
+        python manage.py shard_stock 42 --shards 16   # before a promotion
+        python manage.py shard_stock 42 --shards 0    # back to a single row
+    """
+
+    help = "Spread a sweet's stock over N counter rows (0 disables sharding)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("sweet_id", type=int)
+        parser.add_argument("--shards", type=int, required=True)
+
+    def handle(self, *args, **options):
+        if not 0 <= options["shards"] <= 1000:
+            raise CommandError("--shards must be between 0 and 1000.")
+
+        try:
+            sweet = shard_stock(options["sweet_id"], options["shards"])
+        except Http404 as exc:
+            raise CommandError(str(exc))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{sweet.name}: {sweet.shard_count} shards."
+        ))
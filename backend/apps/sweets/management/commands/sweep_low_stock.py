@@ -0,0 +1,49 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.sweets.low_stock import RECONCILE_OVERLAP, reconcile_low_stock, sweep_low_stock
+
+
+class Command(BaseCommand):
+    """
+    Report sweets that crossed their reorder threshold.
+
+    Each pass first reconciles the watch list for stock changes that
+    are not tracked inline (the first pass checks every watched sweet,
+    later ones only recently changed and sharded sweets), then sends
+    the new crossings to SWEETS_LOW_STOCK_NOTIFIER in batches.
+
+    Usage:
+        python manage.py sweep_low_stock                # once, e.g. from cron
+        python manage.py sweep_low_stock --interval 60
+    """
+
+    help = "Reconcile the low-stock watch list and notify about new crossings."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=settings.SWEETS_LOW_STOCK_BATCH_SIZE)
+        parser.add_argument(
+            "--interval",
+            type=float,
+            help="Keep running, sweeping every INTERVAL seconds.",
+        )
+
+    def handle(self, *args, **options):
+        since = None
+
+        while True:
+            started = timezone.now()
+            added, removed = reconcile_low_stock(since)
+            notified = sweep_low_stock(options["batch_size"])
+            self.stdout.write(
+                f"Reconciled watch list (+{added}/-{removed}); notified {notified} sweets."
+            )
+
+            if not options["interval"]:
+                return
+
+            since = started - RECONCILE_OVERLAP
+            time.sleep(options["interval"])
@@ -0,0 +1,37 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Trigram GIN indexes backing sweet search.
+
+    The indexes are built on UPPER(...) because that is the expression
+    Django generates for icontains, so both the partial-match filters
+    and the ranked `q` search can use them. They are created
+    concurrently to avoid locking a large table.
+    """
+
+    atomic = False
+
+    dependencies = [
+        ("sweets", "0001_initial"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunSQL(
+            sql=(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS sweet_name_trgm_idx "
+                "ON sweets_sweet USING gin (UPPER(name) gin_trgm_ops);"
+            ),
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS sweet_name_trgm_idx;",
+        ),
+        migrations.RunSQL(
+            sql=(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS sweet_category_trgm_idx "
+                "ON sweets_sweet USING gin (UPPER(category) gin_trgm_ops);"
+            ),
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS sweet_category_trgm_idx;",
+        ),
+    ]
@@ -0,0 +1,31 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    B-tree indexes matching the sweet query shapes.
+
+    Built concurrently so the table stays writable while they are created.
+    """
+
+    atomic = False
+
+    dependencies = [
+        ('sweets', '0002_sweet_trigram_indexes'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='sweet',
+            index=models.Index(fields=['category', 'price'], name='sweet_category_price_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='sweet',
+            index=models.Index(fields=['created_at', 'id'], name='sweet_created_at_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='sweet',
+            index=models.Index(condition=models.Q(('quantity__gt', 0)), fields=['created_at', 'id'], name='sweet_in_stock_idx'),
+        ),
+    ]
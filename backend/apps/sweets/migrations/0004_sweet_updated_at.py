@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sweets', '0003_sweet_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sweet',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,29 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sweets', '0004_sweet_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sweet',
+            name='shard_count',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='SweetStockShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.PositiveSmallIntegerField()),
+                ('quantity', models.PositiveIntegerField(default=0)),
+                ('sweet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_shards', to='sweets.sweet')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('sweet', 'shard'), name='sweet_stock_shard_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+import django.db.models.deletion
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Low-stock watch list and reorder thresholds.
+
+    The index on sweets_sweet is built concurrently so the table stays
+    writable while it is created.
+    """
+
+    atomic = False
+
+    dependencies = [
+        ('sweets', '0006_stock_ledger_and_sales_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LowStockSweet',
+            fields=[
+                ('sweet', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='low_stock', serialize=False, to='sweets.sweet')),
+                ('crossed_at', models.DateTimeField(auto_now_add=True)),
+                ('notified_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='sweet',
+            name='reorder_threshold',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        AddIndexConcurrently(
+            model_name='sweet',
+            index=models.Index(condition=models.Q(('reorder_threshold__gt', 0)), fields=['updated_at'], name='sweet_watched_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lowstocksweet',
+            index=models.Index(condition=models.Q(('notified_at__isnull', True)), fields=['crossed_at'], name='low_stock_pending_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Partial index over sharded sweets.
+
+    Built concurrently so the table stays writable while it is created.
+    """
+
+    atomic = False
+
+    dependencies = [
+        ('sweets', '0007_low_stock_watchlist'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='sweet',
+            index=models.Index(condition=models.Q(('shard_count__gt', 0)), fields=['id'], name='sweet_sharded_idx'),
+        ),
+    ]
@@ -1,17 +1,227 @@
+from django.conf import settings
 from django.db import models
+from django.db.models import Case, F, OuterRef, Subquery, Sum, When
+from django.db.models.functions import Coalesce
+
+
+class SweetQuerySet(models.QuerySet):
+    def with_stock(self):
+        """
+        Annotate `stock`: the sellable quantity of each sweet.
+
+        For a sharded sweet that is its own quantity plus the sum of
+        its shard counters; the subquery only runs for sharded sweets.
+        """
+        shard_total = (
+            SweetStockShard.objects.filter(sweet=OuterRef("pk"))
+            .order_by()
+            .values("sweet")
+            .annotate(total=Sum("quantity"))
+            .values("total")
+        )
+
+        return self.annotate(
+            stock=Case(
+                When(shard_count=0, then=F("quantity")),
+                default=F("quantity") + Coalesce(Subquery(shard_total), 0),
+            )
+        )
 
 
 class Sweet(models.Model):
     """
     Represents a sweet item in the shop inventory.
+
+    Hot sweets can be sharded (see apps.sweets.inventory.shard_stock):
+    their stock is then spread over `shard_count` SweetStockShard rows,
+    so concurrent purchases lock different rows. `quantity` keeps any
+    stock not moved into shards.
+
+    A sweet with a `reorder_threshold` is watched: once its stock falls
+    to the threshold or below it is listed in LowStockSweet.
     """
 
     name = models.CharField(max_length=100)
     category = models.CharField(max_length=100)
     price = models.DecimalField(max_digits=8, decimal_places=2)
     quantity = models.PositiveIntegerField()
+    shard_count = models.PositiveSmallIntegerField(default=0)
+    # 0 means the sweet is not watched for low stock
+    reorder_threshold = models.PositiveIntegerField(default=0)
 
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = SweetQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Exact category lookups (admin filter) with a price range
+            models.Index(fields=["category", "price"], name="sweet_category_price_idx"),
+            # Keyset pagination order for the list and search endpoints
+            models.Index(fields=["created_at", "id"], name="sweet_created_at_id_idx"),
+            # Same order restricted to sweets that can still be bought
+            models.Index(
+                fields=["created_at", "id"],
+                condition=models.Q(quantity__gt=0),
+                name="sweet_in_stock_idx",
+            ),
+            # Sharded sweets, the other branch of the in-stock filter
+            models.Index(
+                fields=["id"],
+                condition=models.Q(shard_count__gt=0),
+                name="sweet_sharded_idx",
+            ),
+            # Recently changed watched sweets, for the low-stock sweeper
+            models.Index(
+                fields=["updated_at"],
+                condition=models.Q(reorder_threshold__gt=0),
+                name="sweet_watched_updated_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.name
+
+
+class SweetStockShard(models.Model):
+    """
+    One stock counter of a sharded sweet.
+    """
+
+    sweet = models.ForeignKey(Sweet, on_delete=models.CASCADE, related_name="stock_shards")
+    shard = models.PositiveSmallIntegerField()
+    quantity = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["sweet", "shard"], name="sweet_stock_shard_unique"),
+        ]
+
+    def __str__(self):
+        return f"{self.sweet_id}#{self.shard}"
+
+
+class LowStockSweet(models.Model):
+    """
+    Watch list of sweets at or below their reorder threshold.
+
+    Rows are added and removed when a stock change crosses the
+    threshold (see apps.sweets.low_stock), never by scanning the
+    catalog. `notified_at` is set once the sweeper has reported it.
+    """
+
+    sweet = models.OneToOneField(
+        Sweet, on_delete=models.CASCADE, primary_key=True, related_name="low_stock"
+    )
+    crossed_at = models.DateTimeField(auto_now_add=True)
+    notified_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Crossings the sweeper has not reported yet
+            models.Index(
+                fields=["crossed_at"],
+                condition=models.Q(notified_at__isnull=True),
+                name="low_stock_pending_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.sweet_id} (low stock)"
+
+
+class StockMovement(models.Model):
+    """
+    Append-only ledger of purchases and restocks.
+
+    Each row is written in the same transaction as the stock change it
+    records. Price and category are copied from the sweet at that
+    moment, so history survives later edits. Rows are never updated;
+    the foreign keys carry no database constraint so deleting a sweet
+    or user leaves its history in place.
+    """
+
+    PURCHASE = "purchase"
+    RESTOCK = "restock"
+    KIND_CHOICES = [(PURCHASE, "Purchase"), (RESTOCK, "Restock")]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    sweet = models.ForeignKey(
+        Sweet, on_delete=models.DO_NOTHING, db_constraint=False, related_name="+"
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        related_name="+",
+    )
+    quantity = models.PositiveIntegerField()
+    unit_price = models.DecimalField(max_digits=8, decimal_places=2)
+    category = models.CharField(max_length=100)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Rollup refresh scans new rows by creation time
+            models.Index(fields=["created_at"], name="stock_movement_created_idx"),
+        ]
+
+
+class SalesRollup(models.Model):
+    """
+    Sales and restock totals per period bucket, maintained
+    incrementally from the ledger by refresh_sales_rollups().
+    """
+
+    HOUR = "hour"
+    DAY = "day"
+    PERIOD_CHOICES = [(HOUR, "Hour"), (DAY, "Day")]
+
+    period = models.CharField(max_length=4, choices=PERIOD_CHOICES)
+    bucket = models.DateTimeField()
+    units_sold = models.PositiveBigIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    units_restocked = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+
+class SweetSalesRollup(SalesRollup):
+    sweet = models.ForeignKey(
+        Sweet, on_delete=models.DO_NOTHING, db_constraint=False, related_name="+"
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["period", "sweet", "bucket"], name="sweet_sales_rollup_unique"
+            ),
+        ]
+        indexes = [
+            # Reports across all sweets for a time range
+            models.Index(fields=["period", "bucket"], name="sweet_sales_rollup_bucket_idx"),
+        ]
+
+
+class CategorySalesRollup(SalesRollup):
+    category = models.CharField(max_length=100)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["period", "category", "bucket"], name="category_sales_rollup_unique"
+            ),
+        ]
+
+
+class RollupWatermark(models.Model):
+    """
+    Last ledger row folded into the rollups, per rollup job.
+    """
+
+    name = models.CharField(max_length=50, unique=True)
+    last_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
@@ -0,0 +1,150 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over sweets ordered by (created_at, id).
+
+    - Each page is fetched with a range condition on the ordering
+      columns, so deep pages cost the same as the first one
+    - Cursors are opaque, URL-safe tokens pointing at the first or
+      last row of the page they came from
+    - The response body stays a plain list; next/prev page URLs are
+      returned in the Link header
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    invalid_cursor_message = "Invalid cursor"
+
+    def get_page_size(self, request):
+        page_size = settings.SWEETS_PAGE_SIZE
+
+        try:
+            requested = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return page_size
+
+        if requested <= 0:
+            return page_size
+        return min(requested, settings.SWEETS_MAX_PAGE_SIZE)
+
+    def encode_cursor(self, sweet, reverse):
+        payload = {
+            "t": sweet.created_at.isoformat(),
+            "i": sweet.id,
+            "r": int(reverse),
+        }
+        raw = json.dumps(payload, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+
+        if not encoded:
+            return None
+
+        try:
+            raw = base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4))
+            payload = json.loads(raw)
+            return (
+                datetime.fromisoformat(payload["t"]),
+                int(payload["i"]),
+                bool(payload["r"]),
+            )
+        except (binascii.Error, ValueError, TypeError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_page_queryset(self, queryset, request):
+        """
+        Return the sliced queryset for the requested page.
+
+        One extra row is fetched to know whether another page exists.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.cursor = self.decode_cursor(request)
+
+        if self.cursor is None:
+            self.reverse = False
+            return queryset.order_by("created_at", "id")[: self.page_size + 1]
+
+        created_at, sweet_id, self.reverse = self.cursor
+
+        if self.reverse:
+            queryset = queryset.filter(
+                Q(created_at__lte=created_at)
+                & (Q(created_at__lt=created_at) | Q(id__lt=sweet_id))
+            ).order_by("-created_at", "-id")
+        else:
+            queryset = queryset.filter(
+                Q(created_at__gte=created_at)
+                & (Q(created_at__gt=created_at) | Q(id__gt=sweet_id))
+            ).order_by("created_at", "id")
+
+        return queryset[: self.page_size + 1]
+
+    def get_page(self, rows):
+        """
+        Trim the fetched rows to a page and work out its neighbours.
+        """
+        rows = list(rows)
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+
+        if self.reverse:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, self.cursor is not None
+
+        self.next_cursor = (
+            self.encode_cursor(rows[-1], reverse=False)
+            if rows and has_next else None
+        )
+        self.previous_cursor = (
+            self.encode_cursor(rows[0], reverse=True)
+            if rows and has_previous else None
+        )
+        return rows
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.get_page(self.get_page_queryset(queryset, request))
+
+    def get_link(self, cursor):
+        if cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_link_header(self):
+        links = []
+
+        next_link = self.get_link(self.next_cursor)
+        if next_link:
+            links.append(f'<{next_link}>; rel="next"')
+
+        previous_link = self.get_link(self.previous_cursor)
+        if previous_link:
+            links.append(f'<{previous_link}>; rel="prev"')
+
+        return ", ".join(links)
+
+    def get_paginated_response(self, data):
+        headers = {}
+        link_header = self.get_link_header()
+
+        if link_header:
+            headers["Link"] = link_header
+
+        return Response(data, headers=headers)
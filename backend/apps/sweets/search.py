@@ -0,0 +1,109 @@
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db.models import Count, F, Q, Value
+from django.db.models.functions import Floor, Greatest, Upper
+
+from apps.sweets.models import SweetStockShard
+
+
+def filter_sweets(queryset, params):
+    """
+    Apply the search filters in `params` to a Sweet queryset.
+
+    - name and category are case-insensitive partial matches; on
+      Postgres they are served by the trigram GIN indexes on
+      UPPER(name) and UPPER(category)
+    - min_price and max_price bound the price range
+    - in_stock=true keeps only sweets with stock left. Unsharded
+      sweets are matched on their own quantity (the partial in-stock
+      index); sharded sweets (their own partial index) on having a
+      non-empty shard. It does not need Sweet.objects.with_stock()
+    """
+    name = params.get("name")
+    category = params.get("category")
+    min_price = params.get("min_price")
+    max_price = params.get("max_price")
+    in_stock = params.get("in_stock")
+
+    if name:
+        queryset = queryset.filter(name__icontains=name)
+
+    if category:
+        queryset = queryset.filter(category__icontains=category)
+
+    if min_price:
+        queryset = queryset.filter(price__gte=min_price)
+
+    if max_price:
+        queryset = queryset.filter(price__lte=max_price)
+
+    if in_stock and in_stock.lower() in ("1", "true", "yes"):
+        stocked_shards = SweetStockShard.objects.filter(quantity__gt=0).values("sweet_id")
+        queryset = queryset.filter(
+            Q(quantity__gt=0) | Q(shard_count__gt=0, id__in=stocked_shards)
+        )
+
+    return queryset
+
+
+def rank_sweets(queryset, term):
+    """
+    Fuzzy-match `term` against sweet names and categories.
+
+    Uses pg_trgm word similarity, so small typos still match, and
+    orders the results best match first. The filter is written against
+    UPPER(...) so Postgres can answer it from the trigram GIN indexes.
+    """
+    queryset = queryset.annotate(
+        name_upper=Upper("name"),
+        category_upper=Upper("category"),
+    )
+
+    return queryset.filter(
+        Q(name_upper__trigram_word_similar=term)
+        | Q(category_upper__trigram_word_similar=term)
+    ).annotate(
+        rank=Greatest(
+            TrigramWordSimilarity(term, "name_upper"),
+            TrigramWordSimilarity(term, "category_upper"),
+        )
+    ).order_by("-rank", "id")
+
+
+def facet_sweets(queryset, bucket_size):
+    """
+    Count the sweets in `queryset` per category and per price bucket.
+
+    One GROUP BY (category, price bucket) query returns every count;
+    category totals and the histogram are summed up from its rows.
+    Bucket n covers prices from n * bucket_size up to, but not
+    including, (n + 1) * bucket_size.
+    """
+    rows = (
+        queryset.order_by()
+        .annotate(price_bucket=Floor(F("price") / Value(bucket_size)))
+        .values("category", "price_bucket")
+        .annotate(count=Count("id"))
+    )
+
+    categories = {}
+    histogram = {}
+    for row in rows:
+        bucket = int(row["price_bucket"])
+        categories[row["category"]] = categories.get(row["category"], 0) + row["count"]
+        histogram[bucket] = histogram.get(bucket, 0) + row["count"]
+
+    return {
+        "total": sum(categories.values()),
+        "categories": [
+            {"category": category, "count": count}
+            for category, count in sorted(categories.items(), key=lambda item: (-item[1], item[0]))
+        ],
+        "price_histogram": [
+            {
+                "min_price": bucket * bucket_size,
+                "max_price": (bucket + 1) * bucket_size,
+                "count": count,
+            }
+            for bucket, count in sorted(histogram.items())
+        ],
+    }
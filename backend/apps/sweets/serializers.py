@@ -1,13 +1,147 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.utils import timezone
 from rest_framework import serializers
-from apps.sweets.models import Sweet
+from apps.sweets.models import SalesRollup, Sweet
 
 
 class SweetSerializer(serializers.ModelSerializer):
     """
     Serializer for Sweet model.
     Handles validation and serialization of sweet data.
+    `reorder_threshold` can be set but is not part of the catalog output;
+    when it is left out, creates use 0 and updates keep the current value.
     """
 
+    reorder_threshold = serializers.IntegerField(
+        min_value=0,
+        max_value=2147483647,
+        required=False,
+        write_only=True,
+    )
+
     class Meta:
         model = Sweet
-        fields = ("id", "name", "category", "price", "quantity")
+        fields = ("id", "name", "category", "price", "quantity", "reorder_threshold")
+
+
+class PurchaseSerializer(serializers.Serializer):
+    """
+    Serializer for a purchase request.
+    Quantity is optional and defaults to a single unit.
+    """
+
+    quantity = serializers.IntegerField(min_value=1, default=1)
+
+
+class CheckoutItemSerializer(serializers.Serializer):
+    """
+    Serializer for a single cart line.
+    """
+
+    sweet_id = serializers.IntegerField(min_value=1)
+    quantity = serializers.IntegerField(min_value=1)
+
+
+class CheckoutSerializer(serializers.Serializer):
+    """
+    Serializer for a cart checkout.
+    Requires at least one line.
+    """
+
+    items = CheckoutItemSerializer(many=True, allow_empty=False)
+
+
+class BulkUpdateRowSerializer(serializers.Serializer):
+    """
+    Serializer for one bulk restock / price update row.
+
+    - quantity_delta: units to add (default 0)
+    - price: new price; blank or missing keeps the current price
+    - At least one of them must change something
+    """
+
+    sweet_id = serializers.IntegerField(min_value=1)
+    quantity_delta = serializers.IntegerField(min_value=0, default=0)
+    price = serializers.DecimalField(
+        max_digits=8,
+        decimal_places=2,
+        min_value=Decimal("0.01"),
+        required=False,
+        allow_null=True,
+        default=None,
+    )
+
+    def to_internal_value(self, data):
+        # CSV files send blank cells as empty strings
+        if hasattr(data, "items"):
+            data = {key: value for key, value in data.items() if value != ""}
+        return super().to_internal_value(data)
+
+    def validate(self, data):
+        if not data["quantity_delta"] and data["price"] is None:
+            raise serializers.ValidationError("Give a quantity_delta or a price.")
+        return data
+
+
+class BulkUpdateSerializer(serializers.Serializer):
+    """
+    Serializer for a bulk restock / price update.
+    Requires at least one row, and at most SWEETS_BULK_UPDATE_MAX_ROWS.
+    """
+
+    rows = BulkUpdateRowSerializer(
+        many=True,
+        allow_empty=False,
+        max_length=settings.SWEETS_BULK_UPDATE_MAX_ROWS,
+    )
+
+
+class FacetSerializer(serializers.Serializer):
+    """
+    Serializer for facet query parameters besides the search filters.
+    bucket_size is the width of each price histogram bucket.
+    """
+
+    bucket_size = serializers.DecimalField(
+        max_digits=8,
+        decimal_places=2,
+        min_value=Decimal("0.01"),
+        default=Decimal("5.00"),
+    )
+
+
+class SalesReportSerializer(serializers.Serializer):
+    """
+    Serializer for sales report query parameters.
+
+    - period: hour or day buckets (default day)
+    - group_by: sweet or category (default category)
+    - start / end: bucket range; defaults to the last 7 days
+      (day) or the last 24 hours (hour)
+    - sweet_id / category: optional filter on the grouping key
+    """
+
+    period = serializers.ChoiceField(choices=SalesRollup.PERIOD_CHOICES, default=SalesRollup.DAY)
+    group_by = serializers.ChoiceField(choices=["sweet", "category"], default="category")
+    start = serializers.DateTimeField(required=False)
+    end = serializers.DateTimeField(required=False)
+    sweet_id = serializers.IntegerField(required=False, min_value=1)
+    category = serializers.CharField(required=False)
+
+    def validate(self, data):
+        """
+        Fill in the default range and check it is not reversed.
+        """
+        end = data.get("end") or timezone.now()
+        span = timedelta(hours=24) if data["period"] == SalesRollup.HOUR else timedelta(days=7)
+        start = data.get("start") or end - span
+
+        if start > end:
+            raise serializers.ValidationError("start must be before end.")
+
+        data["start"] = start
+        data["end"] = end
+        return data
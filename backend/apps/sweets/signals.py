@@ -0,0 +1,15 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.sweets.cache import invalidate_catalog
+from apps.sweets.models import Sweet
+
+
+@receiver(post_save, sender=Sweet)
+@receiver(post_delete, sender=Sweet)
+def sweet_changed(sender, **kwargs):
+    """
+    Invalidate cached catalog responses when a sweet is created,
+    edited (e.g. from the admin) or deleted.
+    """
+    invalidate_catalog()
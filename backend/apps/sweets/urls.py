@@ -1,14 +1,28 @@
 from django.urls import path
 from apps.sweets.views import (
     SweetListCreateView,
+    BulkUpdateSweetsView,
+    CheckoutView,
+    SweetImportView,
+    SweetExportView,
     PurchaseSweetView,
     RestockSweetView,
     SweetSearchView,
+    SalesReportView,
+    SweetFacetsView,
+    LowStockView,
 )
 
 urlpatterns = [
     path("", SweetListCreateView.as_view(), name="sweet-list"),
     path("search/", SweetSearchView.as_view(), name="sweet-search"),
+    path("search/facets/", SweetFacetsView.as_view(), name="sweet-facets"),
+    path("checkout/", CheckoutView.as_view(), name="sweet-checkout"),
+    path("bulk-update/", BulkUpdateSweetsView.as_view(), name="sweet-bulk-update"),
+    path("import/", SweetImportView.as_view(), name="sweet-import"),
+    path("export/", SweetExportView.as_view(), name="sweet-export"),
+    path("sales/", SalesReportView.as_view(), name="sweet-sales"),
+    path("low-stock/", LowStockView.as_view(), name="sweet-low-stock"),
     path("<int:sweet_id>/purchase/", PurchaseSweetView.as_view(), name="sweet-purchase"),
     path("<int:sweet_id>/restock/", RestockSweetView.as_view(), name="sweet-restock"),
 ]
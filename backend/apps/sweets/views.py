@@ -1,39 +1,86 @@
+import io
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
-from django.shortcuts import get_object_or_404
-
-from apps.sweets.models import Sweet
+from django.conf import settings
+from django.http import StreamingHttpResponse
+
+from apps.sweets.models import (
+    CategorySalesRollup,
+    LowStockSweet,
+    RollupWatermark,
+    Sweet,
+    SweetSalesRollup,
+)
+from apps.sweets.batching import purchase_batcher
+from apps.sweets.cache import cached_catalog_response
+from apps.sweets.conditional import conditional_catalog_response
+from apps.sweets.exporters import CONTENT_TYPES, iter_export
+from apps.sweets.importers import ImportFormatError, detect_format, import_sweets
+from apps.sweets.inventory import (
+    InvalidBulkUpdate,
+    OutOfStock,
+    bulk_update_sweets,
+    checkout,
+    purchase_sweet,
+    restock_sweet,
+)
+from apps.sweets.pagination import KeysetPagination
+from apps.sweets.search import facet_sweets, filter_sweets, rank_sweets
+from apps.sweets.ledger import WATERMARK_NAME
+from apps.sweets.serializers import (
+    BulkUpdateSerializer,
+    CheckoutSerializer,
+    FacetSerializer,
+    PurchaseSerializer,
+    SalesReportSerializer,
+    SweetSerializer,
+)
 from apps.accounts.permissions import IsAdminUser
 from apps.accounts.authentication import JWTAuthentication
+from sweetshop.metrics import purchases
 
 
 class SweetListCreateView(APIView):
     """
     GET:
-    - Returns list of all sweets (authenticated users)
+    - Returns one page of sweets (authenticated users)
+    - Pages are ordered by creation time; see KeysetPagination
+    - Responses are cached per catalog version
+    - Supports conditional GET (ETag / Last-Modified)
 
     POST:
-    - Allows admin users to add a new sweet
+    - Allows admin users to add a new sweet, optionally with a
+      reorder_threshold for low-stock alerts
+    - Invalid input returns 400 with the serializer errors
     """
 
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        sweets = Sweet.objects.all()
+        return conditional_catalog_response(
+            request, Sweet.objects.with_stock(), self.build_response
+        )
+
+    def build_response(self, request):
+        paginator = KeysetPagination()
+        sweets = paginator.paginate_queryset(
+            Sweet.objects.with_stock(), request, view=self
+        )
         data = [
             {
                 "id": sweet.id,
                 "name": sweet.name,
                 "category": sweet.category,
                 "price": sweet.price,
-                "quantity": sweet.quantity,
+                "quantity": sweet.stock,
             }
             for sweet in sweets
         ]
-        return Response(data, status=status.HTTP_200_OK)
+        return paginator.get_paginated_response(data)
 
     def post(self, request):
         if not request.user.is_staff:
@@ -42,12 +89,12 @@ class SweetListCreateView(APIView):
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        sweet = Sweet.objects.create(
-            name=request.data["name"],
-            category=request.data["category"],
-            price=request.data["price"],
-            quantity=request.data["quantity"],
-        )
+        serializer = SweetSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        sweet = serializer.save()
 
         return Response(
             {"id": sweet.id, "name": sweet.name},
@@ -59,29 +106,81 @@ class PurchaseSweetView(APIView):
     API endpoint to purchase a sweet.
 
     - Requires authentication
-    - Decreases quantity by 1
+    - Decreases quantity by the requested amount (default 1)
+    - Stock check and decrement happen in one conditional UPDATE
+    - With SWEETS_PURCHASE_BATCHING, concurrent purchases of the same
+      sweet are group-committed (see PurchaseBatcher)
     """
 
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
 
     def post(self, request, sweet_id):
-        sweet = get_object_or_404(Sweet, id=sweet_id)
+        serializer = PurchaseSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        if settings.SWEETS_PURCHASE_BATCHING:
+            purchase = purchase_batcher.purchase
+        else:
+            purchase = purchase_sweet
 
-        if sweet.quantity <= 0:
+        try:
+            purchase(sweet_id, serializer.validated_data["quantity"], request.user)
+        except OutOfStock:
+            purchases.inc("purchase", "out_of_stock")
             return Response(
                 {"detail": "Sweet is out of stock"},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        sweet.quantity -= 1
-        sweet.save()
-
+        purchases.inc("purchase", "success")
         return Response(
             {"message": "Sweet purchased successfully"},
             status=status.HTTP_200_OK
         )
 
+class CheckoutView(APIView):
+    """
+    API endpoint to purchase several sweets in one request.
+
+    - Requires authentication
+    - Accepts a list of {sweet_id, quantity} items
+    - Applies all items or none of them
+    - Reports every item that could not be filled
+    """
+
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = CheckoutSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            items = checkout(serializer.validated_data["items"], request.user)
+        except OutOfStock as exc:
+            purchases.inc("checkout", "out_of_stock")
+            return Response(
+                {
+                    "detail": "Checkout failed",
+                    "failed_items": exc.failures,
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        purchases.inc("checkout", "success")
+        return Response(
+            {
+                "message": "Checkout completed successfully",
+                "items": items,
+            },
+            status=status.HTTP_200_OK
+        )
+
 class RestockSweetView(APIView):
     """
     API endpoint to restock a sweet.
@@ -94,7 +193,6 @@ class RestockSweetView(APIView):
     permission_classes = [IsAuthenticated, IsAdminUser]
 
     def post(self, request, sweet_id):
-        sweet = get_object_or_404(Sweet, id=sweet_id)
         quantity = request.data.get("quantity")
 
         if not quantity or int(quantity) <= 0:
@@ -103,13 +201,52 @@ class RestockSweetView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        sweet.quantity += int(quantity)
-        sweet.save()
+        restock_sweet(sweet_id, int(quantity), request.user)
 
         return Response(
             {"message": "Sweet restocked successfully"},
             status=status.HTTP_200_OK
         )
+
+class BulkUpdateSweetsView(APIView):
+    """
+    API endpoint to restock and reprice many sweets in one request.
+
+    - Admin only
+    - Accepts {"rows": [{sweet_id, quantity_delta, price}, ...]}
+    - Validates every row first; applies all rows or none
+    - Returns the new quantity and price of every row
+    """
+
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def post(self, request):
+        serializer = BulkUpdateSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            results = bulk_update_sweets(serializer.validated_data["rows"], request.user)
+        except InvalidBulkUpdate as exc:
+            return Response(
+                {
+                    "detail": "Bulk update failed",
+                    "failed_rows": exc.failures,
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response(
+            {
+                "message": "Sweets updated successfully",
+                "results": results,
+            },
+            status=status.HTTP_200_OK
+        )
+
+
 class SweetSearchView(APIView):
     """
     API endpoint to search sweets.
@@ -119,30 +256,36 @@ class SweetSearchView(APIView):
     - category
     - min_price
     - max_price
+    - in_stock
+
+    Results are paginated the same way as the sweet list.
+
+    With `q`, sweets are instead fuzzy-matched on name and category,
+    ranked best match first and limited to one page.
+
+    Responses are cached per catalog version and support
+    conditional GET (ETag / Last-Modified).
     """
 
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        sweets = Sweet.objects.all()
-
-        name = request.query_params.get("name")
-        category = request.query_params.get("category")
-        min_price = request.query_params.get("min_price")
-        max_price = request.query_params.get("max_price")
-
-        if name:
-            sweets = sweets.filter(name__icontains=name)
-
-        if category:
-            sweets = sweets.filter(category__icontains=category)
+        return conditional_catalog_response(
+            request,
+            filter_sweets(Sweet.objects.with_stock(), request.query_params),
+            self.build_response,
+        )
 
-        if min_price:
-            sweets = sweets.filter(price__gte=min_price)
+    def build_response(self, request):
+        sweets = filter_sweets(Sweet.objects.with_stock(), request.query_params)
+        paginator = KeysetPagination()
+        term = request.query_params.get("q")
 
-        if max_price:
-            sweets = sweets.filter(price__lte=max_price)
+        if term:
+            sweets = rank_sweets(sweets, term)[: paginator.get_page_size(request)]
+        else:
+            sweets = paginator.paginate_queryset(sweets, request, view=self)
 
         data = [
             {
@@ -150,9 +293,215 @@ class SweetSearchView(APIView):
                 "name": sweet.name,
                 "category": sweet.category,
                 "price": sweet.price,
-                "quantity": sweet.quantity,
+                "quantity": sweet.stock,
+            }
+            for sweet in sweets
+        ]
+
+        if term:
+            return Response(data, status=status.HTTP_200_OK)
+
+        return paginator.get_paginated_response(data)
+
+
+class SweetFacetsView(APIView):
+    """
+    API endpoint for building filter UIs.
+
+    - Accepts the same filters as the search endpoint
+    - Returns the number of matching sweets per category and a price
+      histogram with ?bucket_size= wide buckets (default 5.00)
+    - Computed with one aggregate query and cached per catalog version
+    """
+
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        serializer = FacetSerializer(data=request.query_params)
+
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        bucket_size = serializer.validated_data["bucket_size"]
+
+        return cached_catalog_response(
+            request, lambda request: self.build_response(request, bucket_size)
+        )
+
+    def build_response(self, request, bucket_size):
+        sweets = filter_sweets(Sweet.objects.with_stock(), request.query_params)
+
+        return Response(
+            facet_sweets(sweets, bucket_size),
+            status=status.HTTP_200_OK,
+        )
+
+
+class SweetImportView(APIView):
+    """
+    API endpoint to bulk import sweets from an uploaded file.
+
+    - Admin only
+    - Accepts a CSV or JSONL upload in the `file` field
+    - Format comes from ?file_format= or the file extension
+    - ?upsert=true updates sweets whose name already exists
+    - Returns created/updated/failed counts and per-line errors
+    - A file that cannot be read to the end gives 400 with the same
+      summary (rows before the bad line are imported) and a `detail`
+    """
+
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def post(self, request):
+        upload = request.FILES.get("file")
+
+        if upload is None:
+            return Response(
+                {"detail": "A file upload is required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            fmt = detect_format(upload.name, request.query_params.get("file_format"))
+        except ImportFormatError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        upsert = request.query_params.get("upsert", "").lower() in ("1", "true", "yes")
+        lines = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+
+        result = import_sweets(lines, fmt, upsert=upsert)
+
+        if "detail" in result:
+            return Response(result, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(result, status=status.HTTP_200_OK)
+
+
+class SweetExportView(APIView):
+    """
+    API endpoint to export the whole catalog.
+
+    - Admin only
+    - ?file_format=ndjson (default) or csv
+    - Streams rows from a server-side cursor, so memory stays flat
+      and the first bytes are sent immediately
+    """
+
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def get(self, request):
+        fmt = request.query_params.get("file_format", "ndjson").lower()
+
+        if fmt not in CONTENT_TYPES:
+            return Response(
+                {"detail": "Format must be one of: ndjson, csv."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        response = StreamingHttpResponse(
+            iter_export(fmt),
+            content_type=CONTENT_TYPES[fmt],
+        )
+        response["Content-Disposition"] = f'attachment; filename="sweets.{fmt}"'
+        return response
+
+
+class SalesReportView(APIView):
+    """
+    API endpoint for sales and restock totals over time.
+
+    - Admin only
+    - Query parameters: see SalesReportSerializer
+    - Reads only the rollup tables, never the ledger, so it stays
+      fast however many purchases have been recorded
+    - `refreshed_at` tells how current the rollups are
+    """
+
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def get(self, request):
+        serializer = SalesReportSerializer(data=request.query_params)
+
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        params = serializer.validated_data
+
+        if params["group_by"] == "sweet":
+            key = "sweet_id"
+            rollups = SweetSalesRollup.objects.all()
+            if "sweet_id" in params:
+                rollups = rollups.filter(sweet_id=params["sweet_id"])
+        else:
+            key = "category"
+            rollups = CategorySalesRollup.objects.all()
+            if "category" in params:
+                rollups = rollups.filter(category=params["category"])
+
+        rows = (
+            rollups.filter(
+                period=params["period"],
+                bucket__gte=params["start"],
+                bucket__lte=params["end"],
+            )
+            .order_by("bucket", key)
+            .values("bucket", key, "units_sold", "revenue", "units_restocked")
+        )
+
+        watermark = RollupWatermark.objects.filter(name=WATERMARK_NAME).first()
+
+        return Response(
+            {
+                "period": params["period"],
+                "group_by": params["group_by"],
+                "refreshed_at": watermark.updated_at if watermark else None,
+                "results": list(rows),
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class LowStockView(APIView):
+    """
+    API endpoint listing sweets at or below their reorder threshold.
+
+    - Admin only
+    - Served from the low-stock watch list, which is kept up to date
+      as stock crosses thresholds, so the catalog is never scanned
+    - Oldest crossings first; `notified_at` is null until the
+      sweep_low_stock command has reported the sweet
+    """
+
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def get(self, request):
+        watched = {
+            row["sweet_id"]: row
+            for row in LowStockSweet.objects.values("sweet_id", "crossed_at", "notified_at")
+        }
+        sweets = (
+            Sweet.objects.with_stock()
+            .filter(id__in=watched)
+            .values("id", "name", "category", "stock", "reorder_threshold")
+        )
+
+        results = [
+            {
+                "id": sweet["id"],
+                "name": sweet["name"],
+                "category": sweet["category"],
+                "quantity": sweet["stock"],
+                "reorder_threshold": sweet["reorder_threshold"],
+                "crossed_at": watched[sweet["id"]]["crossed_at"],
+                "notified_at": watched[sweet["id"]]["notified_at"],
             }
             for sweet in sweets
         ]
+        results.sort(key=lambda row: (row["crossed_at"], row["id"]))
 
-        return Response(data, status=status.HTTP_200_OK)
+        return Response({"results": results}, status=status.HTTP_200_OK)
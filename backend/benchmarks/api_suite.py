@@ -0,0 +1,276 @@
+"""
+Load-test the main API endpoints and report latency and throughput.
+
+Seeds the database behind the server (see benchmarks.seed), then drives
+each scenario at each concurrency level against a running server:
+
+    python manage.py runserver --noreload   # or gunicorn -c gunicorn.conf.py
+    python -m benchmarks.api_suite --base-url http://127.0.0.1:8000 \
+        --catalog-size 10000 --users 1000 --concurrency 1,10,50 \
+        --requests 2000 --output results.json
+
+The suite must run with the same settings and database as the server.
+--baseline compares against an earlier results file and exits with
+status 1 if any scenario's p95 latency or rps is worse by more than
+--max-regression (a fraction, default 0.2). Results are JSON.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import urllib.request
+import uuid
+
+from benchmarks.loadgen import run_load
+
+
+SCENARIOS = ("list", "search", "purchase", "restock", "login", "register")
+SEARCH_QUERIES = (
+    "name=Ladoo",
+    "category=Bakery",
+    "min_price=5&max_price=20",
+    "in_stock=true&category=Indian",
+    "name=Kaju&min_price=10",
+)
+
+
+def post_json(url, body, token=None):
+    headers = {"Content-Type": "application/json"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+
+    request = urllib.request.Request(url, data=json.dumps(body).encode(), headers=headers)
+    with urllib.request.urlopen(request) as response:
+        return json.load(response)
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def make_scenario(name, base_url, tokens, sweet_ids, user_count, bust_cache, seed):
+    """
+    Return make_request(client_index, n) for one scenario.
+    """
+    from benchmarks.seed import ADMIN_USERNAME, PASSWORD, user_name
+
+    rng = random.Random(seed)
+    run_id = uuid.uuid4().hex[:8]
+    user_auth = {"Authorization": f"Bearer {tokens['user']}"}
+    admin_auth = {"Authorization": f"Bearer {tokens['admin']}"}
+
+    def read(path, n, client_index):
+        url = base_url + path
+        if bust_cache:
+            url += ("&" if "?" in url else "?") + f"_={run_id}-{client_index}-{n}"
+        return "GET", url, user_auth, None
+
+    def make_request(client_index, n):
+        if name == "list":
+            return read("/api/sweets/", n, client_index)
+
+        if name == "search":
+            return read(f"/api/sweets/search/?{rng.choice(SEARCH_QUERIES)}", n, client_index)
+
+        if name == "purchase":
+            sweet_id = rng.choice(sweet_ids)
+            return "POST", f"{base_url}/api/sweets/{sweet_id}/purchase/", user_auth, {"quantity": 1}
+
+        if name == "restock":
+            sweet_id = rng.choice(sweet_ids)
+            return "POST", f"{base_url}/api/sweets/{sweet_id}/restock/", admin_auth, {"quantity": 1}
+
+        if name == "login":
+            username = user_name(n % user_count) if user_count else ADMIN_USERNAME
+            return "POST", f"{base_url}/api/auth/login/", {}, {
+                "username": username,
+                "password": PASSWORD,
+            }
+
+        if name == "register":
+            return "POST", f"{base_url}/api/auth/register/", {}, {
+                "username": f"bench-reg-{run_id}-{client_index}-{n}",
+                "email": "bench@example.com",
+                "password": PASSWORD,
+            }
+
+        raise ValueError(f"Unknown scenario: {name}")
+
+    return make_request
+
+
+def compare(results, baseline, max_regression):
+    """
+    Return a list of regressions against a baseline results document.
+    """
+    previous = {
+        (r["scenario"], r["concurrency"]): r for r in baseline.get("results", [])
+    }
+    regressions = []
+
+    for result in results:
+        before = previous.get((result["scenario"], result["concurrency"]))
+        if before is None:
+            continue
+
+        p95, old_p95 = result["latency_ms"]["p95"], before["latency_ms"]["p95"]
+        if p95 is not None and old_p95 and p95 > old_p95 * (1 + max_regression):
+            regressions.append(
+                f"{result['scenario']} c={result['concurrency']}: p95 {old_p95}ms -> {p95}ms"
+            )
+
+        if before["rps"] and result["rps"] < before["rps"] * (1 - max_regression):
+            regressions.append(
+                f"{result['scenario']} c={result['concurrency']}: rps {before['rps']} -> {result['rps']}"
+            )
+
+    return regressions
+
+
+async def run_suite(options, tokens, sweet_ids):
+    results = []
+
+    for scenario in options.scenarios.split(","):
+        for concurrency in [int(c) for c in options.concurrency.split(",")]:
+            result = await run_load(
+                scenario,
+                make_scenario(
+                    scenario,
+                    options.base_url,
+                    tokens,
+                    sweet_ids,
+                    options.users,
+                    options.bust_cache,
+                    options.seed,
+                ),
+                concurrency,
+                duration=options.duration,
+                total_requests=options.requests,
+            )
+            ok = sum(
+                count for status, count in result["statuses"].items()
+                if status.startswith("2")
+            )
+            result["non_2xx"] = result["requests"] - ok
+            results.append(result)
+
+            print(
+                f"{scenario:<10} c={concurrency:<5} rps={result['rps']:<10} "
+                f"p50={result['latency_ms']['p50']}ms p95={result['latency_ms']['p95']}ms "
+                f"p99={result['latency_ms']['p99']}ms non_2xx={result['non_2xx']}",
+                file=sys.stderr,
+            )
+
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--catalog-size", type=int, default=10000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--concurrency", default="1,10,50")
+    parser.add_argument("--requests", type=int, help="Requests per scenario and level.")
+    parser.add_argument("--duration", type=float, help="Seconds per scenario and level.")
+    parser.add_argument("--bust-cache", action="store_true")
+    parser.add_argument("--no-seed", action="store_true", help="Reuse existing bench- data.")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed.")
+    parser.add_argument("--output", help="Also write the results to this file.")
+    parser.add_argument("--baseline", help="Earlier results file to compare against.")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    options = parser.parse_args(argv)
+
+    if options.requests is None and options.duration is None:
+        options.requests = 1000
+
+    unknown = set(options.scenarios.split(",")) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "sweetshop.settings")
+
+    import django
+
+    django.setup()
+
+    from apps.sweets.models import Sweet
+    from benchmarks.seed import ADMIN_USERNAME, PASSWORD, PREFIX, seed, user_name
+
+    started = time.perf_counter()
+    if options.no_seed:
+        sweet_ids = list(
+            Sweet.objects.filter(name__startswith=PREFIX).values_list("id", flat=True)
+        )
+    else:
+        sweet_ids = seed(options.catalog_size, options.users, random_seed=options.seed)
+    seed_seconds = time.perf_counter() - started
+
+    if not sweet_ids:
+        parser.error("No bench- sweets found; run without --no-seed first.")
+
+    login_url = f"{options.base_url}/api/auth/login/"
+    tokens = {
+        "user": post_json(login_url, {
+            "username": user_name(0) if options.users else ADMIN_USERNAME,
+            "password": PASSWORD,
+        })["access_token"],
+        "admin": post_json(login_url, {
+            "username": ADMIN_USERNAME,
+            "password": PASSWORD,
+        })["access_token"],
+    }
+
+    results = asyncio.run(run_suite(options, tokens, sweet_ids))
+
+    document = {
+        "benchmark": "api_suite",
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "config": {
+            "base_url": options.base_url,
+            "catalog_size": len(sweet_ids),
+            "users": options.users,
+            "concurrency": options.concurrency,
+            "requests": options.requests,
+            "duration": options.duration,
+            "bust_cache": options.bust_cache,
+            "seed_seconds": round(seed_seconds, 3),
+        },
+        "results": results,
+    }
+
+    regressions = []
+    if options.baseline:
+        with open(options.baseline, encoding="utf-8") as baseline:
+            regressions = compare(results, json.load(baseline), options.max_regression)
+        document["regressions"] = regressions
+
+    output = json.dumps(document, indent=2)
+    sys.stdout.write(output + "\n")
+
+    if options.output:
+        with open(options.output, "w", encoding="utf-8") as results_file:
+            results_file.write(output + "\n")
+
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Compare the sync WSGI endpoints with the native async ASGI endpoints.
+
+Start the same code base twice against the same database, e.g.:
+
+    gunicorn sweetshop.wsgi:application --workers 1 --threads 8 --bind 127.0.0.1:8000
+    uvicorn sweetshop.asgi:application --workers 1 --port 8001
+
+then run:
+
+    python -m benchmarks.asgi_vs_wsgi \
+        --wsgi http://127.0.0.1:8000 --asgi http://127.0.0.1:8001 \
+        --username bench --password BenchPassword123 \
+        --concurrency 10,100,1000 --duration 10 --send-delay 0.2
+
+--send-delay makes every client trickle its request with a pause in
+the middle, which is what pins a thread per request on a sync worker.
+--bust-cache adds a unique query parameter to each read so the
+response cache is bypassed and every request reaches the database.
+Results are printed as one JSON document.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import urllib.request
+
+from benchmarks.loadgen import run_load
+
+
+SCENARIOS = {
+    "list": ("GET", "/api/sweets/", "/api/async/sweets/"),
+    "search": ("GET", "/api/sweets/search/?min_price=1", "/api/async/sweets/search/?min_price=1"),
+    "purchase": ("POST", "/api/sweets/{sweet_id}/purchase/", "/api/async/sweets/{sweet_id}/purchase/"),
+}
+
+
+def login(base_url, username, password):
+    request = urllib.request.Request(
+        f"{base_url}/api/auth/login/",
+        data=json.dumps({"username": username, "password": password}).encode(),
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.load(response)["access_token"]
+
+
+def request_factory(base_url, path, method, token, sweet_id, bust_cache):
+    headers = {"Authorization": f"Bearer {token}"}
+
+    def make_request(client_index, n):
+        url = base_url + path.format(sweet_id=sweet_id)
+        if bust_cache and method == "GET":
+            url += ("&" if "?" in url else "?") + f"_={client_index}-{n}"
+        body = {"quantity": 1} if method == "POST" else None
+        return method, url, headers, body
+
+    return make_request
+
+
+async def compare(options):
+    token = login(options.wsgi, options.username, options.password)
+    results = []
+
+    for scenario in options.scenarios.split(","):
+        method, wsgi_path, asgi_path = SCENARIOS[scenario]
+
+        for concurrency in [int(c) for c in options.concurrency.split(",")]:
+            for server, base_url, path in (
+                ("wsgi", options.wsgi, wsgi_path),
+                ("asgi", options.asgi, asgi_path),
+            ):
+                result = await run_load(
+                    f"{server}:{scenario}",
+                    request_factory(
+                        base_url, path, method, token, options.sweet_id, options.bust_cache
+                    ),
+                    concurrency,
+                    duration=options.duration,
+                    send_delay=options.send_delay,
+                )
+                result["server"] = server
+                results.append(result)
+                print(
+                    f"{result['scenario']:<18} c={concurrency:<5} "
+                    f"rps={result['rps']:<10} p99={result['latency_ms']['p99']}ms "
+                    f"errors={result['errors']}",
+                    file=sys.stderr,
+                )
+
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--wsgi", default="http://127.0.0.1:8000")
+    parser.add_argument("--asgi", default="http://127.0.0.1:8001")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--scenarios", default="list,search")
+    parser.add_argument("--concurrency", default="10,100,1000")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--send-delay", type=float, default=0.0)
+    parser.add_argument("--sweet-id", type=int, default=1)
+    parser.add_argument("--bust-cache", action="store_true")
+    options = parser.parse_args(argv)
+
+    results = asyncio.run(compare(options))
+    json.dump({"benchmark": "asgi_vs_wsgi", "results": results}, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
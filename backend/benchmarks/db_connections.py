@@ -0,0 +1,92 @@
+"""
+Measure per-request database connection overhead.
+
+Replays Django's request lifecycle (request_started -> one query ->
+request_finished) so connection handling behaves exactly as under a
+real server, and reports the latency of each simulated request.
+
+Start a local Postgres, e.g.:
+
+    docker run --rm -d --name sweetshop-db -p 5432:5432 \
+        -e POSTGRES_PASSWORD=postgres postgres:16
+
+and compare the three modes:
+
+    export DB_NAME=postgres DB_USER=postgres DB_PASSWORD=postgres DB_HOST=127.0.0.1
+    DB_CONN_MAX_AGE=0 python -m benchmarks.db_connections   # new connection per request
+    DB_CONN_MAX_AGE=60 python -m benchmarks.db_connections  # persistent connections
+    DB_POOL=true python -m benchmarks.db_connections        # psycopg pool
+
+Results are printed as one JSON document.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=4)
+    options = parser.parse_args(argv)
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "sweetshop.settings")
+
+    import django
+
+    django.setup()
+
+    from django.conf import settings
+    from django.core.signals import request_finished, request_started
+    from django.db import connection
+
+    from benchmarks.loadgen import summarize
+
+    database = settings.DATABASES["default"]
+    if database.get("OPTIONS", {}).get("pool"):
+        mode = "pool"
+    elif database["CONN_MAX_AGE"]:
+        mode = f"persistent ({database['CONN_MAX_AGE']}s)"
+    else:
+        mode = "per-request"
+
+    per_thread = options.requests // options.threads
+
+    def simulate_requests(count):
+        latencies = []
+        for _ in range(count):
+            begin = time.perf_counter()
+            request_started.send(sender=None)
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            request_finished.send(sender=None)
+            latencies.append(time.perf_counter() - begin)
+        connection.close()
+        return latencies
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=options.threads) as executor:
+        batches = list(executor.map(simulate_requests, [per_thread] * options.threads))
+    elapsed = time.perf_counter() - started
+
+    latencies = [latency for batch in batches for latency in batch]
+    result = summarize(
+        f"db_connections:{mode}",
+        latencies,
+        {"ok": len(latencies)},
+        0,
+        elapsed,
+        options.threads,
+    )
+    result["mode"] = mode
+
+    json.dump({"benchmark": "db_connections", "results": [result]}, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Measure rendering and compression cost of a large catalog response.
+
+Builds a list of sweets shaped like the list/search responses (Decimal
+prices included), renders it with DRF's JSONRenderer and with the orjson
+renderer, then compresses the result the way CompressionMiddleware does.
+No database or server is needed:
+
+    python -m benchmarks.json_rendering --items 100000
+
+Every figure is the best of --repeat runs, in CPU milliseconds
+(time.process_time). Results are printed as one JSON document.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from decimal import Decimal
+
+
+CATEGORIES = ["Indian", "Bakery", "Chocolate", "Candy", "Frozen"]
+
+
+def build_items(count, seed):
+    rng = random.Random(seed)
+    return [
+        {
+            "id": index + 1,
+            "name": f"Sweet {index}",
+            "category": rng.choice(CATEGORIES),
+            "price": Decimal(rng.randint(50, 5000)) / 100,
+            "quantity": rng.randint(0, 500),
+        }
+        for index in range(count)
+    ]
+
+
+def best_cpu_ms(func, repeat):
+    """
+    Run func `repeat` times; return (result, best CPU time in ms).
+    """
+    best = None
+    for _ in range(repeat):
+        started = time.process_time()
+        result = func()
+        elapsed = time.process_time() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return result, round(best * 1000, 2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    options = parser.parse_args(argv)
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "sweetshop.settings")
+
+    import django
+
+    django.setup()
+
+    from rest_framework.renderers import JSONRenderer
+
+    from sweetshop import compression
+    from sweetshop.renderers import ORJSONRenderer
+
+    items = build_items(options.items, options.seed)
+    results = []
+    rendered = {}
+
+    for name, renderer in (("drf_json", JSONRenderer()), ("orjson", ORJSONRenderer())):
+        content, cpu_ms = best_cpu_ms(lambda: renderer.render(items), options.repeat)
+        rendered[name] = content
+        results.append({"scenario": f"render:{name}", "bytes": len(content), "cpu_ms": cpu_ms})
+        print(f"render:{name:<10} {len(content)} bytes {cpu_ms} ms", file=sys.stderr)
+
+    if rendered["drf_json"] != rendered["orjson"]:
+        print("WARNING: renderers produced different output", file=sys.stderr)
+
+    for coding in compression.available_codings():
+        content, cpu_ms = best_cpu_ms(
+            lambda: compression.compress(coding, rendered["orjson"]), options.repeat
+        )
+        results.append({
+            "scenario": f"compress:{coding}",
+            "bytes": len(content),
+            "cpu_ms": cpu_ms,
+            "ratio": round(len(content) / len(rendered["orjson"]), 4),
+        })
+        print(f"compress:{coding:<8} {len(content)} bytes {cpu_ms} ms", file=sys.stderr)
+
+    summary = {
+        "items": options.items,
+        "identical_output": rendered["drf_json"] == rendered["orjson"],
+        "render_speedup": round(results[0]["cpu_ms"] / results[1]["cpu_ms"], 2),
+    }
+
+    json.dump(
+        {"benchmark": "json_rendering", "summary": summary, "results": results},
+        sys.stdout,
+        indent=2,
+    )
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+Minimal asyncio HTTP/1.1 load generator used by the benchmarks.
+
+It keeps one keep-alive connection per simulated client, so thousands
+of concurrent clients cost one coroutine each, and reports latency
+percentiles and throughput as plain dicts ready for JSON output.
+"""
+
+import asyncio
+import json
+import time
+from urllib.parse import urlsplit
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(name, latencies, statuses, errors, elapsed, concurrency):
+    """
+    Build the machine-readable result for one scenario run.
+    Latencies are reported in milliseconds.
+    """
+    latencies = sorted(latencies)
+    completed = len(latencies)
+
+    def ms(value):
+        return round(value * 1000, 3) if value is not None else None
+
+    return {
+        "scenario": name,
+        "concurrency": concurrency,
+        "requests": completed,
+        "errors": errors,
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+        "duration_s": round(elapsed, 3),
+        "rps": round(completed / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": ms(percentile(latencies, 0.50)),
+            "p95": ms(percentile(latencies, 0.95)),
+            "p99": ms(percentile(latencies, 0.99)),
+            "max": ms(latencies[-1] if latencies else None),
+        },
+    }
+
+
+class Connection:
+    """
+    One keep-alive HTTP/1.1 connection.
+    """
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.ssl = parts.scheme == "https"
+        self.reader = None
+        self.writer = None
+
+    async def open(self):
+        self.reader, self.writer = await asyncio.open_connection(
+            self.host, self.port, ssl=self.ssl or None
+        )
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError:
+                pass
+            self.writer = None
+
+    async def request(self, method, url, headers=None, body=None, send_delay=0.0):
+        """
+        Send one request and read the full response.
+
+        `send_delay` trickles the request out in two halves with a
+        pause in between, simulating a slow client.
+        Returns (status, body_bytes).
+        """
+        if self.writer is None:
+            await self.open()
+
+        parts = urlsplit(url)
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+
+        payload = b""
+        if body is not None:
+            payload = body if isinstance(body, bytes) else json.dumps(body).encode()
+
+        lines = [
+            f"{method} {target} HTTP/1.1",
+            f"Host: {parts.netloc}",
+            "Connection: keep-alive",
+            f"Content-Length: {len(payload)}",
+        ]
+        if body is not None:
+            lines.append("Content-Type: application/json")
+        for name, value in (headers or {}).items():
+            lines.append(f"{name}: {value}")
+
+        raw = ("\r\n".join(lines) + "\r\n\r\n").encode() + payload
+
+        if send_delay:
+            half = len(raw) // 2
+            self.writer.write(raw[:half])
+            await self.writer.drain()
+            await asyncio.sleep(send_delay)
+            self.writer.write(raw[half:])
+        else:
+            self.writer.write(raw)
+        await self.writer.drain()
+
+        return await self.read_response()
+
+    async def read_response(self):
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("Connection closed by server")
+
+        status = int(status_line.split()[1])
+        response_headers = {}
+
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+
+        if response_headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await self.reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await self.reader.readline()
+                    break
+                chunks.append(await self.reader.readexactly(size))
+                await self.reader.readexactly(2)
+            content = b"".join(chunks)
+        elif "content-length" in response_headers:
+            content = await self.reader.readexactly(int(response_headers["content-length"]))
+        else:
+            content = await self.reader.read()
+            await self.close()
+
+        if response_headers.get("connection", "").lower() == "close":
+            await self.close()
+
+        return status, content
+
+
+async def run_load(
+    name,
+    make_request,
+    concurrency,
+    duration=None,
+    total_requests=None,
+    send_delay=0.0,
+):
+    """
+    Drive `make_request(client_index, n)` from `concurrency` clients.
+
+    `make_request` returns (method, url, headers, body). The run stops
+    after `duration` seconds or `total_requests` requests, whichever
+    is given. Returns the summary dict from summarize().
+    """
+    if duration is None and total_requests is None:
+        raise ValueError("Give a duration or a total number of requests.")
+
+    latencies = []
+    statuses = {}
+    errors = 0
+    issued = 0
+    started = time.perf_counter()
+    deadline = started + duration if duration is not None else None
+
+    def next_request():
+        nonlocal issued
+        if total_requests is not None and issued >= total_requests:
+            return None
+        if deadline is not None and time.perf_counter() >= deadline:
+            return None
+        issued += 1
+        return issued
+
+    async def client(index):
+        nonlocal errors
+        connection = Connection(make_request(index, 0)[1])
+
+        try:
+            while True:
+                n = next_request()
+                if n is None:
+                    return
+
+                method, url, headers, body = make_request(index, n)
+                begin = time.perf_counter()
+
+                try:
+                    status, _ = await connection.request(
+                        method, url, headers, body, send_delay=send_delay
+                    )
+                except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError):
+                    errors += 1
+                    await connection.close()
+                    continue
+
+                latencies.append(time.perf_counter() - begin)
+                statuses[status] = statuses.get(status, 0) + 1
+        finally:
+            await connection.close()
+
+    await asyncio.gather(*(client(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return summarize(name, latencies, statuses, errors, elapsed, concurrency)
@@ -0,0 +1,289 @@
+"""
+Stress the inventory code with concurrent purchases, checkouts and
+restocks, then prove nothing was oversold.
+
+Every worker thread has its own database connection and hammers the
+same few sweets. Afterwards the harness checks, per sweet:
+
+- final stock == initial stock + units restocked - units sold
+- no stock went negative and the ledger agrees with what callers
+  were told
+
+With --batching, single purchases go through a PurchaseBatcher, the
+group-commit path the purchase views use with SWEETS_PURCHASE_BATCHING;
+otherwise they call purchase_sweet(). Checkouts and restocks always call
+checkout() / restock_sweet(). The harness calls these functions directly
+and does not go through the HTTP views.
+
+It reports throughput and the time sessions spent waiting on row locks,
+sampled from pg_stat_activity. It needs a real Postgres:
+
+    export DB_NAME=postgres DB_USER=postgres DB_PASSWORD=postgres DB_HOST=127.0.0.1
+    python manage.py migrate
+    python -m benchmarks.oversell_stress --threads 32 --operations 20000 --sweets 4
+    python -m benchmarks.oversell_stress --shards 8      # sharded stock
+    python -m benchmarks.oversell_stress --batching      # group commit
+
+Exits with status 1 if an invariant is broken. Results are JSON.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+PREFIX = "stress-"
+
+
+def sample_lock_waits(pids, pids_lock, stop, interval, totals):
+    """
+    Poll pg_stat_activity until `stop` is set and add up, per sample,
+    how many of our sessions were waiting on a lock.
+    """
+    from django.db import connection
+
+    try:
+        with connection.cursor() as cursor:
+            while not stop.wait(interval):
+                with pids_lock:
+                    backend_pids = list(pids)
+                cursor.execute(
+                    "SELECT count(*) FROM pg_stat_activity "
+                    "WHERE wait_event_type = 'Lock' AND pid = ANY(%s)",
+                    [backend_pids],
+                )
+                totals["waiting_samples"] += cursor.fetchone()[0]
+                totals["samples"] += 1
+    finally:
+        connection.close()
+
+
+def run_stress(
+    sweets=4,
+    initial_stock=500,
+    operations=5000,
+    threads=16,
+    restock_ratio=0.1,
+    checkout_ratio=0.2,
+    max_quantity=3,
+    shards=0,
+    batching=False,
+    seed=42,
+    sample_interval=0.005,
+):
+    """
+    Run the stress test and return (report, failures).
+
+    `failures` is empty when every invariant held.
+    """
+    from django.db import connection
+
+    from apps.sweets.batching import PurchaseBatcher
+    from apps.sweets.inventory import (
+        OutOfStock,
+        checkout,
+        purchase_sweet,
+        restock_sweet,
+        shard_stock,
+    )
+    from apps.sweets.models import StockMovement, Sweet
+
+    purchase = PurchaseBatcher().purchase if batching else purchase_sweet
+
+    Sweet.objects.filter(name__startswith=PREFIX).delete()
+    sweet_ids = []
+    for index in range(sweets):
+        sweet = Sweet.objects.create(
+            name=f"{PREFIX}{index}",
+            category="stress",
+            price=1,
+            quantity=initial_stock,
+        )
+        if shards:
+            shard_stock(sweet.id, shards)
+        sweet_ids.append(sweet.id)
+
+    per_thread = operations // threads
+    pids = set()
+    stats_lock = threading.Lock()
+    sold = dict.fromkeys(sweet_ids, 0)
+    restocked = dict.fromkeys(sweet_ids, 0)
+    outcomes = {"purchase": 0, "checkout": 0, "restock": 0, "out_of_stock": 0}
+
+    def worker(worker_index):
+        rng = random.Random(seed + worker_index)
+        local_sold = dict.fromkeys(sweet_ids, 0)
+        local_restocked = dict.fromkeys(sweet_ids, 0)
+        local_outcomes = dict.fromkeys(outcomes, 0)
+
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_backend_pid()")
+            with stats_lock:
+                pids.add(cursor.fetchone()[0])
+
+        try:
+            for _ in range(per_thread):
+                roll = rng.random()
+
+                if roll < restock_ratio:
+                    sweet_id = rng.choice(sweet_ids)
+                    quantity = rng.randint(1, max_quantity * 4)
+                    restock_sweet(sweet_id, quantity)
+                    local_restocked[sweet_id] += quantity
+                    local_outcomes["restock"] += 1
+                    continue
+
+                try:
+                    if roll < restock_ratio + checkout_ratio:
+                        items = [
+                            {"sweet_id": sweet_id, "quantity": rng.randint(1, max_quantity)}
+                            for sweet_id in rng.sample(sweet_ids, min(2, len(sweet_ids)))
+                        ]
+                        for item in checkout(items):
+                            local_sold[item["sweet_id"]] += item["quantity"]
+                        local_outcomes["checkout"] += 1
+                    else:
+                        sweet_id = rng.choice(sweet_ids)
+                        quantity = rng.randint(1, max_quantity)
+                        purchase(sweet_id, quantity)
+                        local_sold[sweet_id] += quantity
+                        local_outcomes["purchase"] += 1
+                except OutOfStock:
+                    local_outcomes["out_of_stock"] += 1
+        finally:
+            connection.close()
+
+        with stats_lock:
+            for sweet_id in sweet_ids:
+                sold[sweet_id] += local_sold[sweet_id]
+                restocked[sweet_id] += local_restocked[sweet_id]
+            for outcome, count in local_outcomes.items():
+                outcomes[outcome] += count
+
+    stop = threading.Event()
+    lock_totals = {"samples": 0, "waiting_samples": 0}
+    sampler = threading.Thread(
+        target=sample_lock_waits,
+        args=(pids, stats_lock, stop, sample_interval, lock_totals),
+        daemon=True,
+    )
+
+    started = time.perf_counter()
+    sampler.start()
+    try:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(worker, range(threads)))
+        elapsed = time.perf_counter() - started
+    finally:
+        # Stop the sampler even when a worker raised, so a failing run
+        # exits instead of hanging
+        stop.set()
+        sampler.join()
+
+    failures = []
+    final = dict(
+        Sweet.objects.with_stock()
+        .filter(id__in=sweet_ids)
+        .values_list("id", "stock")
+    )
+    ledger = dict.fromkeys(sweet_ids, 0)
+    for sweet_id, quantity in StockMovement.objects.filter(
+        sweet_id__in=sweet_ids,
+        kind=StockMovement.PURCHASE,
+    ).values_list("sweet_id", "quantity"):
+        ledger[sweet_id] += quantity
+
+    for sweet_id in sweet_ids:
+        expected = initial_stock + restocked[sweet_id] - sold[sweet_id]
+
+        if expected < 0:
+            failures.append(f"sweet {sweet_id}: oversold by {-expected} units")
+        if final[sweet_id] != expected:
+            failures.append(
+                f"sweet {sweet_id}: final stock {final[sweet_id]}, expected {expected}"
+            )
+        if ledger[sweet_id] != sold[sweet_id]:
+            failures.append(
+                f"sweet {sweet_id}: ledger sold {ledger[sweet_id]}, callers were told {sold[sweet_id]}"
+            )
+
+    completed = sum(outcomes.values())
+    report = {
+        "threads": threads,
+        "sweets": sweets,
+        "shards": shards,
+        "batching": batching,
+        "operations": completed,
+        "outcomes": outcomes,
+        "units_sold": sum(sold.values()),
+        "units_restocked": sum(restocked.values()),
+        "duration_s": round(elapsed, 3),
+        "ops_per_s": round(completed / elapsed, 2) if elapsed else 0.0,
+        # Each sample that found k sessions waiting adds k * interval
+        # seconds of lock wait.
+        "lock_wait_s": round(lock_totals["waiting_samples"] * sample_interval, 3),
+        "lock_wait_share": round(
+            lock_totals["waiting_samples"] / (lock_totals["samples"] * threads), 4
+        ) if lock_totals["samples"] else 0.0,
+        "final_stock": {str(sweet_id): final[sweet_id] for sweet_id in sweet_ids},
+        "failures": failures,
+    }
+
+    StockMovement.objects.filter(sweet_id__in=sweet_ids).delete()
+    Sweet.objects.filter(id__in=sweet_ids).delete()
+
+    return report, failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sweets", type=int, default=4)
+    parser.add_argument("--initial-stock", type=int, default=500)
+    parser.add_argument("--operations", type=int, default=20000)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--restock-ratio", type=float, default=0.1)
+    parser.add_argument("--checkout-ratio", type=float, default=0.2)
+    parser.add_argument("--shards", type=int, default=0)
+    parser.add_argument("--batching", action="store_true")
+    parser.add_argument("--seed", type=int, default=42)
+    options = parser.parse_args(argv)
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "sweetshop.settings")
+
+    import django
+
+    django.setup()
+
+    from django.db import connection
+
+    if connection.vendor != "postgresql":
+        parser.error("The stress harness needs a Postgres database.")
+
+    report, failures = run_stress(
+        sweets=options.sweets,
+        initial_stock=options.initial_stock,
+        operations=options.operations,
+        threads=options.threads,
+        restock_ratio=options.restock_ratio,
+        checkout_ratio=options.checkout_ratio,
+        shards=options.shards,
+        batching=options.batching,
+        seed=options.seed,
+    )
+
+    json.dump({"benchmark": "oversell_stress", "results": [report]}, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+    for failure in failures:
+        print(f"FAILED {failure}", file=sys.stderr)
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
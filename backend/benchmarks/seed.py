@@ -0,0 +1,70 @@
+"""
+Seed a database with benchmark data.
+
+Everything created here is named with the "bench-" prefix, and
+seeding first removes what an earlier run left behind, so runs are
+reproducible. Must run inside a configured Django process.
+"""
+
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+
+PREFIX = "bench-"
+PASSWORD = "BenchPassword123"
+ADMIN_USERNAME = PREFIX + "admin"
+CATEGORIES = ["Indian", "Bakery", "Chocolate", "Candy", "Pastry", "Gummies", "Toffee", "Halwa"]
+WORDS = ["Kaju", "Ladoo", "Barfi", "Brownie", "Truffle", "Fudge", "Peda", "Jalebi", "Toffee", "Cake"]
+
+
+def user_name(index):
+    return f"{PREFIX}user-{index}"
+
+
+def seed(catalog_size, user_count, stock=1_000_000, random_seed=42, batch_size=5000):
+    """
+    Create `catalog_size` sweets and `user_count` users plus one admin.
+
+    All users share PASSWORD; it is hashed once and the hash reused, so
+    seeding many users is quick. Returns the ids of the seeded sweets.
+    """
+    from apps.sweets.models import Sweet
+
+    rng = random.Random(random_seed)
+    password = make_password(PASSWORD)
+
+    with transaction.atomic():
+        Sweet.objects.filter(name__startswith=PREFIX).delete()
+        User.objects.filter(username__startswith=PREFIX).delete()
+
+        for start in range(0, catalog_size, batch_size):
+            Sweet.objects.bulk_create([
+                Sweet(
+                    name=f"{PREFIX}{rng.choice(WORDS)} {rng.choice(WORDS)} {i}",
+                    category=rng.choice(CATEGORIES),
+                    price=round(rng.uniform(0.5, 50), 2),
+                    quantity=stock,
+                )
+                for i in range(start, min(start + batch_size, catalog_size))
+            ])
+
+        for start in range(0, user_count, batch_size):
+            User.objects.bulk_create([
+                User(username=user_name(i), password=password)
+                for i in range(start, min(start + batch_size, user_count))
+            ])
+
+        User.objects.create(
+            username=ADMIN_USERNAME,
+            password=password,
+            is_staff=True,
+            is_superuser=True,
+        )
+
+    return list(
+        Sweet.objects.filter(name__startswith=PREFIX)
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
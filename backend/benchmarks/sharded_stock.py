@@ -0,0 +1,107 @@
+"""
+Measure purchase throughput on one hot sweet, single-row vs sharded.
+
+Every thread buys one unit at a time from the same sweet, the way a
+promotion hammers PurchaseSweetView. --hold-ms keeps each purchase's
+transaction open a little longer after the stock update, standing in
+for the rest of the work done in a request's transaction; that is
+when the single row lock becomes the bottleneck.
+
+Run against Postgres (SQLite serializes all writers anyway):
+
+    export DB_NAME=postgres DB_USER=postgres DB_PASSWORD=postgres DB_HOST=127.0.0.1
+    python manage.py migrate
+    python -m benchmarks.sharded_stock --threads 32 --shards 0,4,16 --hold-ms 2
+
+Results are printed as one JSON document.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--purchases", type=int, default=5000)
+    parser.add_argument("--shards", default="0,4,16")
+    parser.add_argument("--hold-ms", type=float, default=2.0)
+    options = parser.parse_args(argv)
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "sweetshop.settings")
+
+    import django
+
+    django.setup()
+
+    from django.db import connection, transaction
+
+    from apps.sweets.inventory import purchase_sweet, shard_stock
+    from apps.sweets.models import Sweet
+    from benchmarks.loadgen import summarize
+
+    per_thread = options.purchases // options.threads
+    hold = options.hold_ms / 1000
+
+    def buy(sweet_id, count):
+        latencies = []
+        for _ in range(count):
+            begin = time.perf_counter()
+            with transaction.atomic():
+                purchase_sweet(sweet_id)
+                if hold:
+                    time.sleep(hold)
+            latencies.append(time.perf_counter() - begin)
+        connection.close()
+        return latencies
+
+    results = []
+    for shard_count in [int(s) for s in options.shards.split(",")]:
+        sweet = Sweet.objects.create(
+            name="benchmark-hot-sweet",
+            category="benchmark",
+            price=1,
+            quantity=per_thread * options.threads,
+        )
+        shard_stock(sweet.id, shard_count)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options.threads) as executor:
+            batches = list(executor.map(
+                buy, [sweet.id] * options.threads, [per_thread] * options.threads
+            ))
+        elapsed = time.perf_counter() - started
+
+        left = Sweet.objects.with_stock().get(id=sweet.id).stock
+        sweet.delete()
+
+        latencies = [latency for batch in batches for latency in batch]
+        mode = f"sharded x{shard_count}" if shard_count else "single-row"
+        result = summarize(
+            f"sharded_stock:{mode}",
+            latencies,
+            {"ok": len(latencies)},
+            0,
+            elapsed,
+            options.threads,
+        )
+        result["shards"] = shard_count
+        result["stock_left"] = left
+        results.append(result)
+
+        print(
+            f"{mode:<14} rps={result['rps']:<10} p99={result['latency_ms']['p99']}ms "
+            f"stock_left={left}",
+            file=sys.stderr,
+        )
+
+    json.dump({"benchmark": "sharded_stock", "results": results}, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Gunicorn configuration for production serving.
+
+    gunicorn -c gunicorn.conf.py
+
+SERVER_MODE=wsgi (default) runs threaded sync workers for the DRF API.
+SERVER_MODE=asgi runs uvicorn workers, which also serve the native
+async endpoints under /api/async/sweets/ without a thread per request.
+
+Each worker keeps its own database connections (see DB_POOL in
+settings), so size DB_POOL_MAX_SIZE to at least GUNICORN_THREADS.
+
+Workers share their metrics through METRICS_DIR (see sweetshop.metrics),
+a fresh temporary directory unless set.
+
+Catalog response caching needs a cache shared by all workers
+(CACHE_BACKEND, e.g. Redis). With several workers on the default local
+memory cache, it is turned off (SWEETS_CACHE_ENABLED=false), since a
+write would only invalidate the worker that handled it.
+"""
+
+import multiprocessing
+import os
+import tempfile
+
+server_mode = os.getenv("SERVER_MODE", "wsgi").lower()
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+
+if server_mode == "asgi":
+    wsgi_app = "sweetshop.asgi:application"
+    worker_class = "uvicorn_worker.UvicornWorker"
+else:
+    wsgi_app = "sweetshop.wsgi:application"
+    worker_class = "gthread"
+    threads = int(os.getenv("GUNICORN_THREADS", "4"))
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+# Recycle workers now and then to cap slow memory growth
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "10000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "1000"))
+
+accesslog = "-"
+errorlog = "-"
+
+LOCAL_CACHE_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+if workers > 1 and os.getenv("CACHE_BACKEND", LOCAL_CACHE_BACKENDS[0]) in LOCAL_CACHE_BACKENDS:
+    os.environ.setdefault("SWEETS_CACHE_ENABLED", "false")
+
+# Per-worker metrics snapshots, added up by whichever worker serves /metrics
+if not os.getenv("METRICS_DIR"):
+    os.environ["METRICS_DIR"] = tempfile.mkdtemp(prefix="sweetshop-metrics-")
+
+
+def on_starting(server):
+    from sweetshop.metrics import reset_metrics_dir
+
+    if os.environ.get("SWEETS_CACHE_ENABLED") == "false":
+        server.log.warning(
+            "Catalog response caching is off: %d workers without a shared "
+            "CACHE_BACKEND", workers
+        )
+
+    reset_metrics_dir(os.environ["METRICS_DIR"])
+
+
+def child_exit(server, worker):
+    from sweetshop.metrics import retire_worker
+
+    retire_worker(os.environ["METRICS_DIR"], worker.pid)
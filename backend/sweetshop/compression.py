@@ -0,0 +1,138 @@
+"""
+Negotiated gzip/brotli response compression.
+
+CompressionMiddleware works like Django's GZipMiddleware, with these
+differences:
+
+- It picks brotli ("br") or gzip from Accept-Encoding, honouring
+  q-values; brotli is only offered when the Brotli package is installed
+- It skips responses smaller than COMPRESSION_MIN_SIZE bytes
+- Levels are configurable; the defaults favour CPU over the last few
+  percent of size, since API responses are compressed on every request
+"""
+
+import zlib
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+
+def available_codings():
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate(accept_encoding):
+    """
+    Return the coding to use for an Accept-Encoding header, or None.
+
+    The coding with the highest q-value wins; brotli wins ties.
+    A coding with q=0 is never used, even when "*" accepts it.
+    """
+    accepted = {}
+
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+
+        quality = 1.0
+        params = params.strip().lower()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+
+        accepted[coding] = quality
+
+    best, best_quality = None, 0.0
+    for coding in available_codings():
+        quality = accepted.get(coding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+
+    return best
+
+
+def compress(coding, content):
+    if coding == "br":
+        return brotli.compress(content, quality=settings.COMPRESSION_BROTLI_QUALITY)
+
+    compressor = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+    return compressor.compress(content) + compressor.flush()
+
+
+def compress_sequence(coding, sequence):
+    if coding == "br":
+        compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+        process, finish = compressor.process, compressor.finish
+    else:
+        compressor = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+        process, finish = compressor.compress, compressor.flush
+
+    for chunk in sequence:
+        data = process(chunk)
+        if data:
+            yield data
+
+    yield finish()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compress responses with brotli or gzip, as negotiated with the client.
+
+    - Disabled unless COMPRESSION_ENABLED is set
+    - Sync streaming responses (e.g. catalog exports) are compressed
+      as they stream; async streaming responses are left alone
+    - Strong ETags are made weak, as GZipMiddleware does
+    """
+
+    def __init__(self, get_response):
+        if not settings.COMPRESSION_ENABLED:
+            raise MiddlewareNotUsed()
+
+        super().__init__(get_response)
+
+    def process_response(self, request, response):
+        if response.has_header("Content-Encoding"):
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                return response
+        elif len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+
+        coding = negotiate(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if coding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = compress_sequence(
+                coding, response.streaming_content
+            )
+            del response.headers["Content-Length"]
+        else:
+            compressed = compress(coding, response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = coding
+
+        return response
@@ -0,0 +1,438 @@
+"""
+In-process metrics with a Prometheus text endpoint.
+
+- Counters, gauges and fixed-bucket histograms keep their values in
+  plain dicts keyed by label values, behind one lock per metric
+- MetricsMiddleware counts and times every request by route, method
+  and status; the purchase views count outcomes
+- DB pool stats are read from the psycopg pools when /metrics is scraped
+
+Workers are aggregated without any external service: with METRICS_DIR
+set (gunicorn.conf.py sets it), each worker writes a JSON snapshot of
+its registry to METRICS_DIR/<pid>.json every METRICS_FLUSH_INTERVAL
+seconds, and the worker answering /metrics adds up all snapshots.
+When a worker exits, gunicorn's child_exit hook folds its counters and
+histograms into retired.json, so totals never go backwards.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+
+
+RETIRED = "retired"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Metric:
+    """
+    Base class: a named metric with a fixed list of label names.
+    """
+
+    kind = None
+
+    def __init__(self, name, documentation, labels):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def series(self):
+        with self.lock:
+            return [[list(labels), value] for labels, value in self.values.items()]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount=1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value, *labels):
+        with self.lock:
+            self.values[labels] = value
+
+
+class Histogram(Metric):
+    """
+    Histogram with fixed upper bounds.
+
+    Each series is a list of per-bucket counts (the last bucket is
+    +Inf) followed by the sum of observed values.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labels, buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        index = bisect_left(self.buckets, value)
+
+        with self.lock:
+            series = self.values.get(labels)
+            if series is None:
+                series = self.values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def series(self):
+        with self.lock:
+            return [[list(labels), list(value)] for labels, value in self.values.items()]
+
+
+class Registry:
+    """
+    The metrics of one process, plus collectors run before each snapshot.
+    """
+
+    def __init__(self):
+        self.metrics = {}
+        self.collectors = []
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labels=()):
+        return self.register(Counter(name, documentation, labels))
+
+    def gauge(self, name, documentation, labels=()):
+        return self.register(Gauge(name, documentation, labels))
+
+    def histogram(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labels, buckets))
+
+    def collector(self, func):
+        self.collectors.append(func)
+        return func
+
+    def snapshot(self):
+        """
+        JSON-serializable copy of every metric.
+        """
+        for collect in self.collectors:
+            collect()
+
+        return {
+            name: {"type": metric.kind, "series": metric.series()}
+            for name, metric in self.metrics.items()
+        }
+
+    def render(self, snapshot):
+        """
+        Render a (merged) snapshot in the Prometheus text format.
+        """
+        lines = []
+
+        for name, metric in self.metrics.items():
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+
+            for labels, value in sorted(snapshot.get(name, {}).get("series", [])):
+                pairs = list(zip(metric.labels, labels))
+
+                if metric.kind != "histogram":
+                    lines.append(f"{name}{format_labels(pairs)} {value}")
+                    continue
+
+                cumulative = 0
+                bounds = [str(bound) for bound in metric.buckets] + ["+Inf"]
+                for bound, count in zip(bounds, value[:-1]):
+                    cumulative += count
+                    lines.append(
+                        f"{name}_bucket{format_labels(pairs + [('le', bound)])} {cumulative}"
+                    )
+                lines.append(f"{name}_sum{format_labels(pairs)} {value[-1]}")
+                lines.append(f"{name}_count{format_labels(pairs)} {cumulative}")
+
+        return "\n".join(lines) + "\n"
+
+
+def format_labels(pairs):
+    if not pairs:
+        return ""
+
+    def escape(value):
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in pairs) + "}"
+
+
+def merge_snapshots(snapshots, include_gauges=True):
+    """
+    Add up snapshots from several processes.
+
+    Counters, gauges and histogram buckets are summed per label set.
+    Gauges describe live processes only, so they can be left out.
+    """
+    merged = {}
+
+    for snapshot in snapshots:
+        for name, metric in snapshot.items():
+            if metric["type"] == "gauge" and not include_gauges:
+                continue
+
+            series = merged.setdefault(name, {"type": metric["type"], "series": {}})["series"]
+
+            for labels, value in metric["series"]:
+                key = tuple(labels)
+                current = series.get(key)
+
+                if current is None:
+                    series[key] = value
+                elif metric["type"] == "histogram":
+                    series[key] = [a + b for a, b in zip(current, value)]
+                else:
+                    series[key] = current + value
+
+    return {
+        name: {
+            "type": metric["type"],
+            "series": [[list(labels), value] for labels, value in metric["series"].items()],
+        }
+        for name, metric in merged.items()
+    }
+
+
+def snapshot_path(directory, name):
+    return os.path.join(directory, f"{name}.json")
+
+
+def read_snapshot(path):
+    try:
+        with open(path) as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+
+def write_snapshot(path, snapshot):
+    """
+    Write atomically, so readers never see a partial file.
+    """
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "w") as handle:
+        json.dump(snapshot, handle)
+    os.replace(temporary, path)
+
+
+def read_snapshots(directory):
+    snapshots = []
+
+    for filename in os.listdir(directory):
+        if filename.endswith(".json"):
+            snapshot = read_snapshot(os.path.join(directory, filename))
+            if snapshot is not None:
+                snapshots.append(snapshot)
+
+    return snapshots
+
+
+def retire_worker(directory, pid):
+    """
+    Fold an exited worker's counters and histograms into retired.json.
+
+    Called from gunicorn's child_exit hook, in the master process.
+    """
+    path = snapshot_path(directory, pid)
+    snapshot = read_snapshot(path)
+
+    if snapshot is None:
+        return
+
+    retired_path = snapshot_path(directory, RETIRED)
+    retired = read_snapshot(retired_path)
+    write_snapshot(
+        retired_path,
+        merge_snapshots([s for s in (retired, snapshot) if s], include_gauges=False),
+    )
+    os.remove(path)
+
+
+def reset_metrics_dir(directory):
+    """
+    Remove the snapshots of a previous server run.
+    """
+    os.makedirs(directory, exist_ok=True)
+
+    for filename in os.listdir(directory):
+        if filename.endswith((".json", ".tmp")):
+            os.remove(os.path.join(directory, filename))
+
+
+registry = Registry()
+
+http_requests = registry.counter(
+    "http_requests_total",
+    "HTTP requests by route, method and status.",
+    ["route", "method", "status"],
+)
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route, method and status.",
+    ["route", "method", "status"],
+)
+purchases = registry.counter(
+    "sweets_purchases_total",
+    "Purchase and checkout attempts by endpoint and outcome.",
+    ["endpoint", "outcome"],
+)
+db_pool_stats = registry.gauge(
+    "db_pool_stats",
+    "psycopg connection pool statistics by database alias.",
+    ["alias", "stat"],
+)
+
+
+@registry.collector
+def collect_db_pool_stats():
+    for alias in connections:
+        if not connections.settings[alias].get("OPTIONS", {}).get("pool"):
+            continue
+
+        pool = connections[alias].pool
+        if pool is None:
+            continue
+
+        for stat, value in pool.get_stats().items():
+            db_pool_stats.set(value, alias, stat)
+
+
+class SnapshotWriter:
+    """
+    Writes this process's snapshot to METRICS_DIR every
+    METRICS_FLUSH_INTERVAL seconds from a daemon thread.
+
+    Started on the first request of each worker; the pid check makes a
+    forked worker start its own thread.
+    """
+
+    def __init__(self):
+        self.pid = None
+        self.lock = threading.Lock()
+
+    def ensure_started(self):
+        if self.pid == os.getpid() or not settings.METRICS_DIR:
+            return
+
+        with self.lock:
+            if self.pid == os.getpid():
+                return
+
+            self.pid = os.getpid()
+            os.makedirs(settings.METRICS_DIR, exist_ok=True)
+            threading.Thread(target=self.run, daemon=True).start()
+            atexit.register(self.flush)
+
+    def run(self):
+        while True:
+            time.sleep(settings.METRICS_FLUSH_INTERVAL)
+            self.flush()
+
+    def flush(self):
+        if settings.METRICS_DIR:
+            write_snapshot(
+                snapshot_path(settings.METRICS_DIR, os.getpid()),
+                registry.snapshot(),
+            )
+
+
+snapshot_writer = SnapshotWriter()
+
+
+def route_of(request):
+    match = getattr(request, "resolver_match", None)
+    return match.route if match else "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Count and time every request by route, method and status.
+
+    - Routes are URL patterns (e.g. api/sweets/<int:sweet_id>/purchase/),
+      so label values stay bounded; unknown paths are "unmatched"
+    - Works under WSGI and ASGI without an extra thread hop
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed()
+
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        started = time.perf_counter()
+        response = self.get_response(request)
+        self.observe(request, response, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        self.observe(request, response, time.perf_counter() - started)
+        return response
+
+    def observe(self, request, response, seconds):
+        snapshot_writer.ensure_started()
+
+        labels = (route_of(request), request.method, str(response.status_code))
+        http_requests.inc(*labels)
+        http_request_duration.observe(seconds, *labels)
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint.
+
+    With METRICS_DIR, reports the sum over all workers (current
+    snapshots plus retired workers); otherwise this process only.
+
+    Served only with METRICS_ENABLED; with METRICS_TOKEN set, scrapers
+    must send it as a bearer token.
+    """
+    if not settings.METRICS_ENABLED:
+        raise Http404()
+
+    if settings.METRICS_TOKEN and not constant_time_compare(
+        request.headers.get("Authorization", ""),
+        f"Bearer {settings.METRICS_TOKEN}",
+    ):
+        return HttpResponse(status=401, headers={"WWW-Authenticate": "Bearer"})
+
+    if settings.METRICS_DIR:
+        snapshot_writer.flush()
+        snapshot = merge_snapshots(read_snapshots(settings.METRICS_DIR))
+    else:
+        snapshot = registry.snapshot()
+
+    return HttpResponse(registry.render(snapshot), content_type=CONTENT_TYPE)
@@ -0,0 +1,54 @@
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+# datetime, date and time are passed through to DRF's encoder: orjson
+# formats some of them differently (e.g. it rounds sub-minute UTC offsets).
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+# Line and paragraph separators, UTF-8 encoded; escaped like JSONRenderer
+# does so the output stays a strict JavaScript subset.
+LINE_SEPARATOR = "\u2028".encode()
+PARAGRAPH_SEPARATOR = "\u2029".encode()
+
+encoder = JSONEncoder()
+
+
+def default(obj):
+    """
+    Fallback for types orjson does not encode itself or is told to
+    pass through (datetimes, Decimal, timedelta, lazy strings,
+    querysets, ...), using DRF's rules.
+    """
+    return encoder.default(obj)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Drop-in replacement for DRF's JSONRenderer, built on orjson.
+
+    - Same output: compact separators, raw UTF-8, Decimals as numbers
+    - datetime, date and time go through DRF's JSONEncoder.default, so
+      they are formatted exactly as JSONRenderer formats them; API
+      serializers have usually turned them into strings already
+    - Strings, numbers, lists, dicts and UUIDs are encoded natively;
+      other types also go through JSONEncoder.default
+    - Any requested indent (e.g. `application/json; indent=4`) is
+      rendered as two spaces, the only indent orjson supports
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        options = ORJSON_OPTIONS
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            options |= orjson.OPT_INDENT_2
+
+        ret = orjson.dumps(data, default=default, option=options)
+
+        if LINE_SEPARATOR in ret or PARAGRAPH_SEPARATOR in ret:
+            ret = ret.replace(LINE_SEPARATOR, b"\\u2028").replace(PARAGRAPH_SEPARATOR, b"\\u2029")
+
+        return ret
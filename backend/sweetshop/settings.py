@@ -25,7 +25,7 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = 'django-insecure-2=@@@_n_e1t_986i6n3q1y#_@o2#jv8k&9oy2hv-j%7oo#h84('
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.getenv("DEBUG", "True").lower() in ("1", "true", "yes")
 
 ALLOWED_HOSTS = os.getenv("ALLOWED_HOSTS", "").split(",")
 
@@ -39,18 +39,23 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
 
     "rest_framework",
 
     "apps.accounts.apps.AccountsConfig",
     "apps.sweets.apps.SweetsConfig",
     "rest_framework.authtoken",
+    "rest_framework_simplejwt.token_blacklist",
     "corsheaders",
 ]
 
 
 
 MIDDLEWARE = [
+    "sweetshop.timing.ServerTimingMiddleware",
+    "sweetshop.metrics.MetricsMiddleware",
+    "sweetshop.compression.CompressionMiddleware",
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -64,6 +69,7 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'sweetshop.urls'
 CORS_ALLOW_ALL_ORIGINS = True
+CORS_EXPOSE_HEADERS = ["Link", "Server-Timing"]
 
 TEMPLATES = [
     {
@@ -95,9 +101,45 @@ DATABASES = {
         "PASSWORD": os.getenv("DB_PASSWORD"),
         "HOST": os.getenv("DB_HOST"),
         "PORT": os.getenv("DB_PORT", "5432"),
+        # Check reused connections before handing them to a request
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
+# Connection reuse
+# DB_POOL=true: psycopg connection pool per worker process (requires
+# psycopg[pool]); connections are checked on checkout and recycled.
+# Otherwise: persistent connections kept for DB_CONN_MAX_AGE seconds.
+if os.getenv("DB_POOL", "false").lower() in ("1", "true", "yes"):
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+            "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "8")),
+            "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+            "max_idle": float(os.getenv("DB_POOL_MAX_IDLE", "600")),
+            "max_lifetime": float(os.getenv("DB_POOL_MAX_LIFETIME", "3600")),
+        },
+    }
+else:
+    DATABASES["default"]["CONN_MAX_AGE"] = int(os.getenv("DB_CONN_MAX_AGE", "60"))
+
+
+
+# Cache
+# Local memory by default; point CACHE_BACKEND/CACHE_LOCATION at a shared
+# backend (e.g. django.core.cache.backends.redis.RedisCache) to share
+# catalog responses and the catalog version between workers. Required
+# for catalog caching with more than one worker process.
+
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", "sweetshop"),
+    }
+}
 
 
 # Password validation
@@ -142,9 +184,84 @@ REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     ),
+    # orjson-based JSON (same output as DRF's JSONRenderer, faster)
+    "DEFAULT_RENDERER_CLASSES": (
+        "sweetshop.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
 }
 
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=30),
+    "REFRESH_TOKEN_LIFETIME": timedelta(days=int(os.getenv("JWT_REFRESH_TOKEN_DAYS", "7"))),
+    "ROTATE_REFRESH_TOKENS": True,
+    "BLACKLIST_AFTER_ROTATION": True,
     "AUTH_HEADER_TYPES": ("Bearer",),
-}
\ No newline at end of file
+}
+
+# JWTAuthentication in-process caches (per worker). Users are dropped from
+# the cache when saved or deleted in this process; the TTL bounds how long
+# other workers may keep a stale copy. Set a TTL to 0 to disable a cache.
+JWT_TOKEN_CACHE_SIZE = int(os.getenv("JWT_TOKEN_CACHE_SIZE", "10000"))
+JWT_TOKEN_CACHE_TTL = int(os.getenv("JWT_TOKEN_CACHE_TTL", "300"))
+JWT_USER_CACHE_SIZE = int(os.getenv("JWT_USER_CACHE_SIZE", "10000"))
+JWT_USER_CACHE_TTL = int(os.getenv("JWT_USER_CACHE_TTL", "60"))
+
+# Password hashing processes for the provision_users command (0 = one
+# per CPU). The HTTP endpoint always hashes in the request thread.
+ACCOUNTS_PROVISION_WORKERS = int(os.getenv("ACCOUNTS_PROVISION_WORKERS", "0"))
+
+# Sweet catalog pagination (list and search endpoints)
+SWEETS_PAGE_SIZE = int(os.getenv("SWEETS_PAGE_SIZE", "100"))
+SWEETS_MAX_PAGE_SIZE = int(os.getenv("SWEETS_MAX_PAGE_SIZE", "1000"))
+
+# Sweet catalog response cache
+SWEETS_CACHE_ALIAS = "default"
+SWEETS_CACHE_TIMEOUT = int(os.getenv("SWEETS_CACHE_TIMEOUT", "300"))
+# Response caching and conditional GET rely on the catalog version being
+# seen by every worker; gunicorn.conf.py turns this off when several
+# workers would each use their own local memory cache.
+SWEETS_CACHE_ENABLED = os.getenv("SWEETS_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Most rows accepted by one bulk restock / price update request
+SWEETS_BULK_UPDATE_MAX_ROWS = int(os.getenv("SWEETS_BULK_UPDATE_MAX_ROWS", "10000"))
+
+# Group-commit purchases (sync purchase endpoint, per worker process).
+# Purchases of the same sweet arriving within the wait window share one
+# UPDATE and one commit; a full batch is applied without waiting.
+SWEETS_PURCHASE_BATCHING = os.getenv("SWEETS_PURCHASE_BATCHING", "false").lower() in ("1", "true", "yes")
+SWEETS_PURCHASE_BATCH_SIZE = int(os.getenv("SWEETS_PURCHASE_BATCH_SIZE", "64"))
+SWEETS_PURCHASE_BATCH_WAIT_MS = float(os.getenv("SWEETS_PURCHASE_BATCH_WAIT_MS", "5"))
+
+# Low-stock notifications (sweep_low_stock command). The notifier is
+# called with one list of sweets per batch of threshold crossings.
+SWEETS_LOW_STOCK_NOTIFIER = os.getenv("SWEETS_LOW_STOCK_NOTIFIER", "apps.sweets.low_stock.log_notification")
+SWEETS_LOW_STOCK_BATCH_SIZE = int(os.getenv("SWEETS_LOW_STOCK_BATCH_SIZE", "500"))
+
+# Per-request SQL and timing instrumentation (sweetshop.timing).
+# Adds a Server-Timing header and a JSON log line to every response, and
+# warns about requests over the query budget or repeating one statement
+# at least N_PLUS_ONE_THRESHOLD times.
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "false").lower() in ("1", "true", "yes")
+SERVER_TIMING_QUERY_BUDGET = int(os.getenv("SERVER_TIMING_QUERY_BUDGET", "20"))
+SERVER_TIMING_N_PLUS_ONE_THRESHOLD = int(os.getenv("SERVER_TIMING_N_PLUS_ONE_THRESHOLD", "5"))
+
+# In-process metrics served at /metrics (sweetshop.metrics). With
+# METRICS_DIR set, every worker writes its metrics there every
+# METRICS_FLUSH_INTERVAL seconds and /metrics reports the sum over all
+# workers; gunicorn.conf.py sets it to a fresh temporary directory.
+# Off by default: /metrics exposes per-route traffic and latency, so
+# either keep it on an internal network or set METRICS_TOKEN, which
+# scrapers must then send as a bearer token.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").lower() in ("1", "true", "yes")
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+METRICS_DIR = os.getenv("METRICS_DIR", "")
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "5"))
+
+# Response compression (sweetshop.compression). Responses of at least
+# COMPRESSION_MIN_SIZE bytes are sent with brotli (when the Brotli package
+# is installed) or gzip, whichever the client prefers.
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() in ("1", "true", "yes")
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "4"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
@@ -0,0 +1,191 @@
+"""
+Per-request SQL and timing instrumentation.
+
+ServerTimingMiddleware (opt-in, SERVER_TIMING_ENABLED) records for every
+request:
+
+- the number of queries and the time spent in the database
+- the time spent authenticating (see `timed("auth")`)
+- the time spent rendering the response
+- the total time in Django
+
+and reports them in a `Server-Timing` header and one JSON log line on
+the "sweetshop.timing" logger. Requests over SERVER_TIMING_QUERY_BUDGET
+queries, or repeating one statement SERVER_TIMING_N_PLUS_ONE_THRESHOLD
+times or more (the usual N+1 pattern), are logged as warnings.
+
+record_queries() is also used by the tests to assert query budgets.
+"""
+
+import json
+import logging
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+
+logger = logging.getLogger("sweetshop.timing")
+
+current_timings = ContextVar("current_timings", default=None)
+
+
+class RequestTimings:
+    """
+    Query statistics and named timing spans for one request.
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.statements = Counter()
+        self.spans = {}
+
+    def add(self, name, seconds):
+        self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    def __call__(self, execute, sql, params, many, context):
+        """
+        Database execute wrapper; counts and times every statement.
+        """
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+            self.statements[sql] += 1
+
+    def repeated_statements(self, threshold):
+        """
+        Statements executed at least `threshold` times, most repeated first.
+        """
+        return [
+            (sql, count)
+            for sql, count in self.statements.most_common()
+            if count >= threshold
+        ]
+
+
+@contextmanager
+def record_queries():
+    """
+    Record every query run on this thread's connections inside the block.
+
+    Yields the RequestTimings; blocks may be nested, each one sees all
+    queries run inside it.
+    """
+    timings = RequestTimings()
+    token = current_timings.set(timings)
+
+    try:
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(timings))
+            yield timings
+    finally:
+        current_timings.reset(token)
+
+
+@contextmanager
+def timed(name):
+    """
+    Add the time spent in the block to the current request's `name` span.
+
+    A no-op outside a recorded request.
+    """
+    timings = current_timings.get()
+
+    if timings is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - started)
+
+
+def ms(seconds):
+    return round(seconds * 1000, 2)
+
+
+class ServerTimingMiddleware:
+    """
+    Report query count, DB, auth, render and total time per request.
+
+    - Disabled unless SERVER_TIMING_ENABLED is set
+    - Should be the first middleware, so `total` covers the others
+    - Rendering is timed from process_template_response until the
+      response's post-render callback, so it only applies to
+      DRF/template responses
+    """
+
+    def __init__(self, get_response):
+        if not settings.SERVER_TIMING_ENABLED:
+            raise MiddlewareNotUsed()
+
+        self.get_response = get_response
+        self.query_budget = settings.SERVER_TIMING_QUERY_BUDGET
+        self.n_plus_one_threshold = settings.SERVER_TIMING_N_PLUS_ONE_THRESHOLD
+
+    def __call__(self, request):
+        started = time.perf_counter()
+
+        with record_queries() as timings:
+            response = self.get_response(request)
+
+        timings.add("total", time.perf_counter() - started)
+
+        response["Server-Timing"] = self.header(timings)
+        self.log(request, response, timings)
+
+        return response
+
+    def process_template_response(self, request, response):
+        timings = current_timings.get()
+        started = time.perf_counter()
+
+        def rendered(response):
+            timings.add("render", time.perf_counter() - started)
+
+        if timings is not None:
+            response.add_post_render_callback(rendered)
+
+        return response
+
+    def header(self, timings):
+        metrics = [f'db;dur={ms(timings.db_time)};desc="{timings.queries} queries"']
+        for name in ("auth", "render", "total"):
+            if name in timings.spans:
+                metrics.append(f"{name};dur={ms(timings.spans[name])}")
+        return ", ".join(metrics)
+
+    def log(self, request, response, timings):
+        repeated = timings.repeated_statements(self.n_plus_one_threshold)
+        over_budget = timings.queries > self.query_budget
+        match = request.resolver_match
+
+        line = {
+            "method": request.method,
+            "path": request.path,
+            "route": match.route if match else None,
+            "status": response.status_code,
+            "queries": timings.queries,
+            "db_ms": ms(timings.db_time),
+            "auth_ms": ms(timings.spans.get("auth", 0.0)),
+            "render_ms": ms(timings.spans.get("render", 0.0)),
+            "total_ms": ms(timings.spans["total"]),
+            "over_query_budget": over_budget,
+            "n_plus_one": [
+                {"sql": sql[:200], "count": count} for sql, count in repeated
+            ],
+        }
+
+        level = logging.WARNING if over_budget or repeated else logging.INFO
+        logger.log(level, json.dumps(line))
@@ -1,6 +1,26 @@
 import pytest
+from contextlib import contextmanager
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from apps.accounts.authentication import token_cache, user_cache
 from rest_framework.test import APIClient
+from sweetshop.timing import record_queries
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """
+    Clears the caches around every test, so cached catalog responses
+    and authenticated users never leak between tests.
+    """
+    cache.clear()
+    token_cache.clear()
+    user_cache.clear()
+    yield
+    cache.clear()
+    token_cache.clear()
+    user_cache.clear()
 
 
 @pytest.fixture
@@ -67,3 +87,29 @@ def jwt_admin_token(api_client, admin_user):
         format="json"
     )
     return response.data["access_token"]
+
+
+@pytest.fixture
+def query_budget():
+    """
+    Returns a context manager that fails the test when the block runs
+    more than `budget` queries, or repeats one statement `repeat_limit`
+    times or more (an N+1). The failure lists the offending statements.
+    """
+
+    @contextmanager
+    def check(budget, repeat_limit=settings.SERVER_TIMING_N_PLUS_ONE_THRESHOLD):
+        with record_queries() as timings:
+            yield timings
+
+        repeated = timings.repeated_statements(repeat_limit)
+        statements = "\n".join(
+            f"{count}x {sql}" for sql, count in timings.statements.most_common()
+        )
+
+        assert timings.queries <= budget, (
+            f"{timings.queries} queries, budget is {budget}:\n{statements}"
+        )
+        assert not repeated, f"Repeated statements (N+1?):\n{statements}"
+
+    return check
@@ -0,0 +1,82 @@
+import pytest
+from rest_framework.test import APIClient
+from apps.sweets.models import Sweet
+
+
+@pytest.mark.django_db
+def test_async_list_requires_authentication():
+    """
+    Test that the async list endpoint answers 401 without a token.
+    """
+
+    client = APIClient()
+    response = client.get("/api/async/sweets/")
+
+    assert response.status_code == 401
+    assert response["WWW-Authenticate"] == "Bearer"
+
+
+@pytest.mark.django_db
+def test_async_list_matches_sync_list(jwt_user_token):
+    """
+    Test that the async list returns the same sweets as the sync one.
+    """
+
+    Sweet.objects.create(name="Ladoo", category="Indian", price=10, quantity=5)
+    Sweet.objects.create(name="Brownie", category="Bakery", price="4.50", quantity=2)
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+
+    sync_response = client.get("/api/sweets/")
+    async_response = client.get("/api/async/sweets/")
+
+    assert async_response.status_code == 200
+    assert async_response.json() == sync_response.json()
+    assert "ETag" in async_response
+
+
+@pytest.mark.django_db
+def test_async_search_filters_by_price(jwt_user_token):
+    """
+    Test that the async search supports the same filters.
+    """
+
+    Sweet.objects.create(name="Ladoo", category="Indian", price=50, quantity=20)
+    Sweet.objects.create(name="Kaju Katli", category="Indian", price=400, quantity=10)
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+
+    response = client.get("/api/async/sweets/search/?min_price=100&max_price=500")
+
+    assert response.status_code == 200
+    assert [s["name"] for s in response.json()] == ["Kaju Katli"]
+
+
+@pytest.mark.django_db
+def test_async_purchase_decreases_stock(jwt_user_token):
+    """
+    Test that the async purchase endpoint decrements stock
+    and refuses to oversell.
+    """
+
+    sweet = Sweet.objects.create(name="Ladoo", category="Indian", price=10, quantity=3)
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+
+    ok = client.post(
+        f"/api/async/sweets/{sweet.id}/purchase/", {"quantity": 2}, format="json"
+    )
+    short = client.post(
+        f"/api/async/sweets/{sweet.id}/purchase/", {"quantity": 2}, format="json"
+    )
+    missing = client.post("/api/async/sweets/999999/purchase/")
+
+    sweet.refresh_from_db()
+
+    assert ok.status_code == 200
+    assert short.status_code == 400
+    assert missing.status_code == 404
+    assert sweet.quantity == 1
@@ -0,0 +1,244 @@
+from decimal import Decimal
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from apps.sweets.inventory import bulk_update_sweets, shard_stock
+from apps.sweets.models import StockMovement, Sweet
+
+
+def admin_client(token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    return client
+
+
+@pytest.mark.django_db
+def test_admin_can_bulk_restock_and_reprice(jwt_admin_token):
+    """
+    Test a bulk update mixing restocks and price changes.
+    Expected:
+    - Quantities and prices change as requested; a missing price is kept
+    - Every row is reported with its new quantity and price, in order
+    - Only rows with a quantity_delta are recorded as restocks, at the new price
+    """
+
+    ladoo = Sweet.objects.create(name="Ladoo", category="Indian", price=10, quantity=5)
+    brownie = Sweet.objects.create(name="Brownie", category="Bakery", price="4.50", quantity=0)
+
+    response = admin_client(jwt_admin_token).post(
+        "/api/sweets/bulk-update/",
+        {
+            "rows": [
+                {"sweet_id": brownie.id, "quantity_delta": 20, "price": "5.00"},
+                {"sweet_id": ladoo.id, "quantity_delta": 3},
+            ]
+        },
+        format="json",
+    )
+
+    assert response.status_code == 200
+    assert response.data["results"] == [
+        {"sweet_id": brownie.id, "quantity": 20, "price": Decimal("5.00")},
+        {"sweet_id": ladoo.id, "quantity": 8, "price": Decimal("10.00")},
+    ]
+
+    ladoo.refresh_from_db()
+    brownie.refresh_from_db()
+    assert (ladoo.quantity, ladoo.price) == (8, Decimal("10.00"))
+    assert (brownie.quantity, brownie.price) == (20, Decimal("5.00"))
+
+    movements = list(
+        StockMovement.objects.order_by("sweet_id")
+        .values_list("kind", "sweet_id", "quantity", "unit_price")
+    )
+    assert movements == [
+        (StockMovement.RESTOCK, ladoo.id, 3, Decimal("10.00")),
+        (StockMovement.RESTOCK, brownie.id, 20, Decimal("5.00")),
+    ]
+
+
+@pytest.mark.django_db
+def test_bulk_update_is_all_or_nothing(jwt_admin_token):
+    """
+    Test a bulk update with an unknown and a duplicated sweet.
+    Expected:
+    - 400 listing every failed row by index
+    - Nothing is changed, not even the valid rows
+    """
+
+    ladoo = Sweet.objects.create(name="Ladoo", category="Indian", price=10, quantity=5)
+
+    response = admin_client(jwt_admin_token).post(
+        "/api/sweets/bulk-update/",
+        {
+            "rows": [
+                {"sweet_id": ladoo.id, "quantity_delta": 3},
+                {"sweet_id": 999999, "price": "2.00"},
+                {"sweet_id": ladoo.id, "price": "12.00"},
+            ]
+        },
+        format="json",
+    )
+
+    assert response.status_code == 400
+    assert [(row["row"], row["detail"]) for row in response.data["failed_rows"]] == [
+        (1, "Sweet not found"),
+        (2, "Sweet is listed more than once"),
+    ]
+
+    ladoo.refresh_from_db()
+    assert (ladoo.quantity, ladoo.price) == (5, Decimal("10.00"))
+    assert not StockMovement.objects.exists()
+
+
+@pytest.mark.django_db
+def test_bulk_update_validates_every_row(jwt_admin_token):
+    """
+    Test row validation.
+    Expected:
+    - Errors are reported per row index
+    """
+
+    ladoo = Sweet.objects.create(name="Ladoo", category="Indian", price=10, quantity=5)
+
+    response = admin_client(jwt_admin_token).post(
+        "/api/sweets/bulk-update/",
+        {
+            "rows": [
+                {"sweet_id": ladoo.id, "quantity_delta": 1},
+                {"sweet_id": ladoo.id},
+                {"sweet_id": ladoo.id, "quantity_delta": -2},
+            ]
+        },
+        format="json",
+    )
+
+    assert response.status_code == 400
+    errors = response.data["rows"]
+    assert "non_field_errors" in errors[1]
+    assert "quantity_delta" in errors[2]
+
+
+@pytest.mark.django_db
+def test_bulk_update_requires_admin(api_client, jwt_user_token):
+    """
+    Test that normal users cannot bulk update.
+    """
+
+    api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+    response = api_client.post("/api/sweets/bulk-update/", {"rows": []}, format="json")
+
+    assert response.status_code == 403
+
+
+@pytest.mark.django_db
+def test_bulk_update_uses_one_update(jwt_admin_token):
+    """
+    Test that the whole request is applied set-based.
+    Expected:
+    - 50 rows are written with a single UPDATE and a single ledger INSERT
+    """
+
+    sweets = [
+        Sweet.objects.create(name=f"Sweet {i}", category="Indian", price=10, quantity=1)
+        for i in range(50)
+    ]
+    client = admin_client(jwt_admin_token)
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.post(
+            "/api/sweets/bulk-update/",
+            {"rows": [{"sweet_id": sweet.id, "quantity_delta": 2} for sweet in sweets]},
+            format="json",
+        )
+
+    writes = [
+        query["sql"].split()[0]
+        for query in queries.captured_queries
+        if query["sql"].startswith(("UPDATE", "INSERT", "WITH"))
+    ]
+
+    assert response.status_code == 200
+    assert writes == ["WITH", "INSERT"]
+    assert set(Sweet.objects.values_list("quantity", flat=True)) == {3}
+
+
+
+@pytest.mark.django_db
+def test_bulk_update_handles_bigint_ids():
+    """
+    Test a bulk update of a sweet whose id does not fit in 32 bits.
+    """
+
+    sweet = Sweet.objects.create(
+        id=2**31 + 5, name="Ladoo", category="Indian", price=10, quantity=5
+    )
+
+    bulk_update_sweets([{"sweet_id": sweet.id, "quantity_delta": 2, "price": "12.00"}])
+
+    sweet.refresh_from_db()
+    assert sweet.quantity == 7
+    assert sweet.price == Decimal("12.00")
+
+
+@pytest.mark.django_db
+def test_bulk_restock_of_sharded_sweet(jwt_admin_token):
+    """
+    Test restocking a sharded sweet in bulk.
+    Expected:
+    - The reported and sellable stock include the shards
+    """
+
+    sweet = Sweet.objects.create(name="Ladoo", category="Indian", price=10, quantity=8)
+    shard_stock(sweet.id, 4)
+
+    response = admin_client(jwt_admin_token).post(
+        "/api/sweets/bulk-update/",
+        {"rows": [{"sweet_id": sweet.id, "quantity_delta": 5}]},
+        format="json",
+    )
+
+    assert response.data["results"][0]["quantity"] == 13
+    assert Sweet.objects.with_stock().get(id=sweet.id).stock == 13
+
+
+@pytest.mark.django_db
+def test_bulk_update_command(tmp_path):
+    """
+    Test the bulk_update_sweets command with a CSV file.
+    Expected:
+    - Blank cells keep their current value
+    - A file with any invalid row changes nothing and names the line
+    """
+
+    ladoo = Sweet.objects.create(name="Ladoo", category="Indian", price=10, quantity=5)
+    brownie = Sweet.objects.create(name="Brownie", category="Bakery", price="4.50", quantity=0)
+
+    good = tmp_path / "stock.csv"
+    good.write_text(
+        "sweet_id,quantity_delta,price\n"
+        f"{ladoo.id},10,\n"
+        f"{brownie.id},,6.25\n"
+    )
+    call_command("bulk_update_sweets", str(good))
+
+    ladoo.refresh_from_db()
+    brownie.refresh_from_db()
+    assert (ladoo.quantity, ladoo.price) == (15, Decimal("10.00"))
+    assert (brownie.quantity, brownie.price) == (0, Decimal("6.25"))
+
+    bad = tmp_path / "bad.csv"
+    bad.write_text(
+        "sweet_id,quantity_delta,price\n"
+        f"{ladoo.id},10,\n"
+        "999999,1,\n"
+    )
+
+    with pytest.raises(CommandError, match="1 invalid rows"):
+        call_command("bulk_update_sweets", str(bad))
+
+    ladoo.refresh_from_db()
+    assert ladoo.quantity == 15
@@ -0,0 +1,92 @@
+import pytest
+from rest_framework.test import APIClient
+from apps.sweets.models import Sweet
+
+
+@pytest.mark.django_db
+def test_repeated_list_is_served_from_cache(
+    jwt_user_token, django_assert_num_queries
+):
+    """
+    Test that a repeated list request does not query the database.
+    """
+
+    Sweet.objects.create(name="Ladoo", category="Indian", price=10, quantity=5)
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+
+    first = client.get("/api/sweets/")
+
+    with django_assert_num_queries(0):
+        second = client.get("/api/sweets/")
+
+    assert second.data == first.data
+
+
+@pytest.mark.django_db
+def test_purchase_invalidates_cached_list(
+    jwt_user_token, django_capture_on_commit_callbacks
+):
+    """
+    Test that a purchase is visible on the next list request.
+    """
+
+    sweet = Sweet.objects.create(name="Ladoo", category="Indian", price=10, quantity=5)
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+
+    client.get("/api/sweets/")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        client.post(f"/api/sweets/{sweet.id}/purchase/")
+
+    response = client.get("/api/sweets/")
+
+    assert response.data[0]["quantity"] == 4
+
+
+@pytest.mark.django_db
+def test_search_cache_key_ignores_parameter_order(
+    jwt_user_token, django_assert_num_queries
+):
+    """
+    Test that the same search with reordered parameters hits the cache.
+    """
+
+    Sweet.objects.create(name="Ladoo", category="Indian", price=10, quantity=5)
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+
+    client.get("/api/sweets/search/?name=lad&category=ind")
+
+    with django_assert_num_queries(0):
+        response = client.get("/api/sweets/search/?category=ind&name=lad")
+
+    assert response.data[0]["name"] == "Ladoo"
+
+
+@pytest.mark.django_db
+def test_disabled_cache_always_reads_the_database(jwt_user_token, settings):
+    """
+    Test catalog caching turned off (several workers, no shared cache).
+    Expected:
+    - A direct stock change is visible at once
+    - No validators are sent, so clients never get a stale 304
+    """
+
+    settings.SWEETS_CACHE_ENABLED = False
+    sweet = Sweet.objects.create(name="Ladoo", category="Indian", price=10, quantity=5)
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+
+    first = client.get("/api/sweets/")
+    Sweet.objects.filter(id=sweet.id).update(quantity=2)
+    second = client.get("/api/sweets/")
+
+    assert first.data[0]["quantity"] == 5
+    assert second.data[0]["quantity"] == 2
+    assert "ETag" not in second
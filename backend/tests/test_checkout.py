@@ -0,0 +1,107 @@
+import pytest
+from rest_framework.test import APIClient
+from apps.sweets.models import Sweet
+
+
+@pytest.mark.django_db
+def test_checkout_purchases_all_items(jwt_user_token):
+    """
+    Test that a checkout decreases the stock of every sweet in the cart.
+    """
+
+    ladoo = Sweet.objects.create(
+        name="Ladoo",
+        category="Indian",
+        price=10.0,
+        quantity=5
+    )
+    barfi = Sweet.objects.create(
+        name="Barfi",
+        category="Indian",
+        price=15.0,
+        quantity=3
+    )
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+
+    response = client.post(
+        "/api/sweets/checkout/",
+        {
+            "items": [
+                {"sweet_id": ladoo.id, "quantity": 2},
+                {"sweet_id": barfi.id, "quantity": 3},
+                {"sweet_id": ladoo.id, "quantity": 1},
+            ]
+        },
+        format="json"
+    )
+
+    ladoo.refresh_from_db()
+    barfi.refresh_from_db()
+
+    assert response.status_code == 200
+    assert ladoo.quantity == 2
+    assert barfi.quantity == 0
+
+
+@pytest.mark.django_db
+def test_checkout_is_all_or_nothing(jwt_user_token):
+    """
+    Test that one short line fails the whole checkout
+    and is reported back to the client.
+    """
+
+    ladoo = Sweet.objects.create(
+        name="Ladoo",
+        category="Indian",
+        price=10.0,
+        quantity=5
+    )
+    barfi = Sweet.objects.create(
+        name="Barfi",
+        category="Indian",
+        price=15.0,
+        quantity=1
+    )
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+
+    response = client.post(
+        "/api/sweets/checkout/",
+        {
+            "items": [
+                {"sweet_id": ladoo.id, "quantity": 2},
+                {"sweet_id": barfi.id, "quantity": 2},
+                {"sweet_id": 999999, "quantity": 1},
+            ]
+        },
+        format="json"
+    )
+
+    ladoo.refresh_from_db()
+    barfi.refresh_from_db()
+
+    assert response.status_code == 400
+    assert ladoo.quantity == 5
+    assert barfi.quantity == 1
+    assert [item["sweet_id"] for item in response.data["failed_items"]] == [
+        barfi.id,
+        999999,
+    ]
+    assert response.data["failed_items"][0]["available"] == 1
+
+
+@pytest.mark.django_db
+def test_checkout_requires_items(jwt_user_token):
+    """
+    Test that an empty cart is rejected.
+    """
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+
+    response = client.post("/api/sweets/checkout/", {"items": []}, format="json")
+
+    assert response.status_code == 400
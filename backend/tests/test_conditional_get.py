@@ -0,0 +1,62 @@
+import pytest
+from rest_framework.test import APIClient
+from apps.sweets.models import Sweet
+
+
+@pytest.mark.django_db
+def test_list_returns_validators(jwt_user_token):
+    """
+    Test that the list endpoint sends ETag and Last-Modified headers.
+    """
+
+    Sweet.objects.create(name="Ladoo", category="Indian", price=10, quantity=5)
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+
+    response = client.get("/api/sweets/")
+
+    assert response.status_code == 200
+    assert response["ETag"].startswith('"')
+    assert "Last-Modified" in response
+
+
+@pytest.mark.django_db
+def test_unchanged_catalog_returns_304(jwt_user_token):
+    """
+    Test that a poll with a matching ETag gets 304 Not Modified.
+    """
+
+    Sweet.objects.create(name="Ladoo", category="Indian", price=10, quantity=5)
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+
+    etag = client.get("/api/sweets/search/?name=lad")["ETag"]
+    response = client.get("/api/sweets/search/?name=lad", HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 304
+    assert response["ETag"] == etag
+
+
+@pytest.mark.django_db
+def test_purchase_changes_etag(jwt_user_token, django_capture_on_commit_callbacks):
+    """
+    Test that a stock change makes the old ETag stale.
+    """
+
+    sweet = Sweet.objects.create(name="Ladoo", category="Indian", price=10, quantity=5)
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+
+    etag = client.get("/api/sweets/")["ETag"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        client.post(f"/api/sweets/{sweet.id}/purchase/")
+
+    response = client.get("/api/sweets/", HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+    assert response.data[0]["quantity"] == 4
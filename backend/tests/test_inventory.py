@@ -100,3 +100,98 @@ def test_non_admin_cannot_restock(jwt_user_token):
     )
 
     assert response.status_code == 403
+
+
+@pytest.mark.django_db
+def test_user_can_purchase_multiple_units(jwt_user_token):
+    """
+    Test that a purchase can request several units at once.
+    """
+
+    sweet = Sweet.objects.create(
+        name="Rasmalai",
+        category="Indian",
+        price=20.0,
+        quantity=5
+    )
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+
+    response = client.post(
+        f"/api/sweets/{sweet.id}/purchase/",
+        {"quantity": 3},
+        format="json"
+    )
+
+    sweet.refresh_from_db()
+
+    assert response.status_code == 200
+    assert sweet.quantity == 2
+
+
+@pytest.mark.django_db
+def test_purchase_fails_when_quantity_exceeds_stock(jwt_user_token):
+    """
+    Test that a purchase larger than the stock leaves it untouched.
+    """
+
+    sweet = Sweet.objects.create(
+        name="Soan Papdi",
+        category="Indian",
+        price=9.0,
+        quantity=2
+    )
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+
+    response = client.post(
+        f"/api/sweets/{sweet.id}/purchase/",
+        {"quantity": 3},
+        format="json"
+    )
+
+    sweet.refresh_from_db()
+
+    assert response.status_code == 400
+    assert sweet.quantity == 2
+
+
+@pytest.mark.django_db
+def test_purchase_rejects_invalid_quantity(jwt_user_token):
+    """
+    Test that a non-positive purchase quantity is rejected.
+    """
+
+    sweet = Sweet.objects.create(
+        name="Halwa",
+        category="Indian",
+        price=11.0,
+        quantity=4
+    )
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+
+    response = client.post(
+        f"/api/sweets/{sweet.id}/purchase/",
+        {"quantity": 0},
+        format="json"
+    )
+
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_purchase_unknown_sweet_returns_404(jwt_user_token):
+    """
+    Test that purchasing a sweet that does not exist returns 404.
+    """
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+
+    response = client.post("/api/sweets/999999/purchase/")
+
+    assert response.status_code == 404
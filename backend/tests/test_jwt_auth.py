@@ -52,3 +52,44 @@ def test_protected_endpoint_allows_authenticated_user():
 
     response = client.get("/api/sweets/")
     assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_repeat_authenticated_read_needs_no_queries(
+    jwt_user_token, django_assert_num_queries
+):
+    """
+    Test that a repeat request with the same token is served
+    without touching the database.
+    Expected behavior:
+    - Token and user come from the authentication caches
+    - The sweet list comes from the catalog cache
+    """
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+    client.get("/api/sweets/")
+
+    with django_assert_num_queries(0):
+        response = client.get("/api/sweets/")
+
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_deactivated_user_is_rejected(jwt_user_token, user):
+    """
+    Test that deactivating a user invalidates the cached user.
+    Expected behavior:
+    - API returns HTTP 401 after deactivation
+    """
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+    assert client.get("/api/sweets/").status_code == 200
+
+    user.is_active = False
+    user.save()
+
+    response = client.get("/api/sweets/")
+    assert response.status_code == 401
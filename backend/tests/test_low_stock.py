@@ -0,0 +1,283 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from apps.sweets.inventory import checkout, purchase_sweet, restock_sweet, shard_stock
+from apps.sweets.low_stock import reconcile_low_stock, sweep_low_stock
+from apps.sweets.models import LowStockSweet, Sweet
+
+
+notifications = []
+
+
+def collect_notification(sweets):
+    notifications.append(sweets)
+
+
+@pytest.fixture
+def notifier(settings):
+    settings.SWEETS_LOW_STOCK_NOTIFIER = "tests.test_low_stock.collect_notification"
+    notifications.clear()
+    yield notifications
+    notifications.clear()
+
+
+def low_stock_ids():
+    return set(LowStockSweet.objects.values_list("sweet_id", flat=True))
+
+
+@pytest.mark.django_db
+def test_purchase_crossing_threshold_watches_sweet():
+    """
+    Test purchases of a watched sweet.
+    Expected:
+    - Purchases above the threshold do not touch the watch list
+    - The purchase reaching the threshold adds the sweet
+    - Later purchases keep the original crossing time
+    """
+
+    sweet = Sweet.objects.create(
+        name="Ladoo", category="Indian", price=10, quantity=10, reorder_threshold=5
+    )
+
+    purchase_sweet(sweet.id, 4)
+    assert low_stock_ids() == set()
+
+    purchase_sweet(sweet.id, 2)
+    assert low_stock_ids() == {sweet.id}
+    crossed_at = LowStockSweet.objects.get().crossed_at
+
+    purchase_sweet(sweet.id, 1)
+    assert LowStockSweet.objects.get().crossed_at == crossed_at
+
+    sweet.refresh_from_db()
+    assert sweet.quantity == 3
+
+
+@pytest.mark.django_db
+def test_purchase_without_crossing_is_one_update():
+    """
+    Test the purchase hot path.
+    Expected:
+    - Purchases that do not cross a threshold (unwatched, above it or
+      already below it) write one UPDATE and the ledger row only
+    """
+
+    unwatched = Sweet.objects.create(name="Ladoo", category="Indian", price=10, quantity=10)
+    watched = Sweet.objects.create(
+        name="Brownie", category="Bakery", price=4, quantity=3, reorder_threshold=5
+    )
+
+    for sweet_id in (unwatched.id, watched.id):
+        with CaptureQueriesContext(connection) as queries:
+            purchase_sweet(sweet_id, 1)
+
+        writes = [
+            query["sql"].split()[0]
+            for query in queries.captured_queries
+            if query["sql"].startswith(("UPDATE", "INSERT"))
+        ]
+        assert writes == ["UPDATE", "INSERT"]
+
+
+@pytest.mark.django_db
+def test_restock_above_threshold_unwatches_sweet():
+    """
+    Test restocking a low-stock sweet.
+    Expected:
+    - A restock that stays at the threshold keeps the sweet listed
+    - A restock lifting it above the threshold removes it
+    """
+
+    sweet = Sweet.objects.create(
+        name="Ladoo", category="Indian", price=10, quantity=6, reorder_threshold=5
+    )
+    purchase_sweet(sweet.id, 3)
+    assert low_stock_ids() == {sweet.id}
+
+    restock_sweet(sweet.id, 2)
+    assert low_stock_ids() == {sweet.id}
+
+    restock_sweet(sweet.id, 10)
+    assert low_stock_ids() == set()
+
+    sweet.refresh_from_db()
+    assert sweet.quantity == 15
+
+
+@pytest.mark.django_db
+def test_checkout_crossing_threshold_watches_sweet():
+    """
+    Test a checkout taking one of its sweets to the threshold.
+    Expected:
+    - Only the sweet that crossed its threshold is listed
+    """
+
+    ladoo = Sweet.objects.create(
+        name="Ladoo", category="Indian", price=10, quantity=10, reorder_threshold=5
+    )
+    brownie = Sweet.objects.create(
+        name="Brownie", category="Bakery", price=4, quantity=20, reorder_threshold=5
+    )
+
+    checkout([
+        {"sweet_id": ladoo.id, "quantity": 6},
+        {"sweet_id": brownie.id, "quantity": 6},
+    ])
+
+    assert low_stock_ids() == {ladoo.id}
+
+
+@pytest.mark.django_db
+def test_sharded_purchase_is_reconciled():
+    """
+    Test a sharded sweet sold below its threshold.
+    Expected:
+    - Shard purchases leave the watch list alone
+    - An incremental reconcile lists the sweet
+    """
+
+    sweet = Sweet.objects.create(
+        name="Ladoo", category="Indian", price=10, quantity=8, reorder_threshold=5
+    )
+    shard_stock(sweet.id, 4)
+
+    purchase_sweet(sweet.id, 2)
+    purchase_sweet(sweet.id, 2)
+    assert low_stock_ids() == set()
+
+    assert reconcile_low_stock(since=Sweet.objects.get(id=sweet.id).updated_at) == (1, 0)
+    assert low_stock_ids() == {sweet.id}
+
+
+@pytest.mark.django_db
+def test_reconcile_catches_threshold_edits():
+    """
+    Test changing thresholds outside the stock functions.
+    Expected:
+    - A raised threshold lists the sweet; a cleared one removes it
+    """
+
+    sweet = Sweet.objects.create(name="Ladoo", category="Indian", price=10, quantity=3)
+
+    Sweet.objects.filter(id=sweet.id).update(reorder_threshold=5)
+    assert reconcile_low_stock() == (1, 0)
+    assert low_stock_ids() == {sweet.id}
+
+    Sweet.objects.filter(id=sweet.id).update(reorder_threshold=0)
+    assert reconcile_low_stock() == (0, 1)
+    assert low_stock_ids() == set()
+
+
+
+@pytest.mark.django_db
+def test_incremental_reconcile_removes_cleared_thresholds():
+    """
+    Test clearing the threshold of a listed sweet between incremental
+    passes.
+    Expected:
+    - The next incremental pass takes it off the watch list
+    """
+
+    sweet = Sweet.objects.create(
+        name="Ladoo", category="Indian", price=10, quantity=3, reorder_threshold=5
+    )
+    assert reconcile_low_stock() == (1, 0)
+
+    since = timezone.now()
+    Sweet.objects.filter(id=sweet.id).update(reorder_threshold=0, updated_at=timezone.now())
+
+    assert reconcile_low_stock(since=since) == (0, 1)
+    assert low_stock_ids() == set()
+
+
+@pytest.mark.django_db
+def test_sweeper_notifies_in_batches(notifier):
+    """
+    Test the low-stock sweeper.
+    Expected:
+    - Pending crossings are sent in batches, oldest first
+    - Each sweet is reported once and marked as notified
+    """
+
+    sweets = [
+        Sweet.objects.create(
+            name=f"Sweet {i}", category="Indian", price=10, quantity=6, reorder_threshold=5
+        )
+        for i in range(5)
+    ]
+    for sweet in sweets:
+        purchase_sweet(sweet.id, 1)
+
+    assert sweep_low_stock(batch_size=2) == 5
+    assert [len(batch) for batch in notifier] == [2, 2, 1]
+    assert notifier[0][0] == {
+        "id": sweets[0].id,
+        "name": "Sweet 0",
+        "category": "Indian",
+        "stock": 5,
+        "reorder_threshold": 5,
+    }
+    assert not LowStockSweet.objects.filter(notified_at__isnull=True).exists()
+
+    assert sweep_low_stock(batch_size=2) == 0
+    assert len(notifier) == 3
+
+
+@pytest.mark.django_db
+def test_sweep_low_stock_command(notifier):
+    """
+    Test the sweep_low_stock command.
+    Expected:
+    - It reconciles the watch list, then reports the crossings
+    """
+
+    sweet = Sweet.objects.create(
+        name="Ladoo", category="Indian", price=10, quantity=2, reorder_threshold=5
+    )
+
+    call_command("sweep_low_stock")
+
+    assert [[row["id"] for row in batch] for batch in notifier] == [[sweet.id]]
+
+
+@pytest.mark.django_db
+def test_low_stock_endpoint(jwt_admin_token, notifier):
+    """
+    Test the low-stock endpoint.
+    Expected:
+    - Lists watched sweets with their stock, threshold and notification state
+    """
+
+    ladoo = Sweet.objects.create(
+        name="Ladoo", category="Indian", price=10, quantity=6, reorder_threshold=5
+    )
+    Sweet.objects.create(name="Brownie", category="Bakery", price=4, quantity=1)
+    purchase_sweet(ladoo.id, 2)
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_admin_token}")
+    response = client.get("/api/sweets/low-stock/")
+
+    assert response.status_code == 200
+    [row] = response.data["results"]
+    assert (row["id"], row["quantity"], row["reorder_threshold"]) == (ladoo.id, 4, 5)
+    assert row["notified_at"] is None
+
+    sweep_low_stock()
+    response = client.get("/api/sweets/low-stock/")
+    assert response.data["results"][0]["notified_at"] is not None
+
+
+@pytest.mark.django_db
+def test_low_stock_endpoint_requires_admin(api_client, jwt_user_token):
+    """
+    Test that normal users cannot see the low-stock list.
+    """
+
+    api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+    response = api_client.get("/api/sweets/low-stock/")
+
+    assert response.status_code == 403
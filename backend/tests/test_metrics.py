@@ -0,0 +1,165 @@
+import json
+import os
+
+import pytest
+from apps.sweets.models import Sweet
+from sweetshop.metrics import (
+    http_requests,
+    purchases,
+    retire_worker,
+    snapshot_path,
+)
+
+
+PURCHASE_ROUTE = "api/sweets/<int:sweet_id>/purchase/"
+
+
+@pytest.fixture(autouse=True)
+def metrics_enabled(settings):
+    settings.METRICS_ENABLED = True
+
+
+def metric_lines(response):
+    return response.content.decode().splitlines()
+
+
+@pytest.mark.django_db
+def test_requests_are_counted_and_timed_by_route(api_client, jwt_user_token):
+    """
+    Test request metrics for the sweet list.
+    Expected:
+    - The request counter is labeled with the URL pattern, method and status
+    - /metrics serves a counter and a latency histogram in Prometheus text format
+    """
+
+    labels = ("api/sweets/", "GET", "200")
+    before = http_requests.values.get(labels, 0)
+
+    api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+    api_client.get("/api/sweets/")
+
+    assert http_requests.values[labels] == before + 1
+
+    response = api_client.get("/metrics")
+    lines = metric_lines(response)
+
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE http_requests_total counter" in lines
+    assert "# TYPE http_request_duration_seconds histogram" in lines
+    assert (
+        f'http_requests_total{{route="api/sweets/",method="GET",status="200"}} {before + 1}'
+        in lines
+    )
+    assert (
+        'http_request_duration_seconds_count{route="api/sweets/",method="GET",status="200"} '
+        f"{before + 1}"
+    ) in lines
+    assert any(
+        line.startswith(
+            'http_request_duration_seconds_bucket{route="api/sweets/",method="GET",status="200",le="+Inf"}'
+        )
+        for line in lines
+    )
+
+
+@pytest.mark.django_db
+def test_purchase_outcomes_are_counted(api_client, jwt_user_token):
+    """
+    Test purchase outcome metrics.
+    Expected:
+    - A successful purchase and an out-of-stock purchase are counted apart
+    - Both are labeled with the purchase route and their status code
+    """
+
+    sweet = Sweet.objects.create(name="Ladoo", category="Indian", price=10, quantity=1)
+    success = purchases.values.get(("purchase", "success"), 0)
+    out_of_stock = purchases.values.get(("purchase", "out_of_stock"), 0)
+    rejected = http_requests.values.get((PURCHASE_ROUTE, "POST", "400"), 0)
+
+    api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+    api_client.post(f"/api/sweets/{sweet.id}/purchase/", {"quantity": 1}, format="json")
+    api_client.post(f"/api/sweets/{sweet.id}/purchase/", {"quantity": 1}, format="json")
+
+    assert purchases.values[("purchase", "success")] == success + 1
+    assert purchases.values[("purchase", "out_of_stock")] == out_of_stock + 1
+    assert http_requests.values[(PURCHASE_ROUTE, "POST", "400")] == rejected + 1
+
+
+def write_worker_snapshot(directory, name, requests, pool_size):
+    with open(snapshot_path(directory, name), "w") as handle:
+        json.dump(
+            {
+                "http_requests_total": {
+                    "type": "counter",
+                    "series": [[["api/sweets/", "GET", "200"], requests]],
+                },
+                "db_pool_stats": {
+                    "type": "gauge",
+                    "series": [[["default", "pool_size"], pool_size]],
+                },
+            },
+            handle,
+        )
+
+
+@pytest.mark.django_db
+def test_metrics_are_added_up_across_workers(api_client, settings, tmp_path):
+    """
+    Test multi-worker aggregation through METRICS_DIR.
+    Expected:
+    - /metrics adds the snapshots of other workers to its own
+    - A retired worker's counters are kept, its gauges are dropped
+    """
+
+    settings.METRICS_DIR = str(tmp_path)
+    write_worker_snapshot(tmp_path, 101, requests=5, pool_size=4)
+    write_worker_snapshot(tmp_path, 102, requests=7, pool_size=3)
+
+    retire_worker(str(tmp_path), 102)
+
+    assert not os.path.exists(snapshot_path(tmp_path, 102))
+
+    response = api_client.get("/metrics")
+    lines = metric_lines(response)
+    own = http_requests.values.get(("api/sweets/", "GET", "200"), 0)
+
+    assert (
+        f'http_requests_total{{route="api/sweets/",method="GET",status="200"}} {own + 12}'
+        in lines
+    )
+    assert 'db_pool_stats{alias="default",stat="pool_size"} 4' in lines
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint_is_hidden_when_disabled(api_client, settings):
+    """
+    Test that /metrics is not served without METRICS_ENABLED.
+    """
+
+    settings.METRICS_ENABLED = False
+
+    assert api_client.get("/metrics").status_code == 404
+
+
+@pytest.mark.django_db
+def test_metrics_token_is_required_when_set(api_client, settings):
+    """
+    Test /metrics with METRICS_TOKEN set.
+    Expected:
+    - Requests without the bearer token, or with a wrong one, get 401
+    - The right token gets the metrics
+    """
+
+    settings.METRICS_TOKEN = "scrape-secret"
+
+    assert api_client.get("/metrics").status_code == 401
+
+    api_client.credentials(HTTP_AUTHORIZATION="Bearer wrong")
+    assert api_client.get("/metrics").status_code == 401
+
+    api_client.credentials(HTTP_AUTHORIZATION="Bearer scrape-secret")
+    response = api_client.get("/metrics")
+
+    assert response.status_code == 200
+    assert "# TYPE http_requests_total counter" in metric_lines(response)
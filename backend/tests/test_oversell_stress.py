@@ -0,0 +1,39 @@
+import pytest
+from django.db import connection
+
+from benchmarks.oversell_stress import run_stress
+
+
+pytestmark = pytest.mark.skipif(
+    connection.vendor != "postgresql",
+    reason="Row locking under real concurrency needs Postgres",
+)
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize(
+    ("shards", "batching"),
+    [(0, False), (4, False), (0, True), (4, True)],
+)
+def test_concurrent_purchases_never_oversell(shards, batching):
+    """
+    Test parallel purchases, checkouts and restocks on a few hot sweets,
+    with purchases applied directly or group-committed.
+    Expected:
+    - Final stock equals initial stock + restocked - sold for every sweet
+    - The ledger records exactly the units callers were told they bought
+    - Stock runs out during the run, so the OutOfStock path is exercised
+    """
+
+    report, failures = run_stress(
+        sweets=2,
+        initial_stock=50,
+        operations=400,
+        threads=8,
+        shards=shards,
+        batching=batching,
+    )
+
+    assert failures == []
+    assert report["operations"] == 400
+    assert report["outcomes"]["out_of_stock"] > 0
@@ -0,0 +1,80 @@
+import re
+
+import pytest
+from rest_framework.test import APIClient
+from apps.sweets.models import Sweet
+
+
+def get_links(response):
+    """
+    Parses the Link header into a {rel: url} dict.
+    """
+    return {
+        rel: url
+        for url, rel in re.findall(r'<([^>]+)>; rel="(\w+)"', response.get("Link", ""))
+    }
+
+
+@pytest.mark.django_db
+def test_sweet_list_pages_forward_and_back(jwt_user_token):
+    """
+    Test that the list endpoint pages through the catalog with cursors.
+    Expected:
+    - Pages follow creation order without gaps or repeats
+    - The prev link leads back to the previous page
+    """
+
+    names = [f"Sweet {i}" for i in range(5)]
+    for name in names:
+        Sweet.objects.create(name=name, category="Test", price=10, quantity=1)
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+
+    first = client.get("/api/sweets/?page_size=2")
+    second = client.get(get_links(first)["next"])
+    third = client.get(get_links(second)["next"])
+
+    assert [s["name"] for s in first.data] == names[:2]
+    assert [s["name"] for s in second.data] == names[2:4]
+    assert [s["name"] for s in third.data] == names[4:]
+    assert "prev" not in get_links(first)
+    assert "next" not in get_links(third)
+
+    back = client.get(get_links(third)["prev"])
+
+    assert [s["name"] for s in back.data] == names[2:4]
+
+
+@pytest.mark.django_db
+def test_search_results_are_paginated(jwt_user_token):
+    """
+    Test that search results are paginated like the list endpoint.
+    """
+
+    for i in range(3):
+        Sweet.objects.create(name=f"Ladoo {i}", category="Indian", price=10, quantity=1)
+    Sweet.objects.create(name="Brownie", category="Bakery", price=10, quantity=1)
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+
+    first = client.get("/api/sweets/search/?name=ladoo&page_size=2")
+    second = client.get(get_links(first)["next"])
+
+    assert [s["name"] for s in first.data] == ["Ladoo 0", "Ladoo 1"]
+    assert [s["name"] for s in second.data] == ["Ladoo 2"]
+
+
+@pytest.mark.django_db
+def test_invalid_cursor_returns_404(jwt_user_token):
+    """
+    Test that a tampered cursor is rejected.
+    """
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+
+    response = client.get("/api/sweets/?cursor=not-a-cursor")
+
+    assert response.status_code == 404
@@ -0,0 +1,133 @@
+import threading
+
+import pytest
+from django.db import connection
+from django.http import Http404
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from apps.sweets.batching import PendingPurchase, PurchaseBatcher, apply_batch
+from apps.sweets.inventory import OutOfStock, shard_stock
+from apps.sweets.models import StockMovement, Sweet
+
+
+@pytest.mark.django_db
+def test_apply_batch_applies_whole_batch():
+    """
+    Test that a batch with enough stock is applied with one UPDATE
+    and one ledger INSERT, however many purchases it holds.
+    """
+
+    sweet = Sweet.objects.create(name="Ladoo", category="Indian", price=10, quantity=10)
+    purchases = [PendingPurchase(2), PendingPurchase(3), PendingPurchase(1)]
+
+    with CaptureQueriesContext(connection) as queries:
+        apply_batch(sweet.id, purchases)
+
+    writes = [q["sql"].split()[0] for q in queries if q["sql"].startswith(("UPDATE", "INSERT"))]
+    assert writes == ["UPDATE", "INSERT"]
+
+    sweet.refresh_from_db()
+    assert sweet.quantity == 4
+    assert StockMovement.objects.filter(sweet=sweet).count() == 3
+    assert all(p.done.is_set() and p.error is None for p in purchases)
+
+
+@pytest.mark.django_db
+def test_apply_batch_gives_each_caller_its_own_answer():
+    """
+    Test a batch that asks for more than the stock.
+    Expected:
+    - Purchases are filled in arrival order while stock lasts
+    - Only the ones that do not fit get OutOfStock
+    """
+
+    sweet = Sweet.objects.create(name="Barfi", category="Indian", price=5, quantity=4)
+    purchases = [PendingPurchase(3), PendingPurchase(2), PendingPurchase(1)]
+
+    apply_batch(sweet.id, purchases)
+
+    sweet.refresh_from_db()
+    assert sweet.quantity == 0
+    assert [type(p.error) for p in purchases] == [type(None), OutOfStock, type(None)]
+
+
+@pytest.mark.django_db
+def test_apply_batch_unknown_and_sharded_sweets():
+    """
+    Test that missing sweets get 404 and sharded sweets are served
+    from their shards.
+    """
+
+    missing = [PendingPurchase(1)]
+    apply_batch(999999, missing)
+    assert isinstance(missing[0].error, Http404)
+
+    sweet = Sweet.objects.create(name="Peda", category="Indian", price=5, quantity=3)
+    shard_stock(sweet.id, 3)
+    purchases = [PendingPurchase(2), PendingPurchase(2)]
+
+    apply_batch(sweet.id, purchases)
+
+    assert purchases[0].error is None
+    assert isinstance(purchases[1].error, OutOfStock)
+    assert Sweet.objects.with_stock().get(id=sweet.id).stock == 1
+
+
+def test_batcher_groups_concurrent_purchases(monkeypatch):
+    """
+    Test that purchases arriving together share one batch and that
+    every caller gets its own result.
+    """
+
+    batches = []
+
+    def fake_apply(sweet_id, purchases):
+        batches.append((sweet_id, [p.quantity for p in purchases]))
+        for p in purchases:
+            p.finish(OutOfStock() if p.quantity > 2 else None)
+
+    monkeypatch.setattr("apps.sweets.batching.apply_batch", fake_apply)
+
+    batcher = PurchaseBatcher(max_batch_size=3, max_wait_ms=5000)
+    outcomes = {}
+
+    def buy(quantity):
+        try:
+            batcher.purchase(1, quantity)
+        except OutOfStock:
+            outcomes[quantity] = "out of stock"
+        else:
+            outcomes[quantity] = "ok"
+
+    threads = [threading.Thread(target=buy, args=(q,)) for q in (1, 2, 3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    assert len(batches) == 1
+    assert sorted(batches[0][1]) == [1, 2, 3]
+    assert outcomes == {1: "ok", 2: "ok", 3: "out of stock"}
+
+
+@pytest.mark.django_db
+def test_purchase_endpoint_with_batching(jwt_user_token, settings):
+    """
+    Test the purchase endpoint in group-commit mode.
+    """
+
+    settings.SWEETS_PURCHASE_BATCHING = True
+    settings.SWEETS_PURCHASE_BATCH_WAIT_MS = 1
+
+    sweet = Sweet.objects.create(name="Jalebi", category="Indian", price=5, quantity=1)
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+
+    ok = client.post(f"/api/sweets/{sweet.id}/purchase/")
+    short = client.post(f"/api/sweets/{sweet.id}/purchase/")
+
+    assert ok.status_code == 200
+    assert short.status_code == 400
+    sweet.refresh_from_db()
+    assert sweet.quantity == 0
@@ -0,0 +1,175 @@
+import datetime
+import gzip
+import json
+import uuid
+from decimal import Decimal
+
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from apps.sweets.models import Sweet
+from sweetshop.compression import negotiate
+from sweetshop.renderers import ORJSONRenderer
+
+
+def test_orjson_renderer_matches_drf_json_renderer():
+    """
+    Test the orjson renderer against DRF's JSONRenderer.
+    Expected:
+    - Decimals, datetimes, dates, UUIDs, timedeltas and lazy strings
+      render to exactly the same bytes
+    - Line/paragraph separators are escaped the same way
+    """
+
+    data = {
+        "price": Decimal("12.50"),
+        "created_at": datetime.datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+        "naive": datetime.datetime(2024, 5, 1, 12, 30),
+        "day": datetime.date(2024, 5, 1),
+        "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        "window": datetime.timedelta(minutes=5),
+        "label": gettext_lazy("Sweets"),
+        "name": "Kaju\u2028Katli\u2029 \u0915\u093e\u091c\u0942",
+        "items": [{"id": 1, "quantity": 0}, None, True, 1.5],
+    }
+
+    assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+
+
+@pytest.mark.django_db
+def test_orjson_renderer_formats_datetimes_like_drf():
+    """
+    Test datetimes that reach the renderer unserialized.
+    Expected:
+    - A sweet's stored updated_at (with microseconds) renders to the
+      same bytes as with DRF's JSONRenderer
+    - So does a UTC offset with seconds, which orjson would round
+    """
+
+    sweet = Sweet.objects.create(name="Ladoo", category="Indian", price=10, quantity=5)
+    sweet.refresh_from_db()
+    data = {
+        "updated_at": sweet.updated_at,
+        "local": datetime.datetime(
+            2024, 5, 1, 12, 30, 15, 250,
+            tzinfo=datetime.timezone(datetime.timedelta(hours=5, minutes=53, seconds=28)),
+        ),
+    }
+
+    assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+
+def test_orjson_renderer_honours_indent():
+    """
+    Test pretty printing through the accepted media type.
+    Expected:
+    - The output is indented and still parses to the same data
+    """
+
+    rendered = ORJSONRenderer().render(
+        {"price": Decimal("1.25")}, "application/json; indent=4"
+    )
+
+    assert rendered.startswith(b"{\n  ")
+    assert json.loads(rendered) == {"price": 1.25}
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("gzip, deflate", "gzip"),
+        ("gzip;q=0, deflate", None),
+        ("*", "gzip"),
+        ("*, gzip;q=0", None),
+        ("identity", None),
+        ("", None),
+    ],
+)
+def test_negotiate_gzip(header, expected, monkeypatch):
+    """
+    Test Accept-Encoding negotiation without brotli installed.
+    Expected:
+    - gzip is used when accepted (explicitly or via "*") and never with q=0
+    """
+
+    monkeypatch.setattr("sweetshop.compression.brotli", None)
+
+    assert negotiate(header) == expected
+
+
+def test_negotiate_prefers_brotli():
+    """
+    Test Accept-Encoding negotiation with brotli installed.
+    Expected:
+    - brotli wins ties, but a higher q-value for gzip wins
+    """
+
+    pytest.importorskip("brotli")
+
+    assert negotiate("gzip, deflate, br") == "br"
+    assert negotiate("br;q=0.5, gzip") == "gzip"
+
+
+@pytest.mark.django_db
+def test_large_catalog_responses_are_compressed(api_client, jwt_user_token, monkeypatch):
+    """
+    Test gzip compression of a large list response.
+    Expected:
+    - The response is gzip encoded, smaller, and decodes to the same JSON
+    - Vary includes Accept-Encoding and the ETag is weak
+    """
+
+    monkeypatch.setattr("sweetshop.compression.brotli", None)
+    for i in range(50):
+        Sweet.objects.create(name=f"Sweet {i}", category="Indian", price=10, quantity=5)
+
+    api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+    plain = api_client.get("/api/sweets/")
+    compressed = api_client.get("/api/sweets/", HTTP_ACCEPT_ENCODING="gzip, deflate")
+
+    assert "Content-Encoding" not in plain
+    assert compressed["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in compressed["Vary"]
+    assert compressed["ETag"] == "W/" + plain["ETag"]
+    assert int(compressed["Content-Length"]) < len(plain.content)
+    assert json.loads(gzip.decompress(compressed.content)) == plain.json()
+
+
+@pytest.mark.django_db
+def test_small_responses_are_not_compressed(api_client, jwt_user_token, settings):
+    """
+    Test the compression size threshold.
+    Expected:
+    - A response below COMPRESSION_MIN_SIZE is sent uncompressed
+    """
+
+    Sweet.objects.create(name="Ladoo", category="Indian", price=10, quantity=5)
+
+    api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+    response = api_client.get("/api/sweets/", HTTP_ACCEPT_ENCODING="gzip")
+
+    assert len(response.content) < settings.COMPRESSION_MIN_SIZE
+    assert "Content-Encoding" not in response
+
+
+@pytest.mark.django_db
+def test_streaming_exports_are_compressed(api_client, jwt_admin_token, monkeypatch):
+    """
+    Test gzip compression of a streamed catalog export.
+    Expected:
+    - The stream is gzip encoded without a Content-Length
+    - It decodes to the same NDJSON rows
+    """
+
+    monkeypatch.setattr("sweetshop.compression.brotli", None)
+    Sweet.objects.create(name="Ladoo", category="Indian", price=10, quantity=5)
+    Sweet.objects.create(name="Brownie", category="Bakery", price="4.50", quantity=12)
+
+    api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_admin_token}")
+    response = api_client.get("/api/sweets/export/", HTTP_ACCEPT_ENCODING="gzip")
+    body = gzip.decompress(b"".join(response.streaming_content))
+
+    assert response["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in response
+    assert [json.loads(line)["name"] for line in body.splitlines()] == ["Ladoo", "Brownie"]
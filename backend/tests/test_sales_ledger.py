@@ -0,0 +1,192 @@
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from apps.sweets.ledger import refresh_sales_rollups
+from apps.sweets.models import (
+    CategorySalesRollup,
+    StockMovement,
+    Sweet,
+    SweetSalesRollup,
+)
+
+
+@pytest.mark.django_db
+def test_purchase_and_restock_are_recorded(jwt_user_token, jwt_admin_token, user):
+    """
+    Test that stock changes are written to the ledger.
+    Expected:
+    - A purchase records the buyer, quantity, price and category
+    - A restock is recorded as well
+    - A failed purchase records nothing
+    """
+
+    sweet = Sweet.objects.create(name="Ladoo", category="Indian", price=10, quantity=3)
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+    client.post(f"/api/sweets/{sweet.id}/purchase/", {"quantity": 2}, format="json")
+    client.post(f"/api/sweets/{sweet.id}/purchase/", {"quantity": 2}, format="json")
+
+    admin = APIClient()
+    admin.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_admin_token}")
+    admin.post(f"/api/sweets/{sweet.id}/restock/", {"quantity": 5}, format="json")
+
+    purchase, restock = StockMovement.objects.order_by("id")
+
+    assert purchase.kind == StockMovement.PURCHASE
+    assert purchase.user_id == user.id
+    assert purchase.quantity == 2
+    assert purchase.unit_price == Decimal("10.00")
+    assert purchase.category == "Indian"
+    assert restock.kind == StockMovement.RESTOCK
+    assert restock.quantity == 5
+
+
+@pytest.mark.django_db
+def test_checkout_records_every_line(jwt_user_token):
+    """
+    Test that a checkout writes one ledger row per sweet.
+    """
+
+    ladoo = Sweet.objects.create(name="Ladoo", category="Indian", price=10, quantity=5)
+    brownie = Sweet.objects.create(name="Brownie", category="Bakery", price=4, quantity=5)
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+    client.post(
+        "/api/sweets/checkout/",
+        {"items": [
+            {"sweet_id": ladoo.id, "quantity": 2},
+            {"sweet_id": brownie.id, "quantity": 1},
+        ]},
+        format="json",
+    )
+
+    rows = set(StockMovement.objects.values_list("sweet_id", "quantity", "category"))
+    assert rows == {(ladoo.id, 2, "Indian"), (brownie.id, 1, "Bakery")}
+
+
+@pytest.mark.django_db
+def test_rollups_are_maintained_incrementally():
+    """
+    Test refreshing the rollups from the ledger.
+    Expected:
+    - Hourly and daily rollups per sweet and per category
+    - A second refresh adds only the new ledger rows
+    """
+
+    ladoo = Sweet.objects.create(name="Ladoo", category="Indian", price=10, quantity=0)
+    barfi = Sweet.objects.create(name="Barfi", category="Indian", price=5, quantity=0)
+
+    StockMovement.objects.create(
+        kind=StockMovement.PURCHASE, sweet=ladoo, quantity=2, unit_price=10, category="Indian"
+    )
+    StockMovement.objects.create(
+        kind=StockMovement.RESTOCK, sweet=barfi, quantity=7, unit_price=5, category="Indian"
+    )
+
+    assert refresh_sales_rollups(settle_seconds=0) == 2
+    assert refresh_sales_rollups(settle_seconds=0) == 0
+
+    StockMovement.objects.create(
+        kind=StockMovement.PURCHASE, sweet=barfi, quantity=3, unit_price=5, category="Indian"
+    )
+
+    assert refresh_sales_rollups(settle_seconds=0) == 1
+
+    for period in ("hour", "day"):
+        indian = CategorySalesRollup.objects.get(period=period, category="Indian")
+        assert indian.units_sold == 5
+        assert indian.revenue == Decimal("35.00")
+        assert indian.units_restocked == 7
+
+        barfi_rollup = SweetSalesRollup.objects.get(period=period, sweet=barfi)
+        assert barfi_rollup.units_sold == 3
+        assert barfi_rollup.units_restocked == 7
+
+
+
+@pytest.mark.django_db
+def test_refresh_waits_for_unsettled_rows_with_lower_ids():
+    """
+    Test a ledger row whose created_at is later than that of a row
+    with a higher id (late commit, or clock skew between app hosts).
+    Expected:
+    - The refresh stops below the unsettled row instead of skipping it
+    - Once it settles, it is folded, and no row is counted twice
+    """
+
+    ladoo = Sweet.objects.create(name="Ladoo", category="Indian", price=10, quantity=0)
+    settled = StockMovement.objects.create(
+        kind=StockMovement.PURCHASE, sweet=ladoo, quantity=1, unit_price=10, category="Indian"
+    )
+    unsettled = StockMovement.objects.create(
+        kind=StockMovement.PURCHASE, sweet=ladoo, quantity=2, unit_price=10, category="Indian"
+    )
+    newer = StockMovement.objects.create(
+        kind=StockMovement.PURCHASE, sweet=ladoo, quantity=4, unit_price=10, category="Indian"
+    )
+
+    now = timezone.now()
+    StockMovement.objects.filter(id__in=[settled.id, newer.id]).update(
+        created_at=now - timedelta(minutes=10)
+    )
+    StockMovement.objects.filter(id=unsettled.id).update(created_at=now)
+
+    assert refresh_sales_rollups(settle_seconds=60) == 1
+    assert sum(
+        SweetSalesRollup.objects.filter(period="day", sweet=ladoo).values_list("units_sold", flat=True)
+    ) == 1
+
+    StockMovement.objects.filter(id=unsettled.id).update(
+        created_at=now - timedelta(minutes=5)
+    )
+
+    assert refresh_sales_rollups(settle_seconds=60) == 2
+    assert sum(
+        SweetSalesRollup.objects.filter(period="day", sweet=ladoo).values_list("units_sold", flat=True)
+    ) == 7
+
+
+@pytest.mark.django_db
+def test_sales_report_reads_only_rollups(jwt_admin_token, jwt_user_token):
+    """
+    Test the sales report endpoint.
+    Expected:
+    - Admins get per-category and per-sweet rows from the rollups
+    - The ledger table is never queried
+    - Non-admin users get HTTP 403
+    """
+
+    sweet = Sweet.objects.create(name="Ladoo", category="Indian", price=10, quantity=5)
+    StockMovement.objects.create(
+        kind=StockMovement.PURCHASE, sweet=sweet, quantity=2, unit_price=10, category="Indian"
+    )
+    refresh_sales_rollups(settle_seconds=0)
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_admin_token}")
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get("/api/sweets/sales/")
+
+    assert response.status_code == 200
+    assert response.data["refreshed_at"] is not None
+    assert [(r["category"], r["units_sold"]) for r in response.data["results"]] == [("Indian", 2)]
+    assert not any("stockmovement" in q["sql"] for q in queries)
+
+    response = client.get("/api/sweets/sales/", {"group_by": "sweet", "period": "hour"})
+    assert response.data["results"][0]["sweet_id"] == sweet.id
+    assert response.data["results"][0]["revenue"] == Decimal("20.00")
+
+    response = client.get("/api/sweets/sales/", {"period": "week"})
+    assert response.status_code == 400
+
+    user_client = APIClient()
+    user_client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+    assert user_client.get("/api/sweets/sales/").status_code == 403
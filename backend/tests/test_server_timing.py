@@ -0,0 +1,175 @@
+import json
+import logging
+
+import pytest
+from rest_framework.test import APIClient
+from apps.sweets.models import Sweet
+from sweetshop.timing import record_queries
+
+
+@pytest.fixture
+def server_timing(settings):
+    settings.SERVER_TIMING_ENABLED = True
+    settings.SERVER_TIMING_QUERY_BUDGET = 20
+    settings.SERVER_TIMING_N_PLUS_ONE_THRESHOLD = 5
+    return settings
+
+
+def timing_lines(caplog):
+    return [
+        (record.levelno, json.loads(record.getMessage()))
+        for record in caplog.records
+        if record.name == "sweetshop.timing"
+    ]
+
+
+@pytest.mark.django_db
+def test_server_timing_header_and_log_line(server_timing, api_client, jwt_user_token, caplog):
+    """
+    Test the instrumentation of an authenticated list request.
+    Expected:
+    - Server-Timing reports db (with the query count), auth, render and total
+    - One INFO log line carries the same numbers and the route
+    """
+
+    Sweet.objects.create(name="Ladoo", category="Indian", price=10, quantity=5)
+    api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+
+    with caplog.at_level(logging.INFO, logger="sweetshop.timing"):
+        response = api_client.get("/api/sweets/")
+
+    assert response.status_code == 200
+
+    header = response["Server-Timing"]
+    assert header.startswith("db;dur=")
+    assert 'desc="3 queries"' in header
+    for name in ("auth", "render", "total"):
+        assert f"{name};dur=" in header
+
+    [(level, line)] = timing_lines(caplog)
+    assert level == logging.INFO
+    assert line["route"] == "api/sweets/"
+    assert line["status"] == 200
+    assert line["queries"] == 3
+    assert line["auth_ms"] > 0
+    assert line["render_ms"] > 0
+    assert line["over_query_budget"] is False
+    assert line["n_plus_one"] == []
+
+
+@pytest.mark.django_db
+def test_server_timing_flags_requests_over_budget(server_timing, jwt_user_token, caplog):
+    """
+    Test a request that runs more queries than the budget.
+    Expected:
+    - The log line is a warning and marked over budget
+    """
+
+    server_timing.SERVER_TIMING_QUERY_BUDGET = 1
+
+    # A new client loads the middleware with the lowered budget.
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+
+    with caplog.at_level(logging.INFO, logger="sweetshop.timing"):
+        client.get("/api/sweets/")
+
+    [(level, line)] = timing_lines(caplog)
+    assert level == logging.WARNING
+    assert line["over_query_budget"] is True
+
+
+@pytest.mark.django_db
+def test_server_timing_disabled_by_default(api_client, jwt_user_token):
+    """
+    Test that the middleware is opt-in.
+    Expected:
+    - No Server-Timing header without SERVER_TIMING_ENABLED
+    """
+
+    api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+    response = api_client.get("/api/sweets/")
+
+    assert "Server-Timing" not in response
+
+
+@pytest.mark.django_db
+def test_repeated_statements_are_reported_as_n_plus_one(query_budget):
+    """
+    Test N+1 detection on a loop of single-row lookups.
+    Expected:
+    - The repeated statement is counted once per lookup
+    - The query_budget fixture fails the block even within its budget
+    """
+
+    sweets = [
+        Sweet.objects.create(name=f"Sweet {i}", category="Indian", price=10, quantity=5)
+        for i in range(5)
+    ]
+
+    with record_queries() as timings:
+        for sweet in sweets:
+            Sweet.objects.get(id=sweet.id)
+
+    [(sql, count)] = timings.repeated_statements(5)
+    assert count == 5
+    assert "sweets_sweet" in sql
+
+    with pytest.raises(AssertionError, match="N\\+1"):
+        with query_budget(10):
+            for sweet in sweets:
+                Sweet.objects.get(id=sweet.id)
+
+
+# Queries per request, including the first lookup of the user behind the
+# token. Tests run inside a transaction, so atomic blocks show up as
+# SAVEPOINT/RELEASE pairs.
+ENDPOINT_BUDGETS = [
+    ("user", "get", "/api/sweets/", lambda sweet: None, 3),
+    ("user", "get", "/api/sweets/search/?category=Indian", lambda sweet: None, 3),
+    ("user", "get", "/api/sweets/search/facets/", lambda sweet: None, 2),
+    ("user", "post", "/api/sweets/{sweet_id}/purchase/", lambda sweet: {"quantity": 1}, 5),
+    ("admin", "post", "/api/sweets/{sweet_id}/restock/", lambda sweet: {"quantity": 1}, 5),
+    (
+        "user",
+        "post",
+        "/api/sweets/checkout/",
+        lambda sweet: {"items": [{"sweet_id": sweet.id, "quantity": 1}]},
+        6,
+    ),
+    (
+        None,
+        "post",
+        "/api/auth/login/",
+        lambda sweet: {"username": "normaluser", "password": "UserPassword123"},
+        2,
+    ),
+]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("who, method, path, body, budget", ENDPOINT_BUDGETS)
+def test_endpoint_query_budgets(
+    who, method, path, body, budget, query_budget, jwt_user_token, jwt_admin_token
+):
+    """
+    Test the query budget of each hot endpoint.
+    Expected:
+    - The request succeeds within its budget and without N+1 patterns
+    """
+
+    sweet = Sweet.objects.create(name="Ladoo", category="Indian", price=10, quantity=50)
+    for i in range(10):
+        Sweet.objects.create(name=f"Barfi {i}", category="Indian", price=5 + i, quantity=5)
+
+    client = APIClient()
+    tokens = {"user": jwt_user_token, "admin": jwt_admin_token}
+    if who:
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens[who]}")
+
+    with query_budget(budget):
+        response = getattr(client, method)(
+            path.format(sweet_id=sweet.id), body(sweet), format="json"
+        )
+
+    assert response.status_code == 200
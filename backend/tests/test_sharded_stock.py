@@ -0,0 +1,193 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.http import Http404
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from apps.sweets.inventory import OutOfStock, purchase_sweet, shard_stock
+from apps.sweets.models import Sweet, SweetStockShard
+from apps.sweets.search import filter_sweets
+
+
+def shard_quantities(sweet):
+    return list(
+        SweetStockShard.objects.filter(sweet=sweet)
+        .order_by("shard")
+        .values_list("quantity", flat=True)
+    )
+
+
+@pytest.mark.django_db
+def test_shard_stock_spreads_and_folds_back():
+    """
+    Test turning sharding on and off.
+    Expected:
+    - Stock is split evenly over the shards and the sweet row is emptied
+    - Folding back restores the whole stock to the sweet row
+    """
+
+    sweet = Sweet.objects.create(name="Ladoo", category="Indian", price=10, quantity=10)
+
+    call_command("shard_stock", sweet.id, shards=4)
+
+    sweet.refresh_from_db()
+    assert sweet.shard_count == 4
+    assert sweet.quantity == 0
+    assert sorted(shard_quantities(sweet)) == [2, 2, 3, 3]
+
+    shard_stock(sweet.id, 0)
+
+    sweet.refresh_from_db()
+    assert sweet.shard_count == 0
+    assert sweet.quantity == 10
+    assert shard_quantities(sweet) == []
+
+
+@pytest.mark.django_db
+def test_sharded_purchase_restock_and_listing(jwt_user_token, jwt_admin_token):
+    """
+    Test the sharded path through the API.
+    Expected:
+    - Purchases come out of the shards
+    - Restock spreads the new stock over the shards
+    - List and search report the summed quantity
+    """
+
+    sweet = Sweet.objects.create(name="Kaju Katli", category="Indian", price=20, quantity=6)
+    shard_stock(sweet.id, 3)
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+
+    response = client.post(f"/api/sweets/{sweet.id}/purchase/", {"quantity": 2}, format="json")
+    assert response.status_code == 200
+    assert sum(shard_quantities(sweet)) == 4
+
+    response = client.get("/api/sweets/")
+    assert response.data[0]["quantity"] == 4
+
+    admin = APIClient()
+    admin.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_admin_token}")
+    response = admin.post(f"/api/sweets/{sweet.id}/restock/", {"quantity": 5}, format="json")
+    assert response.status_code == 200
+    assert sum(shard_quantities(sweet)) == 9
+    assert min(shard_quantities(sweet)) >= 1
+
+    response = client.get("/api/sweets/search/", {"in_stock": "true"})
+    assert response.data[0]["quantity"] == 9
+
+
+@pytest.mark.django_db
+def test_sharded_purchase_spanning_shards(jwt_user_token):
+    """
+    Test a purchase larger than any single shard.
+    Expected:
+    - It is filled from several shards
+    - Asking for more than the total returns 400 and changes nothing
+    """
+
+    sweet = Sweet.objects.create(name="Peda", category="Indian", price=5, quantity=4)
+    shard_stock(sweet.id, 4)
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+
+    response = client.post(f"/api/sweets/{sweet.id}/purchase/", {"quantity": 3}, format="json")
+    assert response.status_code == 200
+    assert sum(shard_quantities(sweet)) == 1
+
+    response = client.post(f"/api/sweets/{sweet.id}/purchase/", {"quantity": 2}, format="json")
+    assert response.status_code == 400
+    assert sum(shard_quantities(sweet)) == 1
+
+
+@pytest.mark.django_db
+def test_checkout_takes_from_shards(jwt_user_token):
+    """
+    Test that checkout counts and decrements sharded stock.
+    """
+
+    sharded = Sweet.objects.create(name="Barfi", category="Indian", price=5, quantity=6)
+    single = Sweet.objects.create(name="Brownie", category="Bakery", price=4, quantity=2)
+    shard_stock(sharded.id, 2)
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+
+    response = client.post(
+        "/api/sweets/checkout/",
+        {"items": [
+            {"sweet_id": sharded.id, "quantity": 5},
+            {"sweet_id": single.id, "quantity": 1},
+        ]},
+        format="json",
+    )
+
+    assert response.status_code == 200
+    assert sum(shard_quantities(sharded)) == 1
+    single.refresh_from_db()
+    assert single.quantity == 1
+
+
+@pytest.mark.django_db
+def test_async_purchase_from_shards(jwt_user_token):
+    """
+    Test that the async purchase endpoint handles sharded sweets.
+    """
+
+    sweet = Sweet.objects.create(name="Jalebi", category="Indian", price=5, quantity=4)
+    shard_stock(sweet.id, 2)
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+
+    ok = client.post(f"/api/async/sweets/{sweet.id}/purchase/", {"quantity": 3}, format="json")
+    short = client.post(f"/api/async/sweets/{sweet.id}/purchase/", {"quantity": 2}, format="json")
+
+    assert ok.status_code == 200
+    assert short.status_code == 400
+    assert sum(shard_quantities(sweet)) == 1
+
+
+@pytest.mark.django_db
+def test_in_stock_filter_counts_shards():
+    """
+    Test the in_stock search filter on a plain queryset.
+    Expected:
+    - A sharded sweet whose stock is all in shards is in stock
+    - Sold-out sweets, sharded or not, are left out
+    """
+
+    sharded = Sweet.objects.create(name="Peda", category="Indian", price=5, quantity=4)
+    shard_stock(sharded.id, 2)
+    emptied = Sweet.objects.create(name="Barfi", category="Indian", price=5, quantity=0)
+    shard_stock(emptied.id, 2)
+    plain = Sweet.objects.create(name="Ladoo", category="Indian", price=5, quantity=1)
+    Sweet.objects.create(name="Jalebi", category="Indian", price=5, quantity=0)
+
+    queryset = filter_sweets(Sweet.objects.all(), {"in_stock": "true"})
+
+    assert set(queryset.values_list("id", flat=True)) == {sharded.id, plain.id}
+
+
+@pytest.mark.django_db
+def test_unsharded_out_of_stock_skips_shard_path():
+    """
+    Test an out-of-stock purchase of an unsharded sweet.
+    Expected:
+    - OutOfStock is raised without locking the sweet or reading shards
+    - An unknown sweet raises Http404 the same way
+    """
+
+    sweet = Sweet.objects.create(name="Barfi", category="Indian", price=5, quantity=1)
+
+    with CaptureQueriesContext(connection) as queries:
+        with pytest.raises(OutOfStock):
+            purchase_sweet(sweet.id, 2)
+
+    sql = " ".join(query["sql"] for query in queries.captured_queries)
+    assert "sweetstockshard" not in sql
+    assert "FOR UPDATE" not in sql
+
+    with pytest.raises(Http404):
+        purchase_sweet(999999)
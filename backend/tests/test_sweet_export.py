@@ -0,0 +1,110 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+import pytest
+from django.core.management import call_command
+from rest_framework.test import APIClient
+from apps.sweets.exporters import iter_export
+from apps.sweets.importers import import_sweets
+from apps.sweets.models import Sweet
+
+
+@pytest.mark.django_db
+def test_admin_can_export_ndjson(jwt_admin_token):
+    """
+    Test that an admin can stream the catalog as NDJSON.
+    """
+
+    Sweet.objects.create(name="Ladoo", category="Indian", price=10, quantity=5)
+    Sweet.objects.create(name="Brownie", category="Bakery", price="4.50", quantity=12)
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_admin_token}")
+
+    response = client.get("/api/sweets/export/")
+    rows = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/x-ndjson"
+    assert [row["name"] for row in rows] == ["Ladoo", "Brownie"]
+    assert rows[1]["price"] == "4.50"
+
+
+@pytest.mark.django_db
+def test_admin_can_export_csv(jwt_admin_token):
+    """
+    Test that an admin can stream the catalog as CSV.
+    """
+
+    Sweet.objects.create(name="Ladoo", category="Indian", price=10, quantity=5)
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_admin_token}")
+
+    response = client.get("/api/sweets/export/?file_format=csv")
+    lines = b"".join(response.streaming_content).decode().splitlines()
+
+    assert response.status_code == 200
+    assert lines[0].startswith("id,name,category,price,quantity")
+    assert ",Ladoo,Indian,10.00,5," in lines[1]
+
+
+@pytest.mark.django_db
+def test_non_admin_cannot_export(jwt_user_token):
+    """
+    Test that non-admin users cannot export the catalog.
+    """
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+
+    response = client.get("/api/sweets/export/")
+
+    assert response.status_code == 403
+
+
+@pytest.mark.django_db
+def test_export_command_writes_ndjson():
+    """
+    Test that the export_sweets command streams NDJSON to stdout.
+    """
+
+    Sweet.objects.create(name="Ladoo", category="Indian", price=10, quantity=5)
+
+    out = io.StringIO()
+    call_command("export_sweets", stdout=out)
+
+    assert json.loads(out.getvalue())["name"] == "Ladoo"
+
+
+@pytest.mark.django_db
+def test_export_formats_prices_and_datetimes_like_the_api():
+    """
+    Test the export's value formats.
+    Expected:
+    - Prices have two decimal places and datetimes are ISO 8601,
+      in both NDJSON and CSV
+    - An exported CSV imports again without errors
+    """
+
+    sweet = Sweet.objects.create(name="Ladoo", category="Indian", price=10, quantity=5)
+    sweet.refresh_from_db()
+
+    row = json.loads("".join(iter_export("ndjson")))
+
+    assert row["price"] == "10.00"
+    assert datetime.fromisoformat(row["updated_at"].replace("Z", "+00:00")) == sweet.updated_at
+    assert "T" in row["created_at"]
+
+    exported = "".join(iter_export("csv"))
+    csv_row = next(csv.DictReader(io.StringIO(exported)))
+
+    assert csv_row["price"] == "10.00"
+    assert csv_row["updated_at"] == row["updated_at"]
+
+    result = import_sweets(io.StringIO(exported), "csv", upsert=True)
+
+    assert result["failed"] == 0
+    assert result["updated"] == 1
@@ -0,0 +1,97 @@
+import pytest
+from rest_framework.test import APIClient
+from apps.sweets.models import Sweet
+
+
+@pytest.fixture
+def catalog(db):
+    Sweet.objects.create(name="Ladoo", category="Indian", price=2.50, quantity=5)
+    Sweet.objects.create(name="Barfi", category="Indian", price=7.00, quantity=0)
+    Sweet.objects.create(name="Jalebi", category="Indian", price=4.99, quantity=3)
+    Sweet.objects.create(name="Brownie", category="Bakery", price=5.00, quantity=2)
+
+
+@pytest.mark.django_db
+def test_facets_count_categories_and_price_buckets(jwt_user_token, catalog):
+    """
+    Test the facets endpoint without filters.
+    Expected:
+    - Categories are counted, largest first
+    - Prices are counted in 5.00 wide buckets
+    """
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+
+    response = client.get("/api/sweets/search/facets/")
+
+    assert response.status_code == 200
+    assert response.data["total"] == 4
+    assert response.data["categories"] == [
+        {"category": "Indian", "count": 3},
+        {"category": "Bakery", "count": 1},
+    ]
+    assert [
+        (str(b["min_price"]), str(b["max_price"]), b["count"])
+        for b in response.data["price_histogram"]
+    ] == [("0.00", "5.00", 2), ("5.00", "10.00", 2)]
+
+
+@pytest.mark.django_db
+def test_facets_follow_search_filters(jwt_user_token, catalog):
+    """
+    Test that facets are computed for the current filter set.
+    """
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+
+    response = client.get(
+        "/api/sweets/search/facets/", {"in_stock": "true", "bucket_size": "2.5"}
+    )
+
+    assert response.data["total"] == 3
+    assert response.data["categories"][0] == {"category": "Indian", "count": 2}
+    assert [b["count"] for b in response.data["price_histogram"]] == [2, 1]
+
+
+@pytest.mark.django_db
+def test_facets_use_one_query_and_the_catalog_cache(
+    jwt_user_token, catalog, django_assert_num_queries, django_capture_on_commit_callbacks
+):
+    """
+    Test that facets cost one aggregate query and are then cached
+    until the catalog changes.
+    """
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+    client.get("/api/sweets/")
+
+    with django_assert_num_queries(1):
+        client.get("/api/sweets/search/facets/")
+
+    with django_assert_num_queries(0):
+        response = client.get("/api/sweets/search/facets/")
+
+    assert response.data["total"] == 4
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Sweet.objects.create(name="Peda", category="Indian", price=1, quantity=1)
+
+    response = client.get("/api/sweets/search/facets/")
+    assert response.data["total"] == 5
+
+
+@pytest.mark.django_db
+def test_facets_reject_invalid_bucket_size(jwt_user_token):
+    """
+    Test that a non-positive bucket size returns HTTP 400.
+    """
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+
+    response = client.get("/api/sweets/search/facets/", {"bucket_size": "0"})
+
+    assert response.status_code == 400
@@ -0,0 +1,191 @@
+import csv
+import io
+
+import pytest
+from django.core.management import call_command
+from rest_framework.test import APIClient
+from apps.sweets.importers import import_sweets
+from apps.sweets.inventory import shard_stock
+from apps.sweets.models import Sweet, SweetStockShard
+
+
+CSV_CATALOG = (
+    "name,category,price,quantity\n"
+    "Ladoo,Indian,10.00,5\n"
+    "Barfi,Indian,not-a-price,3\n"
+    "Brownie,Bakery,4.50,12\n"
+)
+
+
+@pytest.mark.django_db
+def test_admin_can_import_csv(jwt_admin_token):
+    """
+    Test that an admin can bulk import sweets from a CSV upload.
+    Expected:
+    - Valid rows are created
+    - Invalid rows are reported by line number
+    """
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_admin_token}")
+
+    upload = io.BytesIO(CSV_CATALOG.encode())
+    upload.name = "catalog.csv"
+
+    response = client.post("/api/sweets/import/", {"file": upload}, format="multipart")
+
+    assert response.status_code == 200
+    assert response.data["created"] == 2
+    assert response.data["failed"] == 1
+    assert response.data["errors"][0]["line"] == 3
+    assert "price" in response.data["errors"][0]["errors"]
+    assert set(Sweet.objects.values_list("name", flat=True)) == {"Ladoo", "Brownie"}
+
+
+@pytest.mark.django_db
+def test_non_admin_cannot_import(jwt_user_token):
+    """
+    Test that non-admin users cannot bulk import sweets.
+    """
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+
+    upload = io.BytesIO(CSV_CATALOG.encode())
+    upload.name = "catalog.csv"
+
+    response = client.post("/api/sweets/import/", {"file": upload}, format="multipart")
+
+    assert response.status_code == 403
+
+
+@pytest.mark.django_db
+def test_import_command_upserts_by_name(tmp_path):
+    """
+    Test that the import_sweets command updates existing sweets by name
+    and inserts the rest, across several batches.
+    """
+
+    Sweet.objects.create(name="Ladoo", category="Indian", price=8, quantity=1)
+
+    path = tmp_path / "catalog.jsonl"
+    path.write_text(
+        '{"name": "Ladoo", "category": "Indian", "price": "10.00", "quantity": 5}\n'
+        '{"name": "Brownie", "category": "Bakery", "price": "4.50", "quantity": 12}\n'
+        "not json\n"
+        '{"name": "Jalebi", "category": "Indian", "price": "6.00", "quantity": 7}\n'
+    )
+
+    out = io.StringIO()
+    call_command(
+        "import_sweets", str(path), "--upsert", "--batch-size", "2",
+        stdout=out, stderr=io.StringIO(),
+    )
+
+    assert "Created 2, updated 1, failed 1." in out.getvalue()
+    assert Sweet.objects.count() == 3
+    assert Sweet.objects.get(name="Ladoo").quantity == 5
+
+
+@pytest.mark.django_db
+def test_unreadable_file_keeps_partial_import(
+    jwt_admin_token, django_capture_on_commit_callbacks
+):
+    """
+    Test a CSV upload that breaks partway through.
+    Expected:
+    - 400 with the partial summary and an error entry for the bad line
+    - Rows before the bad line are imported and visible in the catalog
+    """
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_admin_token}")
+    assert client.get("/api/sweets/").data == []
+
+    upload = io.BytesIO(
+        (CSV_CATALOG + "Halwa,Indian,5.00," + "9" * (csv.field_size_limit() + 1) + "\n").encode()
+    )
+    upload.name = "catalog.csv"
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = client.post("/api/sweets/import/", {"file": upload}, format="multipart")
+
+    assert response.status_code == 400
+    assert response.data["detail"].startswith("Malformed CSV")
+    assert response.data["created"] == 2
+    assert response.data["errors"][-1]["line"] == 5
+    assert [sweet["name"] for sweet in client.get("/api/sweets/").data] == ["Ladoo", "Brownie"]
+
+
+@pytest.mark.django_db
+def test_import_stops_at_invalid_utf8():
+    """
+    Test a JSONL file that is not UTF-8 past its first batches.
+    Expected:
+    - Batches read before the bad bytes are kept and counted
+    - The summary says the file must be UTF-8
+    """
+
+    good = "".join(
+        f'{{"name": "Sweet {i}", "category": "Indian", "price": "1.00", "quantity": 1}}\n'
+        for i in range(300)
+    )
+    lines = io.TextIOWrapper(
+        io.BytesIO(good.encode() + b'{"name": "Caf\xe9"}\n'), encoding="utf-8"
+    )
+
+    result = import_sweets(lines, "jsonl", batch_size=100)
+
+    assert result["detail"] == "File must be UTF-8 encoded"
+    assert result["created"] == Sweet.objects.count() > 0
+
+
+@pytest.mark.django_db
+def test_upsert_replaces_the_stock_of_a_sharded_sweet():
+    """
+    Test re-importing a sweet whose stock is spread over shards.
+    Expected:
+    - The sweet's stock becomes the imported quantity, not that
+      quantity plus the old shard stock
+    - The new stock is spread over the shards
+    """
+
+    sweet = Sweet.objects.create(name="Ladoo", category="Indian", price=8, quantity=40)
+    shard_stock(sweet.id, 4)
+
+    result = import_sweets(
+        io.StringIO("name,category,price,quantity\nLadoo,Indian,10.00,7\n"),
+        "csv",
+        upsert=True,
+    )
+
+    assert result["updated"] == 1
+    assert Sweet.objects.with_stock().get(id=sweet.id).stock == 7
+    assert Sweet.objects.get(id=sweet.id).quantity == 0
+    assert sum(
+        SweetStockShard.objects.filter(sweet=sweet).values_list("quantity", flat=True)
+    ) == 7
+
+
+@pytest.mark.django_db
+def test_upsert_updates_reorder_threshold():
+    """
+    Test that re-importing a sweet updates its reorder threshold,
+    and that a file without the column keeps the current one.
+    """
+
+    Sweet.objects.create(name="Ladoo", category="Indian", price=8, quantity=5, reorder_threshold=2)
+
+    import_sweets(
+        io.StringIO("name,category,price,quantity,reorder_threshold\nLadoo,Indian,8.00,5,10\n"),
+        "csv",
+        upsert=True,
+    )
+    assert Sweet.objects.get(name="Ladoo").reorder_threshold == 10
+
+    import_sweets(
+        io.StringIO("name,category,price,quantity\nLadoo,Indian,9.00,5\n"),
+        "csv",
+        upsert=True,
+    )
+    assert Sweet.objects.get(name="Ladoo").reorder_threshold == 10
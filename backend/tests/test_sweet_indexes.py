@@ -0,0 +1,111 @@
+import pytest
+from django.db import connection
+from rest_framework.test import APIClient
+from apps.sweets.inventory import shard_stock
+from apps.sweets.models import Sweet
+from apps.sweets.search import filter_sweets
+
+
+postgres_only = pytest.mark.skipif(
+    connection.vendor != "postgresql",
+    reason="Query plan assertions need Postgres",
+)
+
+
+def explain(queryset):
+    """
+    Returns the Postgres plan for a queryset with sequential scans
+    discouraged, so the plan shows whether an index *can* be used
+    even on a tiny test table.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+    return queryset.explain()
+
+
+@pytest.fixture
+def sweets(db):
+    """
+    Creates a small catalog with in-stock and sold-out sweets.
+    """
+    for i in range(20):
+        Sweet.objects.create(
+            name=f"Sweet {i}",
+            category="Indian" if i % 2 else "Dessert",
+            price=10 + i,
+            quantity=i % 3,
+        )
+
+
+@pytest.mark.django_db
+def test_in_stock_filter_skips_sold_out_sweets(jwt_user_token, sweets):
+    """
+    Test that in_stock=true only returns sweets with stock left.
+    """
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+
+    response = client.get("/api/sweets/search/?in_stock=true")
+
+    assert response.status_code == 200
+    assert len(response.data) == Sweet.objects.filter(quantity__gt=0).count()
+    assert all(s["quantity"] > 0 for s in response.data)
+
+
+@postgres_only
+@pytest.mark.django_db
+def test_catalog_page_uses_created_at_index(sweets):
+    """
+    The keyset page query is answered from the (created_at, id) index.
+    """
+
+    plan = explain(Sweet.objects.order_by("created_at", "id")[:10])
+
+    assert "sweet_created_at_id_idx" in plan
+
+
+@postgres_only
+@pytest.mark.django_db
+def test_in_stock_search_uses_partial_index(sweets):
+    """
+    In-stock searches are answered from the partial in-stock index for
+    unsharded sweets and the partial sharded index for sharded ones.
+    """
+
+    shard_stock(Sweet.objects.filter(quantity__gt=0).first().id, 2)
+
+    queryset = filter_sweets(Sweet.objects.all(), {"in_stock": "true"})
+    plan = explain(queryset)
+
+    assert "sweet_in_stock_idx" in plan
+    assert "sweet_sharded_idx" in plan
+
+
+@postgres_only
+@pytest.mark.django_db
+def test_category_price_filter_uses_composite_index(sweets):
+    """
+    Exact category lookups with a price range use (category, price).
+    """
+
+    plan = explain(Sweet.objects.filter(category="Indian", price__gte=12, price__lte=20))
+
+    assert "sweet_category_price_idx" in plan
+
+
+@postgres_only
+@pytest.mark.django_db
+def test_search_filters_do_not_scan(sweets):
+    """
+    Partial name/category matches combined with a price range never
+    fall back to a sequential scan.
+    """
+
+    queryset = filter_sweets(
+        Sweet.objects.all(),
+        {"name": "sweet", "category": "ind", "min_price": "12", "max_price": "20"},
+    )
+    plan = explain(queryset)
+
+    assert "Seq Scan" not in plan
@@ -1,4 +1,5 @@
 import pytest
+from django.db import connection
 from rest_framework.test import APIClient
 from apps.sweets.models import Sweet
 
@@ -59,3 +60,42 @@ def test_search_sweets_by_price_range(jwt_user_token):
     assert response.status_code == 200
     assert len(response.data) == 1
     assert response.data[0]["name"] == "Kaju Katli"
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(
+    connection.vendor != "postgresql",
+    reason="Fuzzy search relies on pg_trgm",
+)
+def test_fuzzy_search_tolerates_typos(jwt_user_token):
+    """
+    Fuzzy search (q) matches despite a typo and ranks the best match first.
+    """
+
+    Sweet.objects.create(
+        name="Chocolate Cake",
+        category="Dessert",
+        price=250,
+        quantity=10,
+    )
+    Sweet.objects.create(
+        name="Chocolate Chip Cookie",
+        category="Bakery",
+        price=50,
+        quantity=10,
+    )
+    Sweet.objects.create(
+        name="Vanilla Ice Cream",
+        category="Dessert",
+        price=150,
+        quantity=5,
+    )
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+
+    response = client.get("/api/sweets/search/?q=chocolat cake")
+
+    assert response.status_code == 200
+    assert response.data[0]["name"] == "Chocolate Cake"
+    assert "Vanilla Ice Cream" not in [s["name"] for s in response.data]
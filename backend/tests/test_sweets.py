@@ -1,6 +1,7 @@
 import pytest
 from rest_framework.test import APIClient
 from django.contrib.auth.models import User
+from apps.sweets.models import Sweet
 
 
 @pytest.mark.django_db
@@ -28,6 +29,35 @@ def test_admin_can_add_sweet(jwt_admin_token):
     assert response.data["name"] == "Gulab Jamun"
 
 
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("threshold", [-1, "many"])
+def test_add_sweet_rejects_invalid_reorder_threshold(jwt_admin_token, threshold):
+    """
+    Test that an invalid reorder_threshold is rejected.
+    Expected:
+    - HTTP 400 with an error for reorder_threshold
+    - No sweet is created
+    """
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_admin_token}")
+
+    payload = {
+        "name": "Gulab Jamun",
+        "category": "Dessert",
+        "price": "20.00",
+        "quantity": 50,
+        "reorder_threshold": threshold,
+    }
+
+    response = client.post("/api/sweets/", payload, format="json")
+
+    assert response.status_code == 400
+    assert "reorder_threshold" in response.data
+    assert not Sweet.objects.exists()
+
+
 @pytest.mark.django_db
 def test_non_admin_cannot_add_sweet(jwt_user_token):
     """
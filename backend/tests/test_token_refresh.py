@@ -0,0 +1,184 @@
+import pytest
+from rest_framework.test import APIClient
+
+
+def login(client):
+    response = client.post(
+        "/api/auth/login/",
+        {
+            "username": "normaluser",
+            "password": "UserPassword123",
+        },
+        format="json",
+    )
+    return response.data
+
+
+def refresh(client, refresh_token):
+    return client.post(
+        "/api/auth/refresh/",
+        {"refresh_token": refresh_token},
+        format="json",
+    )
+
+
+@pytest.mark.django_db
+def test_refresh_issues_new_token_pair(user):
+    """
+    Test that a refresh token can be exchanged for new tokens.
+    Expected behavior:
+    - API returns HTTP 200 with a new access and refresh token
+    - The new access token works on protected endpoints
+    """
+
+    client = APIClient()
+    tokens = login(client)
+
+    response = refresh(client, tokens["refresh_token"])
+
+    assert response.status_code == 200
+    assert response.data["username"] == "normaluser"
+    assert response.data["refresh_token"] != tokens["refresh_token"]
+
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access_token']}")
+    assert client.get("/api/sweets/").status_code == 200
+
+
+@pytest.mark.django_db
+def test_refresh_ignores_expired_access_token_header(user):
+    """
+    Test that the refresh endpoint does not authenticate the request.
+    Expected behavior:
+    - A bad Authorization header does not block the refresh
+    """
+
+    client = APIClient()
+    tokens = login(client)
+    client.credentials(HTTP_AUTHORIZATION="Bearer expired")
+
+    response = refresh(client, tokens["refresh_token"])
+
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_refresh_token_reuse_revokes_all_sessions(user):
+    """
+    Test that a rotated refresh token cannot be used twice.
+    Expected behavior:
+    - Second use of the old token returns HTTP 401
+    - The token issued by the first rotation is revoked too
+    """
+
+    client = APIClient()
+    tokens = login(client)
+
+    rotated = refresh(client, tokens["refresh_token"]).data
+
+    reused = refresh(client, tokens["refresh_token"])
+    assert reused.status_code == 401
+    assert "reuse" in reused.data["detail"]
+
+    response = refresh(client, rotated["refresh_token"])
+    assert response.status_code == 401
+
+
+@pytest.mark.django_db
+def test_refresh_rejects_access_token(user):
+    """
+    Test that an access token cannot be used as a refresh token.
+    Expected behavior:
+    - API returns HTTP 401
+    """
+
+    client = APIClient()
+    tokens = login(client)
+
+    response = refresh(client, tokens["access_token"])
+
+    assert response.status_code == 401
+
+
+@pytest.mark.django_db
+def test_refresh_rejects_inactive_user(user):
+    """
+    Test that a deactivated user cannot refresh.
+    Expected behavior:
+    - API returns HTTP 401
+    """
+
+    client = APIClient()
+    tokens = login(client)
+
+    user.is_active = False
+    user.save()
+
+    response = refresh(client, tokens["refresh_token"])
+
+    assert response.status_code == 401
+
+
+@pytest.mark.django_db
+def test_refresh_requires_token():
+    """
+    Test that the refresh token field is required.
+    Expected behavior:
+    - API returns HTTP 400
+    """
+
+    client = APIClient()
+    response = client.post("/api/auth/refresh/", {}, format="json")
+
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_refresh_token_is_not_accepted_as_credentials(user):
+    """
+    Test that a refresh token cannot authenticate a request.
+    Expected behavior:
+    - API returns HTTP 401
+    """
+
+    client = APIClient()
+    tokens = login(client)
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['refresh_token']}")
+
+    response = client.get("/api/sweets/")
+
+    assert response.status_code == 401
+
+
+@pytest.mark.django_db
+def test_verify_token(user):
+    """
+    Test the token verify endpoint.
+    Expected behavior:
+    - Valid access and refresh tokens return HTTP 200 with their type
+    - A rotated refresh token and garbage return HTTP 401
+    """
+
+    client = APIClient()
+    tokens = login(client)
+
+    response = client.post(
+        "/api/auth/verify/", {"token": tokens["access_token"]}, format="json"
+    )
+    assert response.status_code == 200
+    assert response.data["token_type"] == "access"
+
+    response = client.post(
+        "/api/auth/verify/", {"token": tokens["refresh_token"]}, format="json"
+    )
+    assert response.status_code == 200
+    assert response.data["token_type"] == "refresh"
+
+    refresh(client, tokens["refresh_token"])
+
+    response = client.post(
+        "/api/auth/verify/", {"token": tokens["refresh_token"]}, format="json"
+    )
+    assert response.status_code == 401
+
+    response = client.post("/api/auth/verify/", {"token": "garbage"}, format="json")
+    assert response.status_code == 401
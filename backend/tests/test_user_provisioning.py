@@ -0,0 +1,92 @@
+import io
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+
+CSV_USERS = (
+    "username,email,password\n"
+    "alice,alice@example.com,AlicePassword123\n"
+    "bob,not-an-email,BobPassword123\n"
+    "normaluser,dup@example.com,SomePassword123\n"
+    "alice,again@example.com,AlicePassword123\n"
+    "carol,,CarolPassword123\n"
+)
+
+
+@pytest.mark.django_db
+def test_admin_can_provision_users(jwt_admin_token, user):
+    """
+    Test that an admin can bulk create users from a CSV upload.
+    Expected:
+    - Valid rows are created with hashed passwords
+    - Invalid emails, existing and repeated usernames are reported
+    """
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_admin_token}")
+
+    upload = io.BytesIO(CSV_USERS.encode())
+    upload.name = "users.csv"
+
+    response = client.post("/api/auth/provision/", {"file": upload}, format="multipart")
+
+    assert response.status_code == 200
+    assert response.data["created"] == 2
+    assert response.data["failed"] == 3
+    assert sorted(error["line"] for error in response.data["errors"]) == [3, 4, 5]
+
+    alice = User.objects.get(username="alice")
+    assert alice.email == "alice@example.com"
+    assert alice.check_password("AlicePassword123")
+    assert User.objects.filter(username="carol").exists()
+
+
+@pytest.mark.django_db
+def test_non_admin_cannot_provision_users(jwt_user_token):
+    """
+    Test that non-admin users cannot bulk create users.
+    """
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {jwt_user_token}")
+
+    upload = io.BytesIO(CSV_USERS.encode())
+    upload.name = "users.csv"
+
+    response = client.post("/api/auth/provision/", {"file": upload}, format="multipart")
+
+    assert response.status_code == 403
+
+
+@pytest.mark.django_db
+def test_provision_command_hashes_in_process_pool(tmp_path, django_assert_max_num_queries):
+    """
+    Test the provision_users management command with a hashing pool.
+    Expected:
+    - Users are created and can log in
+    - Queries stay constant per batch, not per user
+    """
+
+    path = tmp_path / "users.jsonl"
+    path.write_text(
+        "".join(
+            f'{{"username": "user{i}", "password": "Password{i:04d}"}}\n'
+            for i in range(6)
+        )
+    )
+
+    with django_assert_max_num_queries(8):
+        call_command("provision_users", str(path), workers=2, batch_size=3)
+
+    assert User.objects.filter(username__startswith="user").count() == 6
+
+    client = APIClient()
+    response = client.post(
+        "/api/auth/login/",
+        {"username": "user5", "password": "Password0005"},
+        format="json",
+    )
+    assert response.status_code == 200
@@ -27,6 +27,7 @@ export default function SweetShopApp() {
   const [filteredSweets, setFilteredSweets] = useState<Sweet[]>([])
   const [searchTerm, setSearchTerm] = useState("")
   const [categoryFilter, setCategoryFilter] = useState("")
+  const [categories, setCategories] = useState<{ category: string; count: number }[]>([])
   const [minPrice, setMinPrice] = useState("")
   const [maxPrice, setMaxPrice] = useState("")
   const [message, setMessage] = useState({ text: "", type: "" })
@@ -93,26 +94,61 @@ export default function SweetShopApp() {
     setTimeout(() => setMessage({ text: "", type: "" }), 4000)
   }
 
+  // The list endpoint is paginated; the next page's URL is in the Link header
+  const nextPageUrl = (linkHeader: string | null) => {
+    const match = linkHeader?.match(/<([^>]+)>;\s*rel="next"/)
+    return match ? match[1] : null
+  }
+
   const fetchSweets = async () => {
     const token = localStorage.getItem("access_token")
     try {
-      const response = await fetch(`${API_BASE_URL}/api/sweets/`, {
+      const allSweets: Sweet[] = []
+      let url: string | null = `${API_BASE_URL}/api/sweets/?page_size=1000`
+
+      while (url) {
+        const response = await fetch(url, {
+          headers: {
+            Authorization: `Bearer ${token}`,
+          },
+        })
+
+        if (response.status === 401) {
+          handleLogout()
+          return
+        }
+
+        if (!response.ok) {
+          showMessage("Failed to fetch sweets", "error")
+          return
+        }
+
+        allSweets.push(...(await response.json()))
+        url = nextPageUrl(response.headers.get("Link"))
+      }
+
+      setSweets(allSweets)
+      fetchFacets()
+    } catch (error) {
+      showMessage("Failed to fetch sweets", "error")
+    }
+  }
+
+  const fetchFacets = async () => {
+    const token = localStorage.getItem("access_token")
+    try {
+      const response = await fetch(`${API_BASE_URL}/api/sweets/search/facets/`, {
         headers: {
           Authorization: `Bearer ${token}`,
         },
       })
 
-      if (response.status === 401) {
-        handleLogout()
-        return
-      }
-
       if (response.ok) {
         const data = await response.json()
-        setSweets(data)
+        setCategories(data.categories)
       }
     } catch (error) {
-      showMessage("Failed to fetch sweets", "error")
+      // The category filter just stays empty
     }
   }
 
@@ -369,8 +405,6 @@ export default function SweetShopApp() {
     setShowAdminForm("restock")
   }
 
-  const categories = [...new Set(sweets.map((s) => s.category))]
-
   return (
     <div className="app-container">
       {/* Navbar */}
@@ -677,9 +711,9 @@ export default function SweetShopApp() {
                     className="filter-select"
                   >
                     <option value="">All Categories</option>
-                    {categories.map((cat) => (
-                      <option key={cat} value={cat}>
-                        {cat}
+                    {categories.map(({ category, count }) => (
+                      <option key={category} value={category}>
+                        {category} ({count})
                       </option>
                     ))}
                   </select>